@@ -51,11 +51,20 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    # Mesmo serializador (orjson, se instalado) das views JSON
+    'DEFAULT_RENDERER_CLASSES': (
+        'pedidos.respostas.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Antes do SessionMiddleware, para medir também o salvamento da sessão
+    'pedidos.middleware.InstrumentacaoMiddleware',
+    # Depois da instrumentação, para o tempo de compressão entrar no Server-Timing
+    'pedidos.middleware.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,6 +73,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Server-Timing e detecção de N+1 (pedidos/middleware.py). Uma mesma forma de
+# consulta repetida INSTRUMENTACAO_N_MAIS_1_LIMITE vezes é sinalizada como N+1.
+INSTRUMENTACAO_ATIVA = True
+INSTRUMENTACAO_N_MAIS_1_LIMITE = 5
+
+# Compressão das respostas de dados (pedidos/middleware.py): brotli se o pacote
+# estiver instalado, senão gzip, a partir de PEDIDOS_COMPRESSAO_MINIMO bytes
+PEDIDOS_COMPRESSAO_MINIMO = int(os.environ.get('PEDIDOS_COMPRESSAO_MINIMO', 1024))
+PEDIDOS_COMPRESSAO_TIPOS = ('application/json', 'application/x-ndjson', 'text/csv')
+
 ROOT_URLCONF = 'IFFOOD.urls'
 
 
@@ -78,6 +97,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'pedidos.context_processors.cache_de_fragmentos',
             ],
         },
     },
@@ -89,11 +109,140 @@ WSGI_APPLICATION = 'IFFOOD.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Configurado por variáveis de ambiente: DB_ENGINE=sqlite (padrão) ou postgresql.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'iffood'),
+            'USER': os.environ.get('DB_USER', 'iffood'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+        }
+    }
+    if os.environ.get('DB_POOL', '1') == '1':
+        # Pool do psycopg 3 (pip install "psycopg[pool]"); não combina com CONN_MAX_AGE
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # WAL deixa leituras rodarem junto com a escrita; NORMAL é seguro com WAL
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+                # Espera o lock em vez de falhar com "database is locked" (busy_timeout)
+                'timeout': int(os.environ.get('DB_BUSY_TIMEOUT', '20')),
+                # Pega o lock de escrita no BEGIN: transações que leem e depois
+                # escrevem não podem falhar no meio ao tentar promover o lock
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Com vários processos, troque por um backend compartilhado (Redis/Memcached):
+# cada processo tem seu próprio LocMemCache e só invalida o próprio cardápio.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'iffood',
+    },
+    # Usado pelos blocos {% cache %} (um card por produto/pedido), separado
+    # para não disputar espaço com o cardápio e as buscas
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'iffood-fragmentos',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Sessões e usuários autenticados (SESSION_CACHE_ALIAS). SESSION_CACHE=file
+# grava em disco e é compartilhado pelos processos da mesma máquina; o
+# LocMemCache não, então com vários processos um logout ou uma alteração de
+# usuário só vale nos outros quando a entrada expira.
+if os.environ.get('SESSION_CACHE', 'locmem') == 'file':
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', BASE_DIR / '.cache' / 'sessions'),
+        'TIMEOUT': None,
     }
+else:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'iffood-sessoes',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+
+# Tempo máximo (segundos) de uma versão do cardápio em cache
+MENU_CACHE_TIMEOUT = 60 * 60
+
+
+# Sessões
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+# SESSION_BACKEND=cached_db (padrão): lida do cache e só vai ao banco quando não está nele.
+# signed_cookies: a sessão inteira num cookie assinado, sem banco nem cache (o
+# logout não invalida cópias antigas do cookie). cache: só no cache. db: só no banco.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_BACKEND', 'cached_db')]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# O usuário da sessão fica em cache (pedidos/autenticacao.py), então as
+# verificações de user_type não consultam o banco a cada requisição
+AUTHENTICATION_BACKENDS = ['pedidos.autenticacao.CachedModelBackend']
+PEDIDOS_USER_CACHE_TIMEOUT = 5 * 60
+
+
+# Broker dos eventos em tempo real (pedidos/eventos.py). O broker em memória
+# só atende um processo ASGI; troque por um compartilhado ao escalar.
+PEDIDOS_EVENT_BROKER = 'pedidos.eventos.InProcessBroker'
+
+
+# Pedidos entregues há mais dias que isso são movidos para PedidoArquivado
+# pelo comando arquivar_pedidos (agende-o, ex.: diariamente via cron)
+PEDIDOS_ARQUIVAR_APOS_DIAS = 90
+
+# Despacho em lotes (pedidos/despacho.py, comando despachar_entregas): pedidos
+# em preparo do mesmo restaurante e zona saem juntos, até TAMANHO_MAXIMO por
+# lote; um lote incompleto sai quando o pedido mais antigo espera ESPERA_MAXIMA
+# segundos. PEDIDOS_DESPACHO_ZONA recebe um Pedido e devolve a chave da zona.
+PEDIDOS_DESPACHO_TAMANHO_MAXIMO = int(os.environ.get('PEDIDOS_DESPACHO_TAMANHO_MAXIMO', 4))
+PEDIDOS_DESPACHO_ESPERA_MAXIMA = int(os.environ.get('PEDIDOS_DESPACHO_ESPERA_MAXIMA', 10 * 60))
+PEDIDOS_DESPACHO_ZONA = 'pedidos.despacho.zona_unica'
+
+
+# Rate limiting (token bucket) da busca e do carrinho, por usuário ou IP.
+# O backend em memória vale por processo; 'pedidos.ratelimit.CacheBackend'
+# usa o cache padrão e é compartilhado se o cache for (Redis/Memcached).
+PEDIDOS_RATE_LIMIT_BACKEND = 'pedidos.ratelimit.InMemoryBackend'
+PEDIDOS_RATE_LIMITS = {
+    'busca': {'capacidade': 20, 'por_segundo': 5},
+    'carrinho': {'capacidade': 30, 'por_segundo': 2},
 }
 
 
@@ -132,6 +281,21 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Fora do DEBUG, o collectstatic grava os arquivos com o hash do conteúdo no
+# nome (restaurante_home.3f2a9c.js), então podem ser servidos com cache longo
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
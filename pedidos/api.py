@@ -0,0 +1,82 @@
+# pedidos/api.py
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+from .models import Pedido, Produto
+from .serializers import PedidoSerializer, ProdutoSerializer
+from .views import is_restaurante
+
+
+class ProdutoPagination(CursorPagination):
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'limit'
+    ordering = 'id'
+
+
+class PedidoPagination(CursorPagination):
+    # Mesma chave do feed do painel: o custo por página não depende do histórico
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    ordering = ('-criado_em', '-id')
+
+
+def campos_pedidos(request):
+    fields = request.query_params.get('fields')
+    return set(fields.split(',')) if fields else None
+
+
+class ProdutoQuerysetMixin:
+    serializer_class = ProdutoSerializer
+
+    def get_queryset(self):
+        # O cliente vê o cardápio de todos os restaurantes; a conta de
+        # restaurante, só o do seu (nenhum, se não tiver restaurante)
+        if self.request.user.user_type == 'restaurante':
+            return Produto.objects.do_restaurante(self.request.user.restaurante_id)
+        return Produto.objects.all()
+
+
+class ProdutoListView(ProdutoQuerysetMixin, generics.ListAPIView):
+    pagination_class = ProdutoPagination
+
+
+class ProdutoDetailView(ProdutoQuerysetMixin, generics.RetrieveAPIView):
+    pass
+
+
+class PedidoQuerysetMixin:
+    serializer_class = PedidoSerializer
+
+    def get_queryset(self):
+        if is_restaurante(self.request.user):
+            pedidos = Pedido.objects.do_restaurante(self.request.user.restaurante_id)
+        else:
+            pedidos = Pedido.objects.filter(cliente=self.request.user)
+
+        # Só faz os JOINs/prefetches dos campos que serão serializados
+        campos = campos_pedidos(self.request)
+        if campos is None or 'cliente' in campos:
+            pedidos = pedidos.with_cliente()
+        if campos is None or 'itens' in campos:
+            pedidos = pedidos.with_itens()
+        return pedidos
+
+
+class PedidoListView(PedidoQuerysetMixin, generics.ListAPIView):
+    pagination_class = PedidoPagination
+
+    def get_queryset(self):
+        pedidos = super().get_queryset()
+        status = self.request.query_params.get('status')
+        if status:
+            if status not in dict(Pedido.STATUS_CHOICES):
+                raise ValidationError({'status': 'Status inválido.'})
+            pedidos = pedidos.filter(status=status)
+        return pedidos
+
+
+class PedidoDetailView(PedidoQuerysetMixin, generics.RetrieveAPIView):
+    pass
@@ -0,0 +1,86 @@
+# pedidos/arquivamento.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Pedido, PedidoArquivado, ProdutoNoPedido
+
+STATUS_FINAL = 'saiu_para_entrega'
+ARCHIVE_BATCH_SIZE = 500
+
+
+def data_de_corte(dias=None):
+    if dias is None:
+        dias = getattr(settings, 'PEDIDOS_ARQUIVAR_APOS_DIAS', 90)
+    return timezone.now() - timedelta(days=dias)
+
+
+def pedidos_arquivaveis(antes_de):
+    return Pedido.objects.filter(status=STATUS_FINAL, criado_em__lt=antes_de)
+
+
+def _arquivar_lote(antes_de, batch_size):
+    with transaction.atomic():
+        ids = list(
+            pedidos_arquivaveis(antes_de).select_for_update().order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        itens_por_pedido = {}
+        for pedido_id, produto_id, nome, quantidade, preco in (
+            ProdutoNoPedido.objects.filter(pedido_id__in=ids).order_by('id')
+            .values_list('pedido_id', 'produto_id', 'produto__nome', 'quantidade', 'preco_unitario')
+        ):
+            itens_por_pedido.setdefault(pedido_id, []).append({
+                'produto_id': produto_id,
+                'produto_nome': nome,
+                'quantidade': quantidade,
+                'preco_unitario': str(preco),
+            })
+
+        PedidoArquivado.objects.bulk_create([
+            PedidoArquivado(
+                id=pedido.id,
+                restaurante_id=pedido.restaurante_id,
+                cliente_id=pedido.cliente_id,
+                status=pedido.status,
+                total=pedido.total,
+                criado_em=pedido.criado_em,
+                itens=itens_por_pedido.get(pedido.id, []),
+            )
+            for pedido in Pedido.objects.filter(id__in=ids)
+        ])
+        # Os itens vão junto, em cascata
+        Pedido.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def arquivar_pedidos(antes_de, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move para PedidoArquivado os pedidos entregues criados antes de `antes_de`.
+    Cada lote é uma transação curta (copia e apaga), então o comando pode ser
+    interrompido e executado de novo sem perder nem duplicar pedidos.
+    """
+    total = 0
+    while True:
+        arquivados = _arquivar_lote(antes_de, batch_size)
+        if not arquivados:
+            return total
+        total += arquivados
+
+
+def buscar_pedido(pedido_id, **filtros):
+    """
+    Pedido ativo (com itens e cliente) ou, se já foi arquivado, o PedidoArquivado.
+    Devolve (pedido, itens) ou (None, None).
+    """
+    pedido = Pedido.objects.with_cliente().with_itens().filter(id=pedido_id, **filtros).first()
+    if pedido is not None:
+        return pedido, list(pedido.itens.all())
+    pedido = PedidoArquivado.objects.select_related('cliente').filter(id=pedido_id, **filtros).first()
+    if pedido is not None:
+        return pedido, pedido.itens_pedido
+    return None, None
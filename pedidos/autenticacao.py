@@ -0,0 +1,39 @@
+# pedidos/autenticacao.py
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def _cache():
+    # O mesmo cache das sessões: quem compartilha uma também compartilha o outro
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def _chave(user_id):
+    return f'auth:usuario:{user_id}'
+
+
+def esquecer_usuario(user_id):
+    _cache().delete(_chave(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend que guarda no cache o usuário da sessão (com user_type e
+    restaurante_id, usados por is_restaurante/is_cliente), então o
+    AuthenticationMiddleware não consulta o banco a cada requisição.
+
+    O cache é limpo quando o usuário é salvo, excluído ou faz login (ver
+    pedidos/signals.py); alterações feitas com update()/bulk_create, ou em
+    outro processo com um cache local, valem em até PEDIDOS_USER_CACHE_TIMEOUT.
+    """
+
+    def get_user(self, user_id):
+        chave = _chave(user_id)
+        user = _cache().get(chave)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            _cache().set(chave, user, getattr(settings, 'PEDIDOS_USER_CACHE_TIMEOUT', 300))
+        return user if self.user_can_authenticate(user) else None
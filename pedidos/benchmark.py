@@ -0,0 +1,171 @@
+# pedidos/benchmark.py
+import random
+import statistics
+import time
+from collections import defaultdict
+from decimal import Decimal
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .busca import reindexar
+from .estatisticas import percentil
+from .models import Pedido, Produto, ProdutoNoPedido, Restaurante, User
+
+SENHA_BENCHMARK = 'benchmark'
+
+CATEGORIAS = ['Lanches', 'Pizzas', 'Bebidas', 'Sobremesas', 'Saladas', 'Massas']
+NOMES = ['Hambúrguer', 'Pizza', 'Suco', 'Pudim', 'Salada', 'Lasanha', 'Pastel', 'Açaí', 'Refrigerante', 'Coxinha']
+
+
+def popular_banco(clientes, produtos, pedidos, itens_por_pedido, seed=0, batch_size=1000, restaurantes=1):
+    """
+    Cria dados sintéticos em lote, com produtos e pedidos divididos entre
+    `restaurantes` restaurantes. Devolve (usuário do primeiro restaurante,
+    clientes, ids dos produtos do primeiro restaurante).
+    """
+    rng = random.Random(seed)
+    senha = make_password(SENHA_BENCHMARK)
+
+    lojas = Restaurante.objects.bulk_create(
+        [Restaurante(nome=f'Restaurante {i}') for i in range(max(1, restaurantes))]
+    )
+    restaurante = User.objects.create(
+        username='bench_restaurante', password=senha, user_type='restaurante', restaurante=lojas[0],
+    )
+    usuarios = User.objects.bulk_create(
+        [User(username=f'bench_cliente_{i}', password=senha, user_type='cliente') for i in range(clientes)],
+        batch_size=batch_size,
+    )
+    catalogo = Produto.objects.bulk_create(
+        [
+            Produto(
+                restaurante=lojas[i % len(lojas)],
+                nome=f'{rng.choice(NOMES)} {i}',
+                preco=Decimal(rng.randint(500, 9000)) / 100,
+                categoria=rng.choice(CATEGORIAS),
+            )
+            for i in range(produtos)
+        ],
+        batch_size=batch_size,
+    )
+    reindexar(batch_size=batch_size)
+    catalogos = {loja.id: [produto for produto in catalogo if produto.restaurante_id == loja.id] for loja in lojas}
+
+    status = [valor for valor, _ in Pedido.STATUS_CHOICES]
+    for inicio in range(0, pedidos, batch_size):
+        lote = Pedido.objects.bulk_create([
+            Pedido(restaurante=rng.choice(lojas), cliente=rng.choice(usuarios), total=0, status=rng.choice(status))
+            for _ in range(min(batch_size, pedidos - inicio))
+        ])
+        itens = []
+        for pedido in lote:
+            produtos_da_loja = catalogos[pedido.restaurante_id]
+            for produto in rng.sample(produtos_da_loja, min(itens_por_pedido, len(produtos_da_loja))):
+                itens.append(ProdutoNoPedido(
+                    pedido=pedido, produto=produto, quantidade=rng.randint(1, 3), preco_unitario=produto.preco,
+                ))
+        ProdutoNoPedido.objects.bulk_create(itens, batch_size=batch_size)
+
+    return restaurante, usuarios, [p.id for p in catalogos[lojas[0].id]]
+
+
+class HttpClient:
+    """Cliente HTTP mínimo com cookies e CSRF, com a mesma interface de django.test.Client."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        self.opener.open(self.base_url + reverse('login')).read()  # obtém o cookie csrftoken
+
+    def _csrf(self):
+        return next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+
+    def _abrir(self, request):
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            return e.code
+
+    def get(self, path, data=None):
+        url = self.base_url + path + (f'?{urlencode(data)}' if data else '')
+        return self._abrir(Request(url))
+
+    def post(self, path, data=None):
+        request = Request(
+            self.base_url + path,
+            data=urlencode(data or {}).encode(),
+            headers={'X-CSRFToken': self._csrf(), 'Referer': self.base_url + path},
+        )
+        return self._abrir(request)
+
+
+class Benchmark:
+    def __init__(self, criar_cliente, restaurante, clientes, produtos, seed=0):
+        self.criar_cliente = criar_cliente
+        self.restaurante = restaurante
+        self.clientes = clientes
+        self.produtos = produtos
+        self.rng = random.Random(seed)
+        self.tempos = defaultdict(list)
+        self.consultas = defaultdict(list)
+        self.erros = defaultdict(int)
+
+    def medir(self, nome, metodo, path, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            inicio = time.perf_counter()
+            resposta = metodo(path, data)
+            self.tempos[nome].append((time.perf_counter() - inicio) * 1000)
+        self.consultas[nome].append(len(ctx.captured_queries))
+        status = resposta if isinstance(resposta, int) else resposta.status_code
+        if status >= 400:
+            self.erros[nome] += 1
+
+    def login(self, usuario, user_type):
+        client = self.criar_cliente()
+        self.medir('login', client.post, reverse('login'), {
+            'username': usuario.username, 'password': SENHA_BENCHMARK, 'user_type': user_type,
+        })
+        return client
+
+    def executar(self, iteracoes, itens_por_carrinho=3):
+        restaurante = self.login(self.restaurante, 'restaurante')
+        for _ in range(iteracoes):
+            cliente = self.login(self.rng.choice(self.clientes), 'cliente')
+            self.medir('home_cliente', cliente.get, reverse('home'))
+            self.medir('busca', cliente.get, reverse('search_products'), {'q': self.rng.choice(NOMES)[:4]})
+            for produto_id in self.rng.sample(self.produtos, min(itens_por_carrinho, len(self.produtos))):
+                self.medir('add_to_cart', cliente.post, reverse('add_to_cart', args=[produto_id]))
+            self.medir('cart', cliente.get, reverse('cart'))
+            self.medir('checkout', cliente.post, reverse('checkout'))
+
+            pedido_id = Pedido.objects.order_by('-id').values_list('id', flat=True).first()
+            self.medir('home_restaurante', restaurante.get, reverse('home'))
+            self.medir('detalhes_pedido', restaurante.get, reverse('detalhes-pedido', args=[pedido_id]))
+            self.medir('update_status', restaurante.post, reverse('update-status-pedido', args=[pedido_id]),
+                       {'status': 'em_preparo'})
+        return self.relatorio()
+
+    def relatorio(self):
+        return {
+            nome: {
+                'n': len(tempos),
+                'erros': self.erros[nome],
+                'mean_ms': round(statistics.fmean(tempos), 3),
+                'p50_ms': round(percentil(tempos, 50), 3),
+                'p95_ms': round(percentil(tempos, 95), 3),
+                'p99_ms': round(percentil(tempos, 99), 3),
+                'queries_mean': round(statistics.fmean(self.consultas[nome]), 2),
+                'queries_max': max(self.consultas[nome]),
+            }
+            for nome, tempos in self.tempos.items()
+        }
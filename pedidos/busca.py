@@ -0,0 +1,140 @@
+# pedidos/busca.py
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Produto
+
+# Tabela FTS5 (SQLite) com o nome e a categoria normalizados de cada produto.
+# O rowid da tabela é o id do produto.
+FTS_TABLE = 'pedidos_produto_fts'
+# No PostgreSQL: lower(unaccent(texto)), com índices GIN de trigramas sobre
+# nome e categoria (migração 0017)
+FUNCAO_NORMALIZAR = 'pedidos_normalizar'
+
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+# Peso de cada coluna no ranking bm25: nome pesa mais que categoria
+BM25_PESOS = (10.0, 2.0)
+
+
+def normalizar(texto):
+    """Remove acentos e coloca em minúsculas ("Hambúrguer" -> "hamburguer")."""
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def termos(texto):
+    return re.findall(r'\w+', normalizar(texto))
+
+
+def fts_disponivel():
+    return connection.vendor == 'sqlite'
+
+
+def indexar_produto(produto):
+    if not fts_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, nome, categoria) VALUES (%s, %s, %s)',
+            [produto.id, normalizar(produto.nome), normalizar(produto.categoria)],
+        )
+
+
+def indexar_produtos(produtos):
+    """Atualiza no índice só os produtos dados (por exemplo, um lote gravado com bulk_create)."""
+    if not fts_disponivel() or not produtos:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, nome, categoria) VALUES (%s, %s, %s)',
+            [(produto.id, normalizar(produto.nome), normalizar(produto.categoria)) for produto in produtos],
+        )
+
+
+def remover_produto(produto_id):
+    if not fts_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [produto_id])
+
+
+def reindexar(batch_size=1000):
+    """Reconstrói o índice inteiro (necessário após bulk_create/update, que não disparam sinais)."""
+    if not fts_disponivel():
+        return 0
+    total = 0
+    # Uma transação só: em autocommit cada INSERT do executemany seria um commit
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        lote = []
+        for produto_id, nome, categoria in Produto.objects.values_list('id', 'nome', 'categoria').iterator(chunk_size=batch_size):
+            lote.append((produto_id, normalizar(nome), normalizar(categoria)))
+            if len(lote) >= batch_size:
+                cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, nome, categoria) VALUES (%s, %s, %s)', lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, nome, categoria) VALUES (%s, %s, %s)', lote)
+            total += len(lote)
+    return total
+
+
+def buscar_produtos(query, limite=SEARCH_LIMIT):
+    """
+    Busca produtos por nome/categoria, ignorando acentos e casando por prefixo
+    ("hamb" encontra "Hambúrguer"). Os resultados vêm ordenados por relevância.
+    """
+    tokens = termos(query)
+    if not tokens:
+        return []
+    limite = max(1, min(limite, SEARCH_MAX_LIMIT))
+
+    if connection.vendor == 'postgresql':
+        return _buscar_postgresql(tokens, limite)
+
+    if not fts_disponivel():
+        # Fallback sem índice: todos os termos precisam aparecer no nome ou na categoria
+        filtro = Q()
+        for token in tokens:
+            filtro &= Q(nome__icontains=token) | Q(categoria__icontains=token)
+        return list(Produto.objects.filter(filtro).order_by('nome')[:limite])
+
+    # O FTS5 ranqueia todos os produtos que casam e guarda só os `limite`
+    # melhores (ORDER BY bm25 ... LIMIT direto no MATCH); o JOIN lê só esses.
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    return list(Produto.objects.raw(
+        f'SELECT p.id, p.nome, p.preco, p.categoria FROM ('
+        f'  SELECT rowid AS produto_id, bm25({FTS_TABLE}, %s, %s) AS score'
+        f'  FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY score LIMIT %s'
+        f') f JOIN pedidos_produto p ON p.id = f.produto_id '
+        f'ORDER BY f.score, p.nome',
+        [*BM25_PESOS, match, limite],
+    ))
+
+
+def _buscar_postgresql(tokens, limite):
+    """
+    Mesma semântica do FTS5: cada termo casa com o início de uma palavra
+    (\\m na regex) do nome ou da categoria, sem acentos. A regex usa os índices
+    de trigramas (termos com menos de 3 letras não têm trigramas e varrem a
+    tabela); o ranking dá ao nome o mesmo peso maior do bm25.
+    """
+    nome = f'{FUNCAO_NORMALIZAR}(p.nome)'
+    categoria = f'{FUNCAO_NORMALIZAR}(p.categoria)'
+    filtros = ' AND '.join(f'({nome} ~ %s OR {categoria} ~ %s)' for _ in tokens)
+    padroes = []
+    for token in tokens:
+        padroes += [rf'\m{token}', rf'\m{token}']
+    consulta = ' '.join(tokens)
+    peso_nome, peso_categoria = BM25_PESOS
+    return list(Produto.objects.raw(
+        f'SELECT p.id, p.nome, p.preco, p.categoria FROM pedidos_produto p WHERE {filtros} '
+        f'ORDER BY word_similarity(%s, {nome}) * {peso_nome} '
+        f'+ word_similarity(%s, {categoria}) * {peso_categoria} DESC, p.nome LIMIT %s',
+        [*padroes, consulta, consulta, limite],
+    ))
@@ -0,0 +1,115 @@
+# pedidos/cardapio.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .busca import SEARCH_MAX_LIMIT, buscar_produtos, termos
+from .models import Produto
+from .respostas import dumps
+
+# Toda entrada do cardápio em cache inclui a versão na chave. Qualquer
+# alteração em Produto incrementa a versão, o que invalida todas de uma vez.
+# Cada restaurante tem também a própria versão, usada pelo painel dele: uma
+# alteração num restaurante não descarta o cardápio em cache dos outros.
+VERSAO_KEY = 'cardapio:versao'
+
+
+def _versao_key(restaurante_id=None):
+    return VERSAO_KEY if restaurante_id is None else f'{VERSAO_KEY}:{restaurante_id}'
+
+
+def _timeout():
+    return getattr(settings, 'MENU_CACHE_TIMEOUT', 60 * 60)
+
+
+def _versao_inicial():
+    # Baseada no relógio para não reaproveitar chaves antigas caso a chave
+    # da versão seja descartada pelo cache antes das entradas do cardápio
+    return int(time.time() * 1000)
+
+
+def versao_cardapio(restaurante_id=None):
+    """Versão do cardápio completo ou, com `restaurante_id`, só do cardápio desse restaurante."""
+    key = _versao_key(restaurante_id)
+    versao = cache.get(key)
+    if versao is None:
+        cache.add(key, _versao_inicial(), timeout=None)
+        versao = cache.get(key)
+    return versao
+
+
+def _incrementar(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave ainda não existe (cache vazio ou expirado)
+        cache.add(key, _versao_inicial(), timeout=None)
+
+
+def invalidar_cardapio(restaurante_id=None):
+    _incrementar(VERSAO_KEY)
+    if restaurante_id is not None:
+        _incrementar(_versao_key(restaurante_id))
+
+
+def etag_cardapio():
+    return f'cardapio-{versao_cardapio()}'
+
+
+def produtos_cardapio(restaurante_id=None):
+    """
+    Lista de produtos (de todos os restaurantes, ou só de `restaurante_id`),
+    lida do banco só quando a versão correspondente muda.
+    """
+    if restaurante_id is None:
+        key = f'cardapio:{versao_cardapio()}:produtos'
+    else:
+        key = f'cardapio:{restaurante_id}:{versao_cardapio(restaurante_id)}:produtos'
+    produtos = cache.get(key)
+    if produtos is None:
+        if restaurante_id is None:
+            produtos = list(Produto.objects.all())
+        else:
+            produtos = list(Produto.objects.do_restaurante(restaurante_id))
+        cache.set(key, produtos, _timeout())
+    return produtos
+
+
+def dados_produto(produto):
+    """Produto como aparece nas respostas JSON do cardápio, da busca e do painel."""
+    return {
+        'id': produto.id,
+        'nome': produto.nome,
+        'preco': produto.preco,
+        'categoria': produto.categoria,
+    }
+
+
+def cardapio_json():
+    """
+    Cardápio completo já serializado (bytes JSON). Fica no cache pronto para
+    a resposta, então uma requisição não monta nem serializa a lista de novo.
+    """
+    key = f'cardapio:{versao_cardapio()}:json'
+    conteudo = cache.get(key)
+    if conteudo is None:
+        conteudo = dumps([dados_produto(produto) for produto in produtos_cardapio()])
+        cache.set(key, conteudo, _timeout())
+    return conteudo
+
+
+def buscar_produtos_json(query, limite):
+    """Resultado da busca já serializado (bytes JSON), em cache pela versão do cardápio."""
+    tokens = termos(query)
+    if not tokens:
+        return b'[]'
+    limite = max(1, min(limite, SEARCH_MAX_LIMIT))
+    digest = hashlib.md5(' '.join(tokens).encode()).hexdigest()
+    key = f'cardapio:{versao_cardapio()}:busca:{digest}:{limite}'
+    conteudo = cache.get(key)
+    if conteudo is None:
+        conteudo = dumps([dados_produto(produto) for produto in buscar_produtos(query, limite)])
+        cache.set(key, conteudo, _timeout())
+    return conteudo
@@ -0,0 +1,130 @@
+# pedidos/carrinho.py
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Carrinho, ItemCarrinho, Produto
+from .services import criar_pedido
+
+
+class OutroRestaurante(Exception):
+    """O carrinho já tem itens de outro restaurante (um pedido é de um restaurante só)."""
+
+
+def _tabela(modelo):
+    return connection.ops.quote_name(modelo._meta.db_table)
+
+
+CARRINHO, ITEM, PRODUTO = _tabela(Carrinho), _tabela(ItemCarrinho), _tabela(Produto)
+
+# Soma a quantidade ao contador e trava a linha do carrinho, desde que ele não
+# tenha itens de outro restaurante. Devolve o id do carrinho e o novo total.
+SOMAR_AO_CARRINHO = f'''
+    UPDATE {CARRINHO} SET quantidade_itens = quantidade_itens + %s
+    WHERE cliente_id = %s AND NOT EXISTS (
+        SELECT 1 FROM {ITEM} item JOIN {PRODUTO} produto ON produto.id = item.produto_id
+        WHERE item.carrinho_id = {CARRINHO}.id
+          AND produto.restaurante_id <> (SELECT restaurante_id FROM {PRODUTO} WHERE id = %s)
+    )
+    RETURNING id, quantidade_itens
+'''
+
+# Cria o item ou soma à quantidade do que já existe (SQLite >= 3.24 e PostgreSQL)
+SOMAR_ITEM = f'''
+    INSERT INTO {ITEM} (carrinho_id, produto_id, quantidade) VALUES (%s, %s, %s)
+    ON CONFLICT (carrinho_id, produto_id)
+    DO UPDATE SET quantidade = {ITEM}.quantidade + EXCLUDED.quantidade
+'''
+
+
+def obter_carrinho(cliente):
+    carrinho, _ = Carrinho.objects.get_or_create(cliente=cliente)
+    return carrinho
+
+
+def contar_itens(cliente):
+    """Quantidade total de itens no carrinho (lida de uma coluna, sem somar itens)."""
+    quantidade = Carrinho.objects.filter(cliente=cliente).values_list('quantidade_itens', flat=True).first()
+    return quantidade or 0
+
+
+def adicionar_item(cliente, produto_id, quantidade=1):
+    """
+    Soma `quantidade` ao item do carrinho e devolve o novo total de itens.
+
+    São dois comandos: o UPDATE do contador, que já confere o restaurante e
+    devolve o total, e o upsert do item. Só o primeiro item do cliente paga
+    a criação do carrinho.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(SOMAR_AO_CARRINHO, [quantidade, cliente.pk, produto_id])
+        linha = cursor.fetchone()
+        if linha is None:
+            _, criado = Carrinho.objects.get_or_create(cliente=cliente)
+            if not criado:
+                raise OutroRestaurante('O carrinho já tem produtos de outro restaurante.')
+            cursor.execute(SOMAR_AO_CARRINHO, [quantidade, cliente.pk, produto_id])
+            linha = cursor.fetchone()
+        carrinho_id, total = linha
+        cursor.execute(SOMAR_ITEM, [carrinho_id, produto_id, quantidade])
+    return total
+
+
+def _travar_carrinho(cliente):
+    """
+    Carrinho do cliente com a linha travada até o fim da transação (no SQLite
+    a transação IMMEDIATE já trava o banco). O UPDATE de adicionar_item trava
+    a mesma linha, então os itens não mudam entre a leitura e a escrita.
+    """
+    return Carrinho.objects.select_for_update().filter(cliente=cliente).first()
+
+
+def remover_item(cliente, produto_id):
+    with transaction.atomic():
+        carrinho = _travar_carrinho(cliente)
+        if carrinho is None:
+            return
+        item = ItemCarrinho.objects.filter(carrinho=carrinho, produto_id=produto_id).first()
+        if item is None:
+            return
+        item.delete()
+        Carrinho.objects.filter(pk=carrinho.pk).update(quantidade_itens=F('quantidade_itens') - item.quantidade)
+
+
+def itens_do_carrinho(cliente):
+    return list(
+        ItemCarrinho.objects.filter(carrinho__cliente=cliente).select_related('produto').order_by('id')
+    )
+
+
+def finalizar_carrinho(cliente):
+    """
+    Transforma o carrinho do cliente em um pedido e tira do carrinho, na mesma
+    transação, exatamente os itens que entraram no pedido.
+    """
+    with transaction.atomic():
+        carrinho = _travar_carrinho(cliente)
+        itens = list(carrinho.itens.values_list('id', 'produto_id', 'quantidade')) if carrinho else []
+        pedido = criar_pedido(cliente, {produto_id: quantidade for _, produto_id, quantidade in itens})
+        ItemCarrinho.objects.filter(id__in=[item_id for item_id, _, _ in itens]).delete()
+        Carrinho.objects.filter(pk=carrinho.pk).update(
+            quantidade_itens=F('quantidade_itens') - sum(quantidade for _, _, quantidade in itens)
+        )
+    return pedido
+
+
+def migrar_carrinho_da_sessao(request):
+    """
+    Move para o banco o carrinho antigo guardado na sessão ({produto_id: {'quantidade': n, ...}}),
+    se houver. Produtos que não existem mais são descartados.
+    """
+    cart = request.session.get('cart')
+    if cart is None:
+        return
+    produtos = Produto.objects.in_bulk([int(produto_id) for produto_id in cart])
+    for produto_id, item_data in cart.items():
+        if int(produto_id) in produtos and item_data.get('quantidade', 0) > 0:
+            try:
+                adicionar_item(request.user, int(produto_id), item_data['quantidade'])
+            except OutroRestaurante:
+                continue
+    del request.session['cart']
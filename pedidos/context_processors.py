@@ -0,0 +1,7 @@
+# pedidos/context_processors.py
+from django.conf import settings
+
+
+def cache_de_fragmentos(request):
+    """Timeout dos blocos {% cache %} dos templates (cards de produto e de pedido)."""
+    return {'fragment_cache_timeout': getattr(settings, 'MENU_CACHE_TIMEOUT', 60 * 60)}
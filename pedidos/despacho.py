@@ -0,0 +1,168 @@
+# pedidos/despacho.py
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .estatisticas import percentil
+from .models import Entrega, Pedido
+from .services import alterar_status
+
+# Pedidos neste status aguardam entregador; o despacho os leva para STATUS_SAIDA
+STATUS_AGUARDANDO = 'em_preparo'
+STATUS_SAIDA = 'saiu_para_entrega'
+
+
+class Pendente(NamedTuple):
+    id: int
+    restaurante_id: int
+    zona: str
+    desde: datetime
+
+
+def zona_unica(pedido):
+    """Zona padrão: todos os pedidos de um restaurante podem sair no mesmo lote."""
+    return ''
+
+
+@lru_cache(maxsize=None)
+def get_zona():
+    """
+    Função que recebe um Pedido (com o cliente carregado) e devolve a chave
+    da zona de entrega; só pedidos da mesma zona saem juntos.
+    """
+    return import_string(getattr(settings, 'PEDIDOS_DESPACHO_ZONA', 'pedidos.despacho.zona_unica'))
+
+
+def tamanho_maximo_padrao():
+    return getattr(settings, 'PEDIDOS_DESPACHO_TAMANHO_MAXIMO', 4)
+
+
+def espera_maxima_padrao():
+    return timedelta(seconds=getattr(settings, 'PEDIDOS_DESPACHO_ESPERA_MAXIMA', 10 * 60))
+
+
+def formar_lotes(pendentes, agora, tamanho_maximo, espera_maxima):
+    """
+    Agrupa os pedidos `pendentes` (Pendente) por restaurante e zona, do que
+    espera há mais tempo para o mais recente, e devolve os lotes que devem
+    sair em `agora`:
+
+    - cada `tamanho_maximo` pedidos de um grupo formam um lote cheio;
+    - o que sobra só sai quando o mais antigo completou `espera_maxima`.
+
+    Não acessa o banco: é usada tanto por despachar() quanto pela simulação.
+    """
+    grupos = defaultdict(list)
+    for pendente in sorted(pendentes, key=lambda p: (p.desde, p.id)):
+        grupos[(pendente.restaurante_id, pendente.zona)].append(pendente)
+
+    lotes = []
+    for fila in grupos.values():
+        cheios = len(fila) - len(fila) % tamanho_maximo
+        lotes.extend(fila[inicio:inicio + tamanho_maximo] for inicio in range(0, cheios, tamanho_maximo))
+        resto = fila[cheios:]
+        if resto and agora - resto[0].desde >= espera_maxima:
+            lotes.append(resto)
+    return lotes
+
+
+def pedidos_aguardando(restaurante_id=None):
+    pedidos = Pedido.objects.filter(status=STATUS_AGUARDANDO)
+    if restaurante_id is not None:
+        pedidos = pedidos.do_restaurante(restaurante_id)
+    return pedidos.with_cliente()
+
+
+def _despachar_lote(lote):
+    with transaction.atomic():
+        # UPDATE condicional de alterar_status: pedidos que o restaurante já
+        # despachou à mão enquanto isso ficam de fora do lote
+        ids = alterar_status(Pedido.objects.filter(id__in=[pendente.id for pendente in lote]), STATUS_SAIDA)
+        if not ids:
+            return None
+        entrega = Entrega.objects.create(restaurante_id=lote[0].restaurante_id, zona=lote[0].zona)
+        Pedido.objects.filter(id__in=ids).update(entrega=entrega)
+    return entrega
+
+
+def despachar(agora=None, restaurante_id=None, tamanho_maximo=None, espera_maxima=None):
+    """
+    Forma os lotes de entrega com os pedidos em preparo (de todos os
+    restaurantes, ou só de `restaurante_id`) e leva cada lote para "saiu para
+    entrega" numa transação própria. Devolve as Entregas criadas.
+    """
+    agora = agora or timezone.now()
+    tamanho_maximo = tamanho_maximo or tamanho_maximo_padrao()
+    espera_maxima = espera_maxima if espera_maxima is not None else espera_maxima_padrao()
+    zona = get_zona()
+
+    pendentes = [
+        Pendente(pedido.id, pedido.restaurante_id, str(zona(pedido)), pedido.status_alterado_em)
+        for pedido in pedidos_aguardando(restaurante_id)
+    ]
+    entregas = []
+    for lote in formar_lotes(pendentes, agora, tamanho_maximo, espera_maxima):
+        entrega = _despachar_lote(lote)
+        if entrega is not None:
+            entregas.append(entrega)
+    return entregas
+
+
+def simular_despacho(pedidos_por_hora, horas=8, zonas=1, restaurantes=1, tamanho_maximo=None,
+                     espera_maxima=None, intervalo=timedelta(seconds=30), seed=0):
+    """
+    Simula o despacho (sem banco) para um fluxo sintético de pedidos que ficam
+    prontos em instantes aleatórios (processo de Poisson), espalhados entre
+    `restaurantes` e `zonas`. O agendador roda a cada `intervalo`, como o
+    comando despachar_entregas; depois de `horas` ele continua rodando até
+    esvaziar a fila. Devolve vazão, tamanho dos lotes e espera dos pedidos.
+    """
+    rng = random.Random(seed)
+    tamanho_maximo = tamanho_maximo or tamanho_maximo_padrao()
+    espera_maxima = espera_maxima if espera_maxima is not None else espera_maxima_padrao()
+    inicio = datetime(2000, 1, 1)
+    fim = inicio + timedelta(hours=horas)
+
+    chegadas = []
+    instante = inicio
+    while True:
+        instante += timedelta(hours=rng.expovariate(pedidos_por_hora))
+        if instante >= fim:
+            break
+        chegadas.append(Pendente(len(chegadas) + 1, rng.randrange(restaurantes), str(rng.randrange(zonas)), instante))
+
+    pendentes, esperas, lotes = [], [], []
+    proxima = 0
+    agora = inicio
+    while proxima < len(chegadas) or pendentes:
+        agora += intervalo
+        while proxima < len(chegadas) and chegadas[proxima].desde <= agora:
+            pendentes.append(chegadas[proxima])
+            proxima += 1
+        despachados = set()
+        for lote in formar_lotes(pendentes, agora, tamanho_maximo, espera_maxima):
+            lotes.append(len(lote))
+            for pendente in lote:
+                esperas.append((agora - pendente.desde).total_seconds())
+                despachados.add(pendente.id)
+        pendentes = [pendente for pendente in pendentes if pendente.id not in despachados]
+
+    duracao_horas = (agora - inicio).total_seconds() / 3600
+    return {
+        'pedidos': len(chegadas),
+        'entregas': len(lotes),
+        'pedidos_por_entrega': round(len(chegadas) / len(lotes), 2) if lotes else 0,
+        'viagens_economizadas': len(chegadas) - len(lotes),
+        'pedidos_por_hora': round(len(chegadas) / duracao_horas, 2) if duracao_horas else 0,
+        'entregas_por_hora': round(len(lotes) / duracao_horas, 2) if duracao_horas else 0,
+        'espera_media_s': round(sum(esperas) / len(esperas), 1) if esperas else 0,
+        'espera_p95_s': round(percentil(esperas, 95), 1) if esperas else 0,
+        'espera_maxima_s': round(max(esperas), 1) if esperas else 0,
+    }
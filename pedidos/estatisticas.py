@@ -0,0 +1,8 @@
+# pedidos/estatisticas.py
+import math
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) de `valores` pelo método nearest-rank."""
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
@@ -0,0 +1,92 @@
+# pedidos/eventos.py
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+def canal_do_restaurante(restaurante_id):
+    return f'restaurante:{restaurante_id}'
+
+
+def canal_do_cliente(cliente_id):
+    return f'cliente:{cliente_id}'
+
+
+class InProcessBroker:
+    """
+    Broker de eventos em memória. Só entrega eventos aos assinantes do próprio
+    processo; com vários workers, use um broker compartilhado com a mesma
+    interface (publicar/escutar) em settings.PEDIDOS_EVENT_BROKER.
+    """
+
+    def __init__(self, max_pendentes=100):
+        self.max_pendentes = max_pendentes
+        self._assinantes = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publicar(self, canal, tipo, dados):
+        """Pode ser chamado de qualquer thread (inclusive das views síncronas)."""
+        with self._lock:
+            assinantes = list(self._assinantes[canal])
+        for loop, queue in assinantes:
+            try:
+                loop.call_soon_threadsafe(self._entregar, queue, (tipo, dados))
+            except RuntimeError:
+                # Loop já encerrado; o assinante some no próximo cancelamento
+                pass
+
+    @staticmethod
+    def _entregar(queue, evento):
+        try:
+            queue.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento demais: descarta em vez de acumular memória
+            pass
+
+    async def escutar(self, canais, keepalive=15):
+        """Gera (tipo, dados) para cada evento dos canais, ou None a cada `keepalive` segundos sem eventos."""
+        assinante = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_pendentes))
+        with self._lock:
+            for canal in canais:
+                self._assinantes[canal].add(assinante)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(assinante[1].get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                for canal in canais:
+                    self._assinantes[canal].discard(assinante)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, 'PEDIDOS_EVENT_BROKER', 'pedidos.eventos.InProcessBroker')
+    return import_string(path)()
+
+
+def publicar_pedido_criado(pedido):
+    get_broker().publicar(canal_do_restaurante(pedido.restaurante_id), 'pedido_criado', {
+        'id': pedido.id,
+        'cliente_nome': pedido.cliente.username,
+        'data_criacao': pedido.criado_em.strftime('%d/%m/%Y, %H:%M'),
+        'status': pedido.status,
+        'status_display': pedido.get_status_display(),
+        'total': str(pedido.total),
+    })
+
+
+def publicar_status_alterado(pedido):
+    dados = {
+        'id': pedido.id,
+        'status': pedido.status,
+        'status_display': pedido.get_status_display(),
+    }
+    broker = get_broker()
+    broker.publicar(canal_do_restaurante(pedido.restaurante_id), 'status_alterado', dados)
+    broker.publicar(canal_do_cliente(pedido.cliente_id), 'status_alterado', dados)
@@ -0,0 +1,123 @@
+# pedidos/exportacao.py
+import csv
+import heapq
+import io
+import json
+import zlib
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from operator import itemgetter
+
+from django.utils import timezone
+
+from .models import PedidoArquivado, ProdutoNoPedido
+
+# Uma linha por item de pedido, com os dados do pedido repetidos (formato de planilha contábil)
+CAMPOS_PEDIDOS = [
+    'pedido_id', 'criado_em', 'status', 'cliente', 'total',
+    'produto_id', 'produto_nome', 'quantidade', 'preco_unitario', 'subtotal',
+]
+EXPORT_CHUNK_SIZE = 2000
+# As linhas são agrupadas em trechos deste tamanho (caracteres) antes de ir para a resposta
+TAMANHO_TRECHO = 64 * 1024
+
+
+def periodo(inicio=None, fim=None):
+    """Filtros de criado_em para as datas `inicio` e `fim` (ambas inclusive, no fuso do projeto)."""
+    filtros = {}
+    if inicio is not None:
+        filtros['criado_em__gte'] = timezone.make_aware(datetime.combine(inicio, time.min))
+    if fim is not None:
+        filtros['criado_em__lt'] = timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min))
+    return filtros
+
+
+def _itens_ativos(restaurante_id, filtros, chunk_size):
+    # Um único SELECT com JOIN em pedido, cliente e produto, lido em blocos
+    filtros = {f'pedido__{campo}': valor for campo, valor in filtros.items()}
+    return (
+        ProdutoNoPedido.objects
+        .filter(pedido__restaurante_id=restaurante_id, **filtros)
+        .order_by('pedido__criado_em', 'pedido_id', 'id')
+        .values_list(
+            'pedido_id', 'pedido__criado_em', 'pedido__status', 'pedido__cliente__username', 'pedido__total',
+            'produto_id', 'produto__nome', 'quantidade', 'preco_unitario',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _itens_arquivados(restaurante_id, filtros, chunk_size):
+    pedidos = (
+        PedidoArquivado.objects
+        .filter(restaurante_id=restaurante_id, **filtros)
+        .order_by('criado_em', 'id')
+        .values_list('id', 'criado_em', 'status', 'cliente__username', 'total', 'itens')
+        .iterator(chunk_size=chunk_size)
+    )
+    for pedido_id, criado_em, status, cliente, total, itens in pedidos:
+        for item in itens:
+            yield (
+                pedido_id, criado_em, status, cliente, total,
+                item['produto_id'], item['produto_nome'], item['quantidade'], Decimal(item['preco_unitario']),
+            )
+
+
+def itens_exportados(restaurante_id, inicio=None, fim=None, status=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Gera uma tupla por item dos pedidos do restaurante, em ordem de criação,
+    juntando os pedidos ativos e os arquivados. As duas consultas são lidas
+    em paralelo com heapq.merge, então a memória não cresce com o histórico.
+    """
+    filtros = periodo(inicio, fim)
+    if status:
+        filtros['status'] = status
+    return heapq.merge(
+        _itens_arquivados(restaurante_id, filtros, chunk_size),
+        _itens_ativos(restaurante_id, filtros, chunk_size),
+        key=itemgetter(1, 0),
+    )
+
+
+def _formatar(itens, formato):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if formato == 'csv':
+        escritor.writerow(CAMPOS_PEDIDOS)
+    elif formato != 'jsonl':
+        raise ValueError(f'Formato desconhecido: {formato}')
+
+    for pedido_id, criado_em, status, cliente, total, produto_id, nome, quantidade, preco in itens:
+        linha = [
+            pedido_id, criado_em.isoformat(), status, cliente, str(total),
+            produto_id, nome, quantidade, str(preco), str(preco * quantidade),
+        ]
+        if formato == 'csv':
+            escritor.writerow(linha)
+        else:
+            buffer.write(json.dumps(dict(zip(CAMPOS_PEDIDOS, linha)), ensure_ascii=False) + '\n')
+        if buffer.tell() >= TAMANHO_TRECHO:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _gzip(trechos):
+    # wbits=31: fluxo no formato gzip (cabeçalho e CRC), comprimido conforme é gerado
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for trecho in trechos:
+        dados = compressor.compress(trecho.encode())
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def exportar_pedidos(restaurante_id, formato, inicio=None, fim=None, status=None, gzip=False,
+                     chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Gera o histórico de pedidos do restaurante em CSV ou JSON Lines, em trechos
+    de texto (ou de bytes gzip, com `gzip=True`) prontos para um StreamingHttpResponse.
+    """
+    trechos = _formatar(itens_exportados(restaurante_id, inicio, fim, status, chunk_size), formato)
+    return _gzip(trechos) if gzip else trechos
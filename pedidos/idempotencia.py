@@ -0,0 +1,94 @@
+# pedidos/idempotencia.py
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import ChaveIdempotencia
+from .respostas import JsonResponse
+
+# Header "Idempotency-Key" ou campo de formulário (para os forms HTML)
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+CAMPO = 'idempotency_key'
+TAMANHO_MAXIMO = 255
+VALIDADE = timedelta(hours=24)
+
+
+def chave_da_requisicao(request):
+    return request.META.get(HEADER) or request.POST.get(CAMPO) or None
+
+
+def _reproduzir(registro):
+    response = HttpResponse(registro.corpo, status=registro.status_code, content_type=registro.content_type or None)
+    if registro.location:
+        response['Location'] = registro.location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _registro_valido(usuario, chave):
+    return ChaveIdempotencia.objects.filter(
+        usuario=usuario, chave=chave, criado_em__gte=timezone.now() - VALIDADE
+    ).first()
+
+
+def idempotente(view):
+    """
+    POSTs com chave de idempotência executam a view uma única vez por usuário e
+    chave: a resposta fica gravada na mesma transação da view e as repetições
+    (duplo clique, retentativa da rede) recebem a resposta original sem escrever
+    nada. Sem chave, a view roda normalmente.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        chave = chave_da_requisicao(request)
+        if request.method != 'POST' or not chave:
+            return view(request, *args, **kwargs)
+        if len(chave) > TAMANHO_MAXIMO:
+            return JsonResponse({'success': False, 'error': 'Chave de idempotência muito longa.'}, status=400)
+
+        registro = _registro_valido(request.user, chave)
+        if registro is None:
+            with transaction.atomic():
+                # Chave expirada: pode ser reaproveitada
+                ChaveIdempotencia.objects.filter(
+                    usuario=request.user, chave=chave, criado_em__lt=timezone.now() - VALIDADE
+                ).delete()
+                try:
+                    with transaction.atomic():
+                        registro = ChaveIdempotencia.objects.create(
+                            usuario=request.user, chave=chave, caminho=request.path, status_code=0,
+                        )
+                except IntegrityError:
+                    # Uma requisição concorrente com a mesma chave terminou antes desta
+                    registro = None
+                else:
+                    response = view(request, *args, **kwargs)
+                    if response.status_code >= 500 or response.streaming:
+                        # Erros do servidor não são gravados: a retentativa executa de novo
+                        transaction.set_rollback(True)
+                        return response
+                    registro.status_code = response.status_code
+                    registro.content_type = response.get('Content-Type', '')
+                    registro.location = response.get('Location', '')
+                    registro.corpo = response.content
+                    registro.save(update_fields=['status_code', 'content_type', 'location', 'corpo'])
+                    return response
+            registro = _registro_valido(request.user, chave)
+            if registro is None:
+                return JsonResponse({'success': False, 'error': 'Requisição em andamento.'}, status=409)
+
+        if registro.caminho != request.path:
+            return JsonResponse(
+                {'success': False, 'error': 'Chave de idempotência já usada em outra operação.'}, status=422
+            )
+        return _reproduzir(registro)
+
+    return wrapper
+
+
+def limpar_chaves_expiradas():
+    removidas, _ = ChaveIdempotencia.objects.filter(criado_em__lt=timezone.now() - VALIDADE).delete()
+    return removidas
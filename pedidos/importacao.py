@@ -0,0 +1,193 @@
+# pedidos/importacao.py
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .busca import indexar_produtos
+from .cardapio import invalidar_cardapio
+from .exportacao import TAMANHO_TRECHO
+from .forms import ProdutoForm
+from .models import Produto
+
+CAMPOS_EXPORTACAO = ['id', 'nome', 'preco', 'categoria']
+FORMATOS = ('csv', 'jsonl')
+IMPORT_BATCH_SIZE = 500
+# Só os primeiros erros são guardados, para a memória não crescer com o arquivo
+MAX_ERROS_REPORTADOS = 1000
+
+
+def detectar_formato(nome_arquivo, formato=None):
+    if formato:
+        return formato
+    if nome_arquivo.endswith('.csv'):
+        return 'csv'
+    if nome_arquivo.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+class ArquivoInvalido(Exception):
+    """O arquivo não pôde mais ser lido a partir de `linha` (codificação ou CSV malformado)."""
+
+    def __init__(self, linha, mensagem):
+        super().__init__(mensagem)
+        self.linha = linha
+        self.mensagem = mensagem
+
+
+def ler_linhas(arquivo, formato):
+    """
+    Gera (número da linha, dict) lendo um arquivo de texto linha a linha. Se
+    o arquivo deixa de ser legível no meio, levanta ArquivoInvalido.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato desconhecido: {formato}')
+    numero = 0
+    try:
+        if formato == 'csv':
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                numero = leitor.line_num
+                yield numero, registro
+        else:
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    registro = None
+                yield numero, registro
+    except UnicodeDecodeError:
+        raise ArquivoInvalido(numero + 1, 'O arquivo não está em UTF-8.')
+    except csv.Error as erro:
+        raise ArquivoInvalido(numero + 1, f'CSV malformado: {erro}')
+
+
+def abrir_texto(arquivo_binario):
+    return io.TextIOWrapper(arquivo_binario, encoding='utf-8-sig', newline='')
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.importados = 0
+        self.com_erro = 0
+        self.erros = []
+
+    def registrar_erro(self, linha, erros):
+        self.com_erro += 1
+        if len(self.erros) < MAX_ERROS_REPORTADOS:
+            self.erros.append({'linha': linha, 'erros': erros})
+
+    def as_dict(self):
+        return {'importados': self.importados, 'com_erro': self.com_erro, 'erros': self.erros}
+
+
+def _gravar_lote(lote, restaurante_id, resultado):
+    """Grava o lote de (número da linha, produto); ids de produtos de outro restaurante viram erro."""
+    # Um id repetido no mesmo lote faria o upsert do PostgreSQL falhar ("cannot
+    # affect row a second time"): vale a última linha, como se fossem gravadas em ordem
+    ultima_linha = {produto.id: numero for numero, produto in lote if produto.id is not None}
+    ids = list(ultima_linha)
+    alheios = set(
+        Produto.objects.filter(id__in=ids).exclude(restaurante_id=restaurante_id).values_list('id', flat=True)
+    ) if ids else set()
+    produtos = []
+    for numero, produto in lote:
+        if produto.id in alheios:
+            resultado.registrar_erro(numero, {'id': ['Produto não encontrado.']})
+        elif produto.id is None or ultima_linha[produto.id] == numero:
+            produtos.append(produto)
+        else:
+            # Substituída por uma linha posterior com o mesmo id
+            resultado.importados += 1
+
+    with transaction.atomic():
+        # Linhas com id atualizam o produto existente; as sem id viram produtos novos
+        Produto.objects.bulk_create(
+            produtos,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=['nome', 'preco', 'categoria'],
+        )
+        # bulk_create não dispara os sinais de Produto: só as linhas do lote
+        # vão para o índice de busca (reindexar() fica para o comando)
+        indexar_produtos(produtos)
+    resultado.importados += len(produtos)
+
+
+def importar_produtos(linhas, restaurante_id, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Valida cada linha com as regras do ProdutoForm e grava em lotes, no
+    restaurante `restaurante_id`, com bulk_create(update_conflicts=True).
+    Só um lote fica em memória por vez.
+    """
+    resultado = ResultadoImportacao()
+    lote = []
+    try:
+        for numero, registro in linhas:
+            if not isinstance(registro, dict):
+                resultado.registrar_erro(numero, {'__all__': ['Linha inválida.']})
+                continue
+
+            form = ProdutoForm(registro)
+            if not form.is_valid():
+                resultado.registrar_erro(numero, form.errors.get_json_data())
+                continue
+
+            produto = form.save(commit=False)
+            produto.restaurante_id = restaurante_id
+            produto_id = registro.get('id')
+            if produto_id not in (None, ''):
+                try:
+                    produto.id = int(produto_id)
+                except (TypeError, ValueError):
+                    resultado.registrar_erro(numero, {'id': ['Id inválido.']})
+                    continue
+            lote.append((numero, produto))
+
+            if len(lote) >= batch_size:
+                _gravar_lote(lote, restaurante_id, resultado)
+                lote = []
+    except ArquivoInvalido as erro:
+        # O restante do arquivo não é lido; as linhas válidas até aqui são gravadas
+        resultado.registrar_erro(erro.linha, {'__all__': [erro.mensagem]})
+
+    if lote:
+        _gravar_lote(lote, restaurante_id, resultado)
+
+    if resultado.importados:
+        invalidar_cardapio(restaurante_id)
+    return resultado
+
+
+def exportar_produtos(formato, restaurante_id, chunk_size=2000):
+    """
+    Gera o catálogo do restaurante como texto CSV ou JSON Lines, em trechos de
+    TAMANHO_TRECHO caracteres (como a exportação de pedidos).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato desconhecido: {formato}')
+    produtos = (
+        Produto.objects.do_restaurante(restaurante_id).order_by('id')
+        .values_list(*CAMPOS_EXPORTACAO).iterator(chunk_size=chunk_size)
+    )
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if formato == 'csv':
+        escritor.writerow(CAMPOS_EXPORTACAO)
+    for produto_id, nome, preco, categoria in produtos:
+        if formato == 'csv':
+            escritor.writerow([produto_id, nome, preco, categoria])
+        else:
+            buffer.write(json.dumps(
+                {'id': produto_id, 'nome': nome, 'preco': str(preco), 'categoria': categoria},
+                ensure_ascii=False,
+            ) + '\n')
+        if buffer.tell() >= TAMANHO_TRECHO:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pedidos.arquivamento import ARCHIVE_BATCH_SIZE, arquivar_pedidos, data_de_corte, pedidos_arquivaveis
+
+
+class Command(BaseCommand):
+    help = 'Move os pedidos entregues mais antigos que --dias para a tabela de arquivo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Idade mínima (padrão: settings.PEDIDOS_ARQUIVAR_APOS_DIAS).')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Só conta os pedidos que seriam arquivados.')
+
+    def handle(self, *args, **options):
+        antes_de = data_de_corte(options['dias'])
+        if options['dry_run']:
+            total = pedidos_arquivaveis(antes_de).count()
+            self.stdout.write(f'{total} pedidos seriam arquivados (criados antes de {antes_de:%d/%m/%Y}).')
+            return
+        total = arquivar_pedidos(antes_de, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} pedidos arquivados.'))
@@ -0,0 +1,111 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.testcases import LiveServerThread, _StaticFilesHandler
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from pedidos.benchmark import Benchmark, HttpClient, popular_banco
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a latência (p50/p95/p99) e o número de consultas do fluxo de pedido '
+        '(login, busca, carrinho, checkout, status) em um banco de teste populado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurantes', type=int, default=1,
+                            help='Divide produtos e pedidos entre N restaurantes; o fluxo usa o primeiro.')
+        parser.add_argument('--clientes', type=int, default=100)
+        parser.add_argument('--produtos', type=int, default=1000)
+        parser.add_argument('--pedidos', type=int, default=5000)
+        parser.add_argument('--itens-por-pedido', type=int, default=3)
+        parser.add_argument('--iteracoes', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--http', action='store_true',
+                            help='Faz as requisições por HTTP a um servidor local em vez do cliente de teste.')
+        parser.add_argument('--output', help='Arquivo JSON com o resultado, para comparar execuções.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        cache.clear()
+        try:
+            # Mede a aplicação, não o rate limiting: o fluxo repete clientes em rajada
+            with override_settings(PEDIDOS_RATE_LIMIT_ATIVO=False):
+                resultado = self.executar(options)
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(resultado, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultado salvo em {options['output']}"))
+
+        self.stdout.write(f"{'endpoint':<18}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'queries':>9}")
+        for nome, dados in resultado['endpoints'].items():
+            self.stdout.write(
+                f"{nome:<18}{dados['n']:>6}{dados['p50_ms']:>10.2f}{dados['p95_ms']:>10.2f}"
+                f"{dados['p99_ms']:>10.2f}{dados['queries_mean']:>9.1f}"
+            )
+
+    def executar(self, options):
+        restaurante, clientes, produtos = popular_banco(
+            options['clientes'], options['produtos'], options['pedidos'],
+            options['itens_por_pedido'], seed=options['seed'], restaurantes=options['restaurantes'],
+        )
+
+        servidor = None
+        criar_cliente = Client
+        if options['http']:
+            servidor = self.iniciar_servidor()
+            base_url = f'http://{servidor.host}:{servidor.port}'
+            criar_cliente = lambda: HttpClient(base_url)  # noqa: E731
+
+        try:
+            benchmark = Benchmark(criar_cliente, restaurante, clientes, produtos, seed=options['seed'])
+            endpoints = benchmark.executar(options['iteracoes'])
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+
+        return {
+            'executado_em': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'banco': connection.vendor,
+            'modo': 'http' if options['http'] else 'client',
+            'config': {
+                chave: options[chave]
+                for chave in (
+                    'restaurantes', 'clientes', 'produtos', 'pedidos', 'itens_por_pedido', 'iteracoes', 'seed',
+                )
+            },
+            'endpoints': endpoints,
+        }
+
+    def iniciar_servidor(self):
+        # Mesmo esquema do LiveServerTestCase: o servidor compartilha a conexão
+        # com o banco de teste em memória (SQLite) com esta thread
+        overrides = {
+            conn.alias: conn for conn in connections.all()
+            if conn.vendor == 'sqlite' and conn.is_in_memory_db()
+        }
+        for conn in overrides.values():
+            conn.inc_thread_sharing()
+        # Restaurado por teardown_test_environment()
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'localhost']
+        servidor = LiveServerThread('localhost', _StaticFilesHandler, connections_override=overrides)
+        servidor.daemon = True
+        servidor.start()
+        servidor.is_ready.wait()
+        if servidor.error:
+            raise servidor.error
+        return servidor
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from pedidos.despacho import despachar
+
+
+class Command(BaseCommand):
+    help = (
+        'Agrupa os pedidos em preparo em lotes de entrega (por restaurante e zona) '
+        'e leva cada lote para "saiu para entrega".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', type=int, help='Despacha só os pedidos deste restaurante.')
+        parser.add_argument('--tamanho-maximo', type=int,
+                            help='Pedidos por lote (padrão: settings.PEDIDOS_DESPACHO_TAMANHO_MAXIMO).')
+        parser.add_argument('--espera-maxima', type=int,
+                            help='Segundos até um lote incompleto sair (padrão: settings.PEDIDOS_DESPACHO_ESPERA_MAXIMA).')
+        parser.add_argument('--intervalo', type=float, default=30.0, help='Segundos entre uma rodada e a próxima.')
+        parser.add_argument('--uma-vez', action='store_true', help='Executa uma rodada e termina.')
+
+    def handle(self, *args, **options):
+        espera_maxima = options['espera_maxima']
+        if espera_maxima is not None:
+            espera_maxima = timedelta(seconds=espera_maxima)
+        entregas = pedidos = 0
+        try:
+            while True:
+                for entrega in despachar(
+                    restaurante_id=options['restaurante'],
+                    tamanho_maximo=options['tamanho_maximo'],
+                    espera_maxima=espera_maxima,
+                ):
+                    entregas += 1
+                    pedidos += entrega.pedidos.count()
+                if options['uma_vez']:
+                    break
+                connections.close_all()
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'{entregas} entregas despachadas com {pedidos} pedidos.'))
@@ -0,0 +1,47 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pedidos.exportacao import EXPORT_CHUNK_SIZE, exportar_pedidos
+from pedidos.importacao import FORMATOS
+from pedidos.models import Pedido, Restaurante
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta o histórico de pedidos de um restaurante (um item por linha, incluindo '
+        'os pedidos arquivados) em CSV ou JSON Lines, com memória constante.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', type=int, required=True, help='Id do restaurante.')
+        parser.add_argument('--formato', choices=FORMATOS, default='csv')
+        parser.add_argument('--inicio', type=date.fromisoformat, help='Data inicial (AAAA-MM-DD), inclusive.')
+        parser.add_argument('--fim', type=date.fromisoformat, help='Data final (AAAA-MM-DD), inclusive.')
+        parser.add_argument('--status', choices=[status for status, _ in Pedido.STATUS_CHOICES])
+        parser.add_argument('--gzip', action='store_true', help='Comprime a saída com gzip.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', help='Arquivo de saída (padrão: saída padrão).')
+
+    def handle(self, *args, **options):
+        if not Restaurante.objects.filter(pk=options['restaurante']).exists():
+            raise CommandError(f"Restaurante {options['restaurante']} não existe.")
+
+        trechos = exportar_pedidos(
+            options['restaurante'], options['formato'], options['inicio'], options['fim'], options['status'],
+            gzip=options['gzip'], chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            if options['gzip']:
+                saida = open(options['output'], 'wb')
+            else:
+                saida = open(options['output'], 'w', encoding='utf-8', newline='')
+        else:
+            saida = sys.stdout.buffer if options['gzip'] else sys.stdout
+        try:
+            for trecho in trechos:
+                saida.write(trecho)
+        finally:
+            if options['output']:
+                saida.close()
@@ -0,0 +1,23 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from pedidos.importacao import FORMATOS, exportar_produtos
+
+
+class Command(BaseCommand):
+    help = 'Exporta o catálogo de produtos de um restaurante em CSV ou JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', type=int, required=True, help='Id do restaurante.')
+        parser.add_argument('--formato', choices=FORMATOS, default='csv')
+        parser.add_argument('--output', help='Arquivo de saída (padrão: saída padrão).')
+
+    def handle(self, *args, **options):
+        saida = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for trecho in exportar_produtos(options['formato'], options['restaurante']):
+                saida.write(trecho)
+        finally:
+            if options['output']:
+                saida.close()
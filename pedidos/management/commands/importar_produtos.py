@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pedidos.importacao import FORMATOS, IMPORT_BATCH_SIZE, abrir_texto, detectar_formato, importar_produtos, ler_linhas
+from pedidos.models import Restaurante
+
+
+class Command(BaseCommand):
+    help = 'Importa (cria ou atualiza pelo id) produtos de um restaurante de um arquivo CSV ou JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--restaurante', type=int, required=True, help='Id do restaurante.')
+        parser.add_argument('--formato', choices=FORMATOS)
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        formato = detectar_formato(options['arquivo'], options['formato'])
+        if formato is None:
+            raise CommandError('Não foi possível detectar o formato; use --formato.')
+        if not Restaurante.objects.filter(pk=options['restaurante']).exists():
+            raise CommandError(f"Restaurante {options['restaurante']} não existe.")
+
+        with open(options['arquivo'], 'rb') as arquivo:
+            resultado = importar_produtos(
+                ler_linhas(abrir_texto(arquivo), formato), options['restaurante'], options['batch_size'],
+            )
+
+        for erro in resultado.erros:
+            self.stderr.write(f"linha {erro['linha']}: {json.dumps(erro['erros'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.importados} produtos importados, {resultado.com_erro} linhas com erro.'
+        ))
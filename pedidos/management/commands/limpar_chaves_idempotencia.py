@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pedidos.idempotencia import limpar_chaves_expiradas
+
+
+class Command(BaseCommand):
+    help = 'Remove as chaves de idempotência expiradas.'
+
+    def handle(self, *args, **options):
+        removidas = limpar_chaves_expiradas()
+        self.stdout.write(self.style.SUCCESS(f'{removidas} chaves removidas.'))
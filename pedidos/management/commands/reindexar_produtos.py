@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from pedidos.busca import fts_disponivel, reindexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de produtos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not fts_disponivel():
+            self.stdout.write('Banco de dados sem suporte a FTS5; nada a fazer.')
+            return
+        total = reindexar(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} produtos indexados.'))
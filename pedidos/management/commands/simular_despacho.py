@@ -0,0 +1,59 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from pedidos.despacho import simular_despacho
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula o despacho em lotes para um fluxo sintético de pedidos (sem banco) '
+        'e mostra a vazão e a espera média dos pedidos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pedidos-por-hora', type=float, default=60)
+        parser.add_argument('--horas', type=float, default=8)
+        parser.add_argument('--zonas', type=int, default=1)
+        parser.add_argument('--restaurantes', type=int, default=1)
+        parser.add_argument('--tamanho-maximo', type=int, action='append',
+                            help='Pode ser repetido para comparar configurações.')
+        parser.add_argument('--espera-maxima', type=int, help='Segundos.')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre as rodadas do agendador.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Arquivo JSON com o resultado, para comparar execuções.')
+
+    def handle(self, *args, **options):
+        espera_maxima = options['espera_maxima']
+        if espera_maxima is not None:
+            espera_maxima = timedelta(seconds=espera_maxima)
+        resultados = {}
+        for tamanho_maximo in options['tamanho_maximo'] or [None]:
+            resultado = simular_despacho(
+                options['pedidos_por_hora'],
+                horas=options['horas'],
+                zonas=options['zonas'],
+                restaurantes=options['restaurantes'],
+                tamanho_maximo=tamanho_maximo,
+                espera_maxima=espera_maxima,
+                intervalo=timedelta(seconds=options['intervalo']),
+                seed=options['seed'],
+            )
+            resultados[str(tamanho_maximo or 'padrao')] = resultado
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(resultados, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultado salvo em {options['output']}"))
+
+        self.stdout.write(
+            f"{'lote':>6}{'pedidos':>9}{'entregas':>10}{'ped/entr':>10}{'entr/h':>9}"
+            f"{'espera':>9}{'p95':>9}{'máx':>9}"
+        )
+        for tamanho, dados in resultados.items():
+            self.stdout.write(
+                f"{tamanho:>6}{dados['pedidos']:>9}{dados['entregas']:>10}{dados['pedidos_por_entrega']:>10.2f}"
+                f"{dados['entregas_por_hora']:>9.2f}{dados['espera_media_s']:>8.0f}s"
+                f"{dados['espera_p95_s']:>8.0f}s{dados['espera_maxima_s']:>8.0f}s"
+            )
@@ -0,0 +1,35 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from pedidos.tarefas import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano da fila (agregados de relatório etc.).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--lote', type=int, default=50, help='Tarefas reservadas por vez.')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--uma-vez', action='store_true', help='Esvazia a fila e termina.')
+
+    def handle(self, *args, **options):
+        total = 0
+        with ThreadPoolExecutor(max_workers=options['threads'], thread_name_prefix='tarefa') as executor:
+            try:
+                while True:
+                    executadas = processar_pendentes(options['lote'], executor)
+                    total += executadas
+                    if executadas:
+                        continue
+                    if options['uma_vez']:
+                        break
+                    connections.close_all()
+                    time.sleep(options['intervalo'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(f'{total} tarefas executadas.'))
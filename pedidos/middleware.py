@@ -0,0 +1,256 @@
+# pedidos/middleware.py
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+logger = logging.getLogger('pedidos.instrumentacao')
+
+_medicao_atual = ContextVar('medicao_atual', default=None)
+
+# "IN (%s, %s, %s)" e "IN (%s)" são a mesma consulta para fins de N+1
+_LISTA_DE_PARAMETROS = re.compile(r'\((?:%s, )*%s\)')
+
+
+def forma_da_consulta(sql):
+    return _LISTA_DE_PARAMETROS.sub('(%s...)', sql)
+
+
+class Medicao:
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.session_ms = 0.0
+        self.template_ms = 0.0
+        self.formas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Usado como connection.execute_wrapper
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = (time.perf_counter() - inicio) * 1000
+            self.queries += 1
+            if 'django_session' in sql:
+                self.session_ms += duracao
+            else:
+                self.db_ms += duracao
+            self.formas[forma_da_consulta(sql)] += 1
+
+    def suspeitas_n_mais_1(self, limite):
+        return [(forma, n) for forma, n in self.formas.items() if n >= limite]
+
+
+def _instrumentar_templates():
+    """Mede o tempo de render() dos templates do Django (uma vez por processo)."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'instrumentado', False):
+        return
+    render_original = Template.render
+
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return render_original(self, context, request)
+        inicio = time.perf_counter()
+        try:
+            return render_original(self, context, request)
+        finally:
+            medicao.template_ms += (time.perf_counter() - inicio) * 1000
+
+    render.instrumentado = True
+    Template.render = render
+
+
+class Metricas:
+    """Agregados por view, mantidos em memória no processo."""
+
+    CAMPOS = ('total_ms', 'db_ms', 'session_ms', 'template_ms', 'queries')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = defaultdict(lambda: {
+            'requests': 0, 'n_mais_1': 0, 'max_total_ms': 0.0, **{campo: 0.0 for campo in self.CAMPOS}
+        })
+
+    def registrar(self, view, total_ms, medicao, n_mais_1):
+        with self._lock:
+            dados = self._dados[view]
+            dados['requests'] += 1
+            dados['n_mais_1'] += int(n_mais_1)
+            dados['max_total_ms'] = max(dados['max_total_ms'], total_ms)
+            dados['total_ms'] += total_ms
+            dados['db_ms'] += medicao.db_ms
+            dados['session_ms'] += medicao.session_ms
+            dados['template_ms'] += medicao.template_ms
+            dados['queries'] += medicao.queries
+
+    def resumo(self):
+        with self._lock:
+            return {
+                view: {
+                    'requests': dados['requests'],
+                    'n_mais_1': dados['n_mais_1'],
+                    'max_total_ms': round(dados['max_total_ms'], 3),
+                    **{f'avg_{campo}': round(dados[campo] / dados['requests'], 3) for campo in self.CAMPOS},
+                }
+                for view, dados in self._dados.items()
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+
+metricas = Metricas()
+
+
+class InstrumentacaoMiddleware:
+    """
+    Mede, por requisição, consultas SQL (quantidade e tempo), I/O de sessão,
+    render de templates e tempo total, e devolve tudo no header Server-Timing.
+    Deve ficar antes do SessionMiddleware para incluir o salvamento da sessão.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTACAO_ATIVA', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limite_n_mais_1 = getattr(settings, 'INSTRUMENTACAO_N_MAIS_1_LIMITE', 5)
+        _instrumentar_templates()
+
+    def __call__(self, request):
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(medicao):
+                response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        suspeitas = medicao.suspeitas_n_mais_1(self.limite_n_mais_1)
+        for forma, n in suspeitas:
+            logger.warning('Possível N+1 em %s: %d consultas com a forma %s', view, n, forma)
+        metricas.registrar(view, total_ms, medicao, bool(suspeitas))
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={medicao.db_ms:.2f};desc="{medicao.queries} queries"',
+            f'session;dur={medicao.session_ms:.2f}',
+            f'tpl;dur={medicao.template_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+        if suspeitas:
+            response['X-N-Plus-One'] = str(len(suspeitas))
+        return response
+
+
+# Respostas de dados (cardápio, busca, pedidos, exportações). O HTML fica de
+# fora por padrão: as páginas não são grandes e já passam pelo cache de fragmentos.
+TIPOS_COMPRIMIDOS = ('application/json', 'application/x-ndjson', 'text/csv')
+BROTLI_QUALIDADE = 5
+# Mesmo enchimento aleatório do GZipMiddleware do Django (mitigação do BREACH)
+MAX_BYTES_ALEATORIOS = 100
+
+
+def codificacoes_aceitas(accept_encoding):
+    """Codificações do header Accept-Encoding com q > 0."""
+    aceitas = set()
+    for parte in accept_encoding.split(','):
+        nome, _, parametros = parte.partition(';')
+        parametros = parametros.strip().replace(' ', '')
+        if parametros.startswith('q='):
+            try:
+                if float(parametros[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+def _brotli_trechos(trechos):
+    compressor = brotli.Compressor(quality=BROTLI_QUALIDADE)
+    for trecho in trechos:
+        dados = compressor.process(trecho)
+        if dados:
+            yield dados
+    yield compressor.finish()
+
+
+class CompressaoMiddleware:
+    """
+    Comprime com brotli (se o pacote estiver instalado) ou gzip as respostas
+    dos tipos em PEDIDOS_COMPRESSAO_TIPOS com pelo menos PEDIDOS_COMPRESSAO_MINIMO
+    bytes. Respostas em streaming (exportações) são comprimidas conforme são
+    geradas; SSE (text/event-stream) nunca, para não segurar os eventos no buffer.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.minimo = getattr(settings, 'PEDIDOS_COMPRESSAO_MINIMO', 1024)
+        self.tipos = tuple(getattr(settings, 'PEDIDOS_COMPRESSAO_TIPOS', TIPOS_COMPRIMIDOS))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or response.status_code in (206, 304):
+            return response
+        tipo = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if tipo not in self.tipos:
+            return response
+        if not response.streaming and len(response.content) < self.minimo:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        aceitas = codificacoes_aceitas(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in aceitas:
+            codificacao = 'br'
+        elif 'gzip' in aceitas:
+            codificacao = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            if codificacao == 'br':
+                response.streaming_content = _brotli_trechos(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=MAX_BYTES_ALEATORIOS,
+                )
+            del response.headers['Content-Length']
+        else:
+            if codificacao == 'br':
+                comprimido = brotli.compress(response.content, quality=BROTLI_QUALIDADE)
+            else:
+                comprimido = compress_string(response.content, max_random_bytes=MAX_BYTES_ALEATORIOS)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers['Content-Length'] = str(len(comprimido))
+
+        # O ETag forte vira fraco: o corpo mudou, mas If-None-Match continua valendo
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codificacao
+        return response
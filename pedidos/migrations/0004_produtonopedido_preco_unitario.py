@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copia_preco_atual(apps, schema_editor):
+    # Pedidos antigos não guardavam o preço; usa o preço atual do produto
+    Produto = apps.get_model('pedidos', 'Produto')
+    ProdutoNoPedido = apps.get_model('pedidos', 'ProdutoNoPedido')
+    ProdutoNoPedido.objects.update(
+        preco_unitario=Subquery(Produto.objects.filter(pk=OuterRef('produto_id')).values('preco')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0003_remove_produto_imagem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produtonopedido',
+            name='preco_unitario',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copia_preco_atual, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:30
+
+import unicodedata
+
+from django.db import migrations
+
+FTS_TABLE = 'pedidos_produto_fts'
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def cria_indice(apps, schema_editor):
+    # O índice FTS5 só existe no SQLite; nos outros bancos a busca usa o fallback
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Produto = apps.get_model('pedidos', 'Produto')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5(nome, categoria, tokenize='unicode61 remove_diacritics 2')"
+    )
+    for produto in Produto.objects.all().iterator():
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, nome, categoria) VALUES (%s, %s, %s)',
+            [produto.id, normalizar(produto.nome), normalizar(produto.categoria)],
+        )
+
+
+def remove_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0004_produtonopedido_preco_unitario'),
+    ]
+
+    operations = [
+        migrations.RunPython(cria_indice, remove_indice),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0005_produto_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Carrinho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantidade_itens', models.PositiveIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='carrinho', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ItemCarrinho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantidade', models.PositiveIntegerField(default=1)),
+                ('carrinho', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itens', to='pedidos.carrinho')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pedidos.produto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('carrinho', 'produto'), name='unique_produto_por_carrinho')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def calcula_agregados(apps, schema_editor):
+    # Preenche as tabelas de relatório com o histórico existente
+    Pedido = apps.get_model('pedidos', 'Pedido')
+    ProdutoNoPedido = apps.get_model('pedidos', 'ProdutoNoPedido')
+    VendaDiariaProduto = apps.get_model('pedidos', 'VendaDiariaProduto')
+    ReceitaDiaria = apps.get_model('pedidos', 'ReceitaDiaria')
+    ContagemStatus = apps.get_model('pedidos', 'ContagemStatus')
+
+    vendas = (
+        ProdutoNoPedido.objects.annotate(data=TruncDate('pedido__criado_em'))
+        .values('data', 'produto_id')
+        .annotate(total_quantidade=Sum('quantidade'), total_receita=Sum(F('quantidade') * F('preco_unitario')))
+    )
+    VendaDiariaProduto.objects.bulk_create([
+        VendaDiariaProduto(
+            data=linha['data'], produto_id=linha['produto_id'],
+            quantidade=linha['total_quantidade'], receita=linha['total_receita'],
+        )
+        for linha in vendas
+    ], batch_size=1000)
+
+    receitas = (
+        Pedido.objects.annotate(data=TruncDate('criado_em'))
+        .values('data')
+        .annotate(total_pedidos=Count('id'), total_receita=Sum('total'))
+    )
+    ReceitaDiaria.objects.bulk_create([
+        ReceitaDiaria(data=linha['data'], pedidos=linha['total_pedidos'], receita=linha['total_receita'])
+        for linha in receitas
+    ], batch_size=1000)
+
+    ContagemStatus.objects.bulk_create([
+        ContagemStatus(status=linha['status'], quantidade=linha['total'])
+        for linha in Pedido.objects.values('status').annotate(total=Count('id'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0006_carrinho_itemcarrinho'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContagemStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pedido', 'Pedido'), ('em_preparo', 'Em preparo'), ('saiu_para_entrega', 'Saiu para entrega')], max_length=20, unique=True)),
+                ('quantidade', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReceitaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(unique=True)),
+                ('pedidos', models.PositiveIntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VendaDiariaProduto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendas_diarias', to='pedidos.produto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('data', 'produto'), name='unique_venda_diaria_produto')],
+            },
+        ),
+        migrations.RunPython(calcula_agregados, migrations.RunPython.noop),
+    ]
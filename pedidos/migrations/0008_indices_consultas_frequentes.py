@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0007_relatorios'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['cliente', '-criado_em'], name='pedido_cliente_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['-criado_em', '-id'], name='pedido_criado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['status', '-criado_em', '-id'], name='pedido_status_criado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['nome'], name='produto_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['categoria', 'nome'], name='produto_categoria_nome_idx'),
+        ),
+    ]
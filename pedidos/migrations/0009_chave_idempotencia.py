@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0008_indices_consultas_frequentes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChaveIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=255)),
+                ('caminho', models.CharField(max_length=255)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('corpo', models.BinaryField(default=b'')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chaves_idempotencia', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'chave'), name='unique_chave_idempotencia_por_usuario')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0009_chave_idempotencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('funcao', models.CharField(max_length=255)),
+                ('argumentos', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('max_tentativas', models.PositiveIntegerField(default=5)),
+                ('executar_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reservada_por', models.CharField(blank=True, max_length=64)),
+                ('reservada_em', models.DateTimeField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'executar_em'], name='tarefa_status_executar_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0010_tarefa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PedidoArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pedido', 'Pedido'), ('em_preparo', 'Em preparo'), ('saiu_para_entrega', 'Saiu para entrega')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('criado_em', models.DateTimeField()),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+                ('itens', models.JSONField(default=list)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pedidos_arquivados', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cliente', '-criado_em'], name='arquivado_cliente_criado_idx')],
+            },
+        ),
+    ]
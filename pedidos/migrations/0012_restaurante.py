@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0011_pedidoarquivado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Restaurante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='vendadiariaproduto',
+            name='unique_venda_diaria_produto',
+        ),
+        migrations.RemoveIndex(
+            model_name='pedido',
+            name='pedido_criado_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pedido',
+            name='pedido_status_criado_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='produto',
+            name='produto_categoria_nome_idx',
+        ),
+        migrations.AlterField(
+            model_name='contagemstatus',
+            name='status',
+            field=models.CharField(choices=[('pedido', 'Pedido'), ('em_preparo', 'Em preparo'), ('saiu_para_entrega', 'Saiu para entrega')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='receitadiaria',
+            name='data',
+            field=models.DateField(),
+        ),
+        migrations.AddField(
+            model_name='contagemstatus',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pedidos', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='pedidoarquivado',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pedidos_arquivados', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='produto',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='produtos', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='receitadiaria',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='restaurante',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='equipe', to='pedidos.restaurante'),
+        ),
+        migrations.AddField(
+            model_name='vendadiariaproduto',
+            name='restaurante',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['restaurante', '-criado_em', '-id'], name='pedido_rest_criado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['restaurante', 'status', '-criado_em', '-id'], name='pedido_rest_status_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['restaurante', 'categoria', 'nome'], name='produto_rest_categoria_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contagemstatus',
+            constraint=models.UniqueConstraint(fields=('restaurante', 'status'), name='unique_contagem_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='receitadiaria',
+            constraint=models.UniqueConstraint(fields=('restaurante', 'data'), name='unique_receita_diaria'),
+        ),
+        migrations.AddConstraint(
+            model_name='vendadiariaproduto',
+            constraint=models.UniqueConstraint(fields=('restaurante', 'data', 'produto'), name='unique_venda_diaria_produto'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+MODELOS_COM_RESTAURANTE = [
+    'Produto', 'Pedido', 'PedidoArquivado', 'VendaDiariaProduto', 'ReceitaDiaria', 'ContagemStatus',
+]
+
+
+def cria_restaurante_padrao(apps, schema_editor):
+    # Antes dos tenants o sistema atendia um único restaurante: todos os dados
+    # existentes (e os usuários do tipo restaurante) passam a ser dele
+    Restaurante = apps.get_model('pedidos', 'Restaurante')
+    User = apps.get_model('pedidos', 'User')
+    Tarefa = apps.get_model('pedidos', 'Tarefa')
+    modelos = [apps.get_model('pedidos', nome) for nome in MODELOS_COM_RESTAURANTE]
+
+    usuarios = User.objects.filter(user_type='restaurante')
+    if not usuarios.exists() and not any(modelo.objects.exists() for modelo in modelos):
+        return
+
+    padrao = Restaurante.objects.create(nome='Restaurante principal')
+    usuarios.update(restaurante=padrao)
+    for modelo in modelos:
+        modelo.objects.update(restaurante=padrao)
+
+    # Tarefas de relatório ainda na fila passam a receber o restaurante
+    for tarefa in Tarefa.objects.filter(
+        funcao='pedidos.relatorios.registrar_mudanca_status', status__in=['pendente', 'executando'],
+    ):
+        tarefa.argumentos['restaurante_id'] = padrao.id
+        tarefa.save(update_fields=['argumentos'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0012_restaurante'),
+    ]
+
+    operations = [
+        migrations.RunPython(cria_restaurante_padrao, migrations.RunPython.noop),
+    ]
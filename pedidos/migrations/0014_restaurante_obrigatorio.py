@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0013_restaurante_padrao'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contagemstatus',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pedidos', to='pedidos.restaurante'),
+        ),
+        migrations.AlterField(
+            model_name='pedidoarquivado',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pedidos_arquivados', to='pedidos.restaurante'),
+        ),
+        migrations.AlterField(
+            model_name='produto',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='produtos', to='pedidos.restaurante'),
+        ),
+        migrations.AlterField(
+            model_name='receitadiaria',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+        migrations.AlterField(
+            model_name='vendadiariaproduto',
+            name='restaurante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pedidos.restaurante'),
+        ),
+    ]
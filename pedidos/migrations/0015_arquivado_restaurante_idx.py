@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0014_restaurante_obrigatorio'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedidoarquivado',
+            index=models.Index(fields=['restaurante', '-criado_em', '-id'], name='arquivado_rest_criado_idx'),
+        ),
+    ]
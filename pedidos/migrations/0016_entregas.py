@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def status_alterado_na_criacao(apps, schema_editor):
+    # Sem histórico de status, a melhor estimativa para os pedidos existentes é a criação
+    Pedido = apps.get_model('pedidos', 'Pedido')
+    Pedido.objects.update(status_alterado_em=F('criado_em'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0015_arquivado_restaurante_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pedido',
+            name='status_alterado_em',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(status_alterado_na_criacao, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Entrega',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zona', models.CharField(blank=True, max_length=100)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('restaurante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='pedidos.restaurante')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='entrega',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pedidos', to='pedidos.entrega'),
+        ),
+    ]
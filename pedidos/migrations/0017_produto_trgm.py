@@ -0,0 +1,42 @@
+from django.db import migrations
+
+FUNCAO_NORMALIZAR = 'pedidos_normalizar'
+
+
+def cria_indices(apps, schema_editor):
+    # Índices de trigramas só no PostgreSQL; no SQLite a busca usa o FTS5 (0005)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # unaccent() não é IMMUTABLE (depende do dicionário configurado), então não
+    # pode ir num índice de expressão; a função fixa o dicionário e pode
+    schema_editor.execute(
+        f"CREATE OR REPLACE FUNCTION {FUNCAO_NORMALIZAR}(texto text) RETURNS text "
+        f"LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE "
+        f"AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto)) $$"
+    )
+    for coluna in ('nome', 'categoria'):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS produto_{coluna}_trgm_idx ON pedidos_produto '
+            f'USING gin ({FUNCAO_NORMALIZAR}({coluna}) gin_trgm_ops)'
+        )
+
+
+def remove_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for coluna in ('nome', 'categoria'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS produto_{coluna}_trgm_idx')
+    schema_editor.execute(f'DROP FUNCTION IF EXISTS {FUNCAO_NORMALIZAR}(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0016_entregas'),
+    ]
+
+    operations = [
+        migrations.RunPython(cria_indices, remove_indices),
+    ]
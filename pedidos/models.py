@@ -1,5 +1,9 @@
 # pedidos/models.py
-from django.db import models
+from decimal import Decimal
+
+from django.db import connections, models
+from django.db.models.functions import Now
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 # Modelo de Usuário Personalizado
@@ -13,6 +17,10 @@ class User(AbstractUser):
         choices=USER_TYPE_CHOICES,
         default="cliente",
     )
+    # Restaurante (tenant) do qual o usuário faz parte; só para user_type "restaurante"
+    restaurante = models.ForeignKey(
+        'Restaurante', on_delete=models.PROTECT, null=True, blank=True, related_name='equipe',
+    )
     groups = models.ManyToManyField(
         'auth.Group',
         related_name='pedidos_user_set',
@@ -30,15 +38,87 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+# Restaurante (tenant): produtos, pedidos e relatórios pertencem a um só
+class Restaurante(models.Model):
+    nome = models.CharField(max_length=255)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.nome
+
+
+class RestauranteQuerySet(models.QuerySet):
+    def do_restaurante(self, restaurante):
+        """Só as linhas de um restaurante (instância ou id); é o filtro das telas do painel."""
+        return self.filter(restaurante=restaurante)
+
+
 # Modelo de Produtos
 class Produto(models.Model):
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='produtos')
     nome = models.CharField(max_length=255)
     preco = models.DecimalField(max_digits=10, decimal_places=2)
     categoria = models.CharField(max_length=100)
 
+    objects = RestauranteQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['nome'], name='produto_nome_idx'),
+            # Cardápio de um restaurante, por categoria
+            models.Index(fields=['restaurante', 'categoria', 'nome'], name='produto_rest_categoria_idx'),
+        ]
+
     def __str__(self):
         return self.nome
 
+class TransicaoInvalida(ValueError):
+    pass
+
+
+class PedidoQuerySet(RestauranteQuerySet):
+    def with_cliente(self):
+        # Evita uma consulta por pedido ao acessar pedido.cliente
+        return self.select_related('cliente')
+
+    def with_itens(self):
+        # Carrega os itens e seus produtos em uma única consulta extra
+        return self.prefetch_related(
+            models.Prefetch('itens', queryset=ProdutoNoPedido.objects.select_related('produto'))
+        )
+
+    def transitar(self, de, para):
+        """
+        Move de `de` para `para` todos os pedidos do queryset que ainda estão em `de`,
+        com um único UPDATE ... WHERE status = `de`. Devolve quantos mudaram; quem
+        já tinha sido alterado por outra requisição simplesmente não é afetado.
+        """
+        if para not in Pedido.TRANSICOES.get(de, ()):
+            raise TransicaoInvalida(f'Transição inválida: {de} -> {para}.')
+        return self.filter(status=de).update(status=para, status_alterado_em=Now())
+
+    def transitar_ids(self, de, para):
+        """
+        Como transitar(), mas devolve os ids que o próprio UPDATE moveu
+        (UPDATE ... RETURNING, SQLite >= 3.35 e PostgreSQL), e não os que
+        estão em `para` depois dele: outra transação pode ter levado os
+        mesmos pedidos para `para` no meio tempo.
+        """
+        if para not in Pedido.TRANSICOES.get(de, ()):
+            raise TransicaoInvalida(f'Transição inválida: {de} -> {para}.')
+        connection = connections[self.db]
+        subconsulta, params = self.filter(status=de).values('pk').query.sql_with_params()
+        tabela = connection.ops.quote_name(self.model._meta.db_table)
+        agora = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {tabela} SET status = %s, status_alterado_em = %s '
+                f'WHERE status = %s AND id IN ({subconsulta}) RETURNING id',
+                [para, agora, de, *params],
+            )
+            return sorted(linha[0] for linha in cursor.fetchall())
+
+
 # Modelo de Pedidos
 class Pedido(models.Model):
     STATUS_CHOICES = (
@@ -46,6 +126,13 @@ class Pedido(models.Model):
         ("em_preparo", "Em preparo"),
         ("saiu_para_entrega", "Saiu para entrega"),
     )
+    # Próximos status permitidos a partir de cada status
+    TRANSICOES = {
+        "pedido": ("em_preparo",),
+        "em_preparo": ("saiu_para_entrega",),
+        "saiu_para_entrega": (),
+    }
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='pedidos')
     cliente = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pedidos')
     status = models.CharField(
         max_length=20,
@@ -54,15 +141,225 @@ class Pedido(models.Model):
     )
     total = models.DecimalField(max_digits=10, decimal_places=2)
     criado_em = models.DateTimeField(auto_now_add=True)
+    # Quando o pedido chegou ao status atual (o despacho mede a espera a partir daqui)
+    status_alterado_em = models.DateTimeField(default=timezone.now)
+    # Lote de entrega em que o pedido saiu (pedidos/despacho.py)
+    entrega = models.ForeignKey('Entrega', on_delete=models.SET_NULL, null=True, blank=True, related_name='pedidos')
+
+    objects = PedidoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # "Meus pedidos" do cliente, do mais recente para o mais antigo
+            models.Index(fields=['cliente', '-criado_em'], name='pedido_cliente_criado_idx'),
+            # Feed de um restaurante (keyset em criado_em, id), com e sem filtro de status
+            models.Index(fields=['restaurante', '-criado_em', '-id'], name='pedido_rest_criado_id_idx'),
+            models.Index(fields=['restaurante', 'status', '-criado_em', '-id'], name='pedido_rest_status_criado_idx'),
+        ]
+
+    @classmethod
+    def origens(cls, status):
+        """Status a partir dos quais se pode chegar em `status`."""
+        return [de for de, destinos in cls.TRANSICOES.items() if status in destinos]
+
+    @property
+    def proximos_status(self):
+        return self.TRANSICOES.get(self.status, ())
 
     def __str__(self):
         return f"Pedido #{self.id} de {self.cliente.username}"
 
+# Lote de pedidos que saem juntos para entrega
+class Entrega(models.Model):
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='entregas')
+    zona = models.CharField(max_length=100, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    objects = RestauranteQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Entrega #{self.id}"
+
 # Modelo de Produto no Pedido
 class ProdutoNoPedido(models.Model):
     pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='itens')
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
     quantidade = models.IntegerField(default=1)
+    # Preço do produto no momento do pedido
+    preco_unitario = models.DecimalField(max_digits=10, decimal_places=2)
+
+    @property
+    def subtotal(self):
+        return self.preco_unitario * self.quantidade
+
+    @property
+    def produto_nome(self):
+        return self.produto.nome
 
     def __str__(self):
-        return f"{self.quantidade}x {self.produto.nome} em Pedido #{self.pedido.id}"
\ No newline at end of file
+        return f"{self.quantidade}x {self.produto.nome} em Pedido #{self.pedido_id}"
+
+# Modelo de Carrinho (um por cliente)
+class Carrinho(models.Model):
+    cliente = models.OneToOneField(User, on_delete=models.CASCADE, related_name='carrinho')
+    # Soma das quantidades dos itens, mantida junto com cada alteração
+    quantidade_itens = models.PositiveIntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Carrinho de {self.cliente.username}"
+
+# Modelo de Item no Carrinho
+class ItemCarrinho(models.Model):
+    carrinho = models.ForeignKey(Carrinho, on_delete=models.CASCADE, related_name='itens')
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
+    quantidade = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['carrinho', 'produto'], name='unique_produto_por_carrinho'),
+        ]
+
+    @property
+    def subtotal(self):
+        return self.produto.preco * self.quantidade
+
+    def __str__(self):
+        return f"{self.quantidade}x {self.produto.nome} no carrinho #{self.carrinho_id}"
+
+
+# Tabelas de relatório (agregados mantidos junto com cada pedido; ver pedidos/relatorios.py)
+class VendaDiariaProduto(models.Model):
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='+')
+    data = models.DateField()
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='vendas_diarias')
+    quantidade = models.PositiveIntegerField(default=0)
+    receita = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurante', 'data', 'produto'], name='unique_venda_diaria_produto'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantidade}x {self.produto_id} em {self.data}"
+
+class ReceitaDiaria(models.Model):
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='+')
+    data = models.DateField()
+    pedidos = models.PositiveIntegerField(default=0)
+    receita = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurante', 'data'], name='unique_receita_diaria'),
+        ]
+
+    def __str__(self):
+        return f"{self.data}: R$ {self.receita}"
+
+class ContagemStatus(models.Model):
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=Pedido.STATUS_CHOICES)
+    quantidade = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurante', 'status'], name='unique_contagem_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.status}: {self.quantidade}"
+
+
+# Chave de idempotência: guarda a primeira resposta de um POST para repeti-la nas
+# retentativas com a mesma chave (ver pedidos/idempotencia.py)
+class ChaveIdempotencia(models.Model):
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chaves_idempotencia')
+    chave = models.CharField(max_length=255)
+    caminho = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    corpo = models.BinaryField(default=b'')
+    criado_em = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'chave'], name='unique_chave_idempotencia_por_usuario'),
+        ]
+
+    def __str__(self):
+        return f"{self.chave} ({self.caminho})"
+
+
+# Fila de tarefas em segundo plano, executadas pelo comando worker_tarefas (ver pedidos/tarefas.py)
+class Tarefa(models.Model):
+    STATUS_CHOICES = (
+        ("pendente", "Pendente"),
+        ("executando", "Executando"),
+        ("concluida", "Concluída"),
+        ("falhou", "Falhou"),
+    )
+    # Caminho da função, ex.: 'pedidos.relatorios.registrar_mudanca_status'
+    funcao = models.CharField(max_length=255)
+    argumentos = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+    tentativas = models.PositiveIntegerField(default=0)
+    max_tentativas = models.PositiveIntegerField(default=5)
+    executar_em = models.DateTimeField(default=timezone.now)
+    reservada_por = models.CharField(max_length=64, blank=True)
+    reservada_em = models.DateTimeField(null=True, blank=True)
+    erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Consulta do worker: próximas tarefas pendentes
+            models.Index(fields=['status', 'executar_em'], name='tarefa_status_executar_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.funcao} ({self.status})"
+
+
+# Pedidos entregues e antigos, movidos pelo comando arquivar_pedidos (ver
+# pedidos/arquivamento.py). Mantém o id original; os itens ficam numa coluna
+# JSON com o nome do produto, então o histórico não depende do cardápio atual.
+class PedidoArquivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='pedidos_arquivados')
+    cliente = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pedidos_arquivados')
+    status = models.CharField(max_length=20, choices=Pedido.STATUS_CHOICES)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+    criado_em = models.DateTimeField()
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+    itens = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['cliente', '-criado_em'], name='arquivado_cliente_criado_idx'),
+            # Exportação do histórico de um restaurante (pedidos/exportacao.py)
+            models.Index(fields=['restaurante', '-criado_em', '-id'], name='arquivado_rest_criado_idx'),
+        ]
+
+    @property
+    def itens_pedido(self):
+        return [ItemArquivado(**item) for item in self.itens]
+
+    def __str__(self):
+        return f"Pedido arquivado #{self.id}"
+
+
+class ItemArquivado:
+    """Item de um PedidoArquivado, com os mesmos atributos usados de ProdutoNoPedido."""
+
+    def __init__(self, produto_id, produto_nome, quantidade, preco_unitario):
+        self.produto_id = produto_id
+        self.produto_nome = produto_nome
+        self.quantidade = quantidade
+        self.preco_unitario = Decimal(preco_unitario)
+
+    @property
+    def subtotal(self):
+        return self.preco_unitario * self.quantidade
@@ -0,0 +1,52 @@
+# pedidos/paginacao.py
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+# Quantidade padrão (e máxima) de pedidos por página do feed
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(pedido):
+    """Gera um cursor opaco a partir da chave (criado_em, id) do pedido."""
+    raw = f"{pedido.criado_em.isoformat()}|{pedido.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        criado_em, pedido_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(criado_em), int(pedido_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido('Cursor inválido.') from e
+
+
+def paginar_pedidos(queryset, cursor=None, limite=FEED_PAGE_SIZE):
+    """
+    Paginação por keyset em (criado_em, id), do mais recente para o mais antigo.
+    Retorna (pedidos, proximo_cursor); proximo_cursor é None na última página.
+    O custo de cada página não depende do tamanho da tabela, ao contrário de OFFSET.
+    """
+    limite = max(1, min(limite, FEED_MAX_PAGE_SIZE))
+    queryset = queryset.order_by('-criado_em', '-id')
+
+    if cursor:
+        criado_em, pedido_id = decodificar_cursor(cursor)
+        queryset = queryset.filter(
+            Q(criado_em__lt=criado_em) | Q(criado_em=criado_em, id__lt=pedido_id)
+        )
+
+    # Busca um registro extra só para saber se existe próxima página
+    pedidos = list(queryset[:limite + 1])
+    proximo_cursor = None
+    if len(pedidos) > limite:
+        pedidos = pedidos[:limite]
+        proximo_cursor = codificar_cursor(pedidos[-1])
+    return pedidos, proximo_cursor
@@ -0,0 +1,107 @@
+# pedidos/ratelimit.py
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from .respostas import JsonResponse
+
+# capacidade: tamanho da rajada; por_segundo: ritmo em que as fichas voltam
+LIMITES_PADRAO = {
+    'busca': {'capacidade': 20, 'por_segundo': 5},
+    'carrinho': {'capacidade': 30, 'por_segundo': 2},
+}
+
+
+class InMemoryBackend:
+    """
+    Token bucket em memória, por processo. Com vários workers cada um tem os
+    próprios baldes; use CacheBackend (com um cache compartilhado) ou outro
+    backend com a mesma interface em settings.PEDIDOS_RATE_LIMIT_BACKEND.
+    """
+
+    def __init__(self, max_chaves=10000):
+        self.max_chaves = max_chaves
+        self._baldes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, capacidade, por_segundo):
+        """Gasta uma ficha. Devolve (permitido, segundos até haver uma ficha)."""
+        agora = time.monotonic()
+        with self._lock:
+            fichas, ultimo = self._baldes.pop(chave, (capacidade, agora))
+            fichas = min(capacidade, fichas + (agora - ultimo) * por_segundo)
+            permitido = fichas >= 1
+            if permitido:
+                fichas -= 1
+            self._baldes[chave] = (fichas, agora)
+            # Descarta os baldes usados há mais tempo (um balde cheio é o mesmo que nenhum)
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        return permitido, 0 if permitido else (1 - fichas) / por_segundo
+
+
+class CacheBackend:
+    """
+    Token bucket no cache do Django (GCRA: guarda só o instante teórico de
+    chegada). Com Redis/Memcached os limites valem para todos os processos.
+    A leitura e a escrita não são atômicas: sob concorrência alta algumas
+    requisições a mais podem passar, o que é aceitável para rate limiting.
+    """
+
+    def __init__(self, alias='default', prefixo='ratelimit'):
+        self.alias = alias
+        self.prefixo = prefixo
+
+    def consumir(self, chave, capacidade, por_segundo):
+        cache = caches[self.alias]
+        chave = f'{self.prefixo}:{chave}'
+        agora = time.time()
+        intervalo = 1 / por_segundo
+        tat = max(cache.get(chave, agora), agora)
+        espera = tat - agora - (capacidade - 1) * intervalo
+        if espera > 0:
+            return False, espera
+        # A chave expira quando o balde estaria cheio de novo
+        cache.set(chave, tat + intervalo, timeout=math.ceil(tat + intervalo - agora) + 1)
+        return True, 0
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, 'PEDIDOS_RATE_LIMIT_BACKEND', 'pedidos.ratelimit.InMemoryBackend')
+    return import_string(path)()
+
+
+def identificar(request):
+    """Usuário logado, ou o IP para requisições anônimas."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def limitar_taxa(escopo):
+    """Responde 429 com Retry-After quando o usuário/IP esgota as fichas do escopo."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'PEDIDOS_RATE_LIMIT_ATIVO', True):
+                return view(request, *args, **kwargs)
+            limites = {**LIMITES_PADRAO, **getattr(settings, 'PEDIDOS_RATE_LIMITS', {})}[escopo]
+            permitido, espera = get_backend().consumir(
+                f'{escopo}:{identificar(request)}', limites['capacidade'], limites['por_segundo'],
+            )
+            if not permitido:
+                response = JsonResponse(
+                    {'success': False, 'error': 'Muitas requisições. Tente novamente em instantes.'}, status=429,
+                )
+                response['Retry-After'] = str(max(1, math.ceil(espera)))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+# pedidos/relatorios.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ContagemStatus, Pedido, ReceitaDiaria, VendaDiariaProduto
+
+CENTAVO = Decimal('0.01')
+
+
+def _somar(model, chaves, linhas):
+    """
+    Soma os valores de `linhas` às linhas existentes de `model` (identificadas
+    pelos campos `chaves`), criando as que faltam. É um único
+    INSERT ... ON CONFLICT DO UPDATE, aceito por SQLite e PostgreSQL.
+    """
+    if not linhas:
+        return
+    quote = connection.ops.quote_name
+    tabela = quote(model._meta.db_table)
+    campos = list(linhas[0])
+    colunas = [quote(model._meta.get_field(campo).column) for campo in campos]
+    somas = [coluna for campo, coluna in zip(campos, colunas) if campo not in chaves]
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(campos)) + ')'] * len(linhas))
+    sql = (
+        f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {placeholders} "
+        f"ON CONFLICT ({', '.join(quote(model._meta.get_field(c).column) for c in chaves)}) "
+        f"DO UPDATE SET {', '.join(f'{c} = {tabela}.{c} + excluded.{c}' for c in somas)}"
+    )
+    params = [linha[campo] for linha in linhas for campo in campos]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def registrar_pedido_criado(pedido, itens):
+    """Atualiza os agregados com um pedido novo."""
+    data = timezone.localdate(pedido.criado_em)
+    restaurante = pedido.restaurante_id
+    _somar(VendaDiariaProduto, ['restaurante', 'data', 'produto'], [
+        {
+            'restaurante': restaurante, 'data': data, 'produto': item.produto_id,
+            'quantidade': item.quantidade, 'receita': item.subtotal,
+        }
+        for item in itens
+    ])
+    _somar(ReceitaDiaria, ['restaurante', 'data'], [
+        {'restaurante': restaurante, 'data': data, 'pedidos': 1, 'receita': pedido.total},
+    ])
+    _somar(ContagemStatus, ['restaurante', 'status'], [
+        {'restaurante': restaurante, 'status': pedido.status, 'quantidade': 1},
+    ])
+
+
+def agregar_pedido_criado(pedido_id, status):
+    """
+    Tarefa da fila (pedidos/tarefas.py) enfileirada por criar_pedido. Usa o
+    status da criação, não o atual: as mudanças de status têm tarefas próprias.
+    """
+    pedido = Pedido.objects.filter(pk=pedido_id).first()
+    if pedido is None:
+        return
+    pedido.status = status
+    registrar_pedido_criado(pedido, list(pedido.itens.all()))
+
+
+def registrar_mudanca_status(restaurante_id, status_anterior, status_novo, quantidade=1):
+    if status_anterior == status_novo:
+        return
+    _somar(ContagemStatus, ['restaurante', 'status'], [
+        {'restaurante': restaurante_id, 'status': status_anterior, 'quantidade': -quantidade},
+        {'restaurante': restaurante_id, 'status': status_novo, 'quantidade': quantidade},
+    ])
+
+
+def resumo_vendas(restaurante_id, dias=7, limite=10):
+    """Relatório do painel de um restaurante: lê só as linhas pré-agregadas do período."""
+    inicio = timezone.localdate() - timedelta(days=dias - 1)
+    mais_vendidos = (
+        VendaDiariaProduto.objects.filter(restaurante_id=restaurante_id, data__gte=inicio)
+        .values('produto_id', 'produto__nome')
+        .annotate(quantidade=Sum('quantidade'), receita=Sum('receita'))
+        .order_by('-quantidade', 'produto__nome')[:limite]
+    )
+    receita_por_dia = ReceitaDiaria.objects.filter(restaurante_id=restaurante_id, data__gte=inicio).order_by('data')
+    contagens = dict(ContagemStatus.objects.filter(restaurante_id=restaurante_id).values_list('status', 'quantidade'))
+    return {
+        'inicio': inicio.isoformat(),
+        'mais_vendidos': [
+            {
+                'produto_id': linha['produto_id'],
+                'produto_nome': linha['produto__nome'],
+                'quantidade': linha['quantidade'],
+                'receita': str(linha['receita'].quantize(CENTAVO)),
+            }
+            for linha in mais_vendidos
+        ],
+        'receita_por_dia': [
+            {'data': dia.data.isoformat(), 'pedidos': dia.pedidos, 'receita': str(dia.receita)}
+            for dia in receita_por_dia
+        ],
+        'pedidos_por_status': {
+            status: contagens.get(status, 0) for status, _ in Pedido.STATUS_CHOICES
+        },
+    }
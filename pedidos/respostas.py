@@ -0,0 +1,79 @@
+# pedidos/respostas.py
+import datetime
+import decimal
+import json
+import uuid
+
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+CONTENT_TYPE_JSON = 'application/json'
+
+
+def _padrao(obj):
+    """
+    Tipos que o JSON não tem. Decimal vira string, como o JsonResponse do
+    Django fazia com str(), para não perder centavos no float do cliente.
+    """
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (uuid.UUID, Promise)):
+        return str(obj)
+    raise TypeError(f'Objeto do tipo {type(obj).__name__} não é serializável em JSON')
+
+
+def _dumps_stdlib(dados):
+    return json.dumps(dados, default=_padrao, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _dumps_orjson(dados):
+    # orjson já escreve datetime/date/UUID com isoformat, igual a _padrao
+    return orjson.dumps(dados, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Serializa em JSON (bytes UTF-8): orjson quando instalado, json da biblioteca
+# padrão se não. As duas produzem o mesmo texto para os tipos usados nas views.
+dumps = _dumps_orjson if orjson is not None else _dumps_stdlib
+
+
+class JsonResponse(HttpResponse):
+    """
+    Substituto do django.http.JsonResponse (mesma assinatura) que serializa
+    com dumps(): orjson quando instalado, json da biblioteca padrão se não.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('Para serializar objetos que não são dict, use safe=False.')
+        kwargs.setdefault('content_type', CONTENT_TYPE_JSON)
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def resposta_json_pronta(conteudo, **kwargs):
+    """Resposta com um JSON já serializado (por exemplo, guardado no cache)."""
+    kwargs.setdefault('content_type', CONTENT_TYPE_JSON)
+    return HttpResponse(conteudo, **kwargs)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Renderer da API (DRF) com o mesmo dumps() das views."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # JSON indentado (API navegável): fica com o renderer do DRF
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except TypeError:
+            # Tipos que só o encoder do DRF conhece (QuerySet, geometrias...)
+            return super().render(data, accepted_media_type, renderer_context)
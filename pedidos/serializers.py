@@ -5,26 +5,42 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class ProdutoSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Permite escolher os campos da resposta com ?fields=id,nome.
+    Só vale para o serializer de nível mais alto (não para os aninhados).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or self.parent is not None:
+            return
+        fields = request.query_params.get('fields')
+        if fields:
+            permitidos = set(fields.split(','))
+            for nome in set(self.fields) - permitidos:
+                self.fields.pop(nome)
+
+class ProdutoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Produto
-        fields = ['id', 'nome', 'preco', 'categoria', 'imagem']
+        fields = ['id', 'restaurante', 'nome', 'preco', 'categoria']
 
 class ProdutoNoPedidoSerializer(serializers.ModelSerializer):
     produto = ProdutoSerializer() # nested serializer para incluir os dados do produto
 
     class Meta:
         model = ProdutoNoPedido
-        fields = ['produto', 'quantidade']
+        fields = ['produto', 'quantidade', 'preco_unitario']
 
-class PedidoSerializer(serializers.ModelSerializer):
+class PedidoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     itens = ProdutoNoPedidoSerializer(many=True, read_only=True)
     cliente = serializers.CharField(source='cliente.username', read_only=True)
 
     class Meta:
         model = Pedido
-        fields = ['id', 'cliente', 'status', 'total', 'criado_em', 'itens']
+        fields = ['id', 'restaurante', 'cliente', 'status', 'total', 'criado_em', 'entrega', 'itens']
 
 class UserLoginSerializer(serializers.Serializer):
     username = serializers.CharField()
-    password = serializers.CharField(write_only=True)
\ No newline at end of file
+    password = serializers.CharField(write_only=True)
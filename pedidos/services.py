@@ -0,0 +1,103 @@
+# pedidos/services.py
+from collections import defaultdict
+
+from django.db import transaction
+
+from .eventos import publicar_pedido_criado, publicar_status_alterado
+from .models import Pedido, Produto, ProdutoNoPedido, TransicaoInvalida
+from .tarefas import enfileirar
+
+
+class PedidoInvalido(Exception):
+    pass
+
+
+def criar_pedido(cliente, itens):
+    """
+    Cria um pedido para `cliente` a partir de `itens` ({produto_id: quantidade}).
+
+    Os produtos são lidos em uma única consulta e o preço de cada um é copiado
+    para o item do pedido. Todos têm de ser do mesmo restaurante, que passa a
+    ser o restaurante do pedido. A transação só cobre os INSERTs do pedido, dos itens
+    (via bulk_create) e da tarefa que atualiza os relatórios, então o tempo com
+    o banco travado não cresce com o carrinho.
+    """
+    if not itens:
+        raise PedidoInvalido('O seu carrinho está vazio.')
+
+    itens = {int(produto_id): int(quantidade) for produto_id, quantidade in itens.items()}
+    if any(quantidade < 1 for quantidade in itens.values()):
+        raise PedidoInvalido('Quantidade inválida no carrinho.')
+
+    produtos = Produto.objects.in_bulk(list(itens))
+    if len(produtos) != len(itens):
+        raise Produto.DoesNotExist('Um dos produtos não foi encontrado.')
+    restaurantes = {produto.restaurante_id for produto in produtos.values()}
+    if len(restaurantes) > 1:
+        raise PedidoInvalido('Um pedido só pode ter produtos de um restaurante.')
+
+    total = sum(produtos[produto_id].preco * quantidade for produto_id, quantidade in itens.items())
+
+    with transaction.atomic():
+        pedido = Pedido.objects.create(
+            restaurante_id=restaurantes.pop(), cliente=cliente, total=total, status='pedido',
+        )
+        itens_do_pedido = ProdutoNoPedido.objects.bulk_create([
+            ProdutoNoPedido(
+                pedido=pedido,
+                produto=produtos[produto_id],
+                quantidade=quantidade,
+                preco_unitario=produtos[produto_id].preco,
+            )
+            for produto_id, quantidade in itens.items()
+        ])
+        # Os agregados do relatório ficam para o worker; a tarefa é gravada na
+        # mesma transação, então só existe se o pedido existir
+        enfileirar('pedidos.relatorios.agregar_pedido_criado', pedido_id=pedido.id, status=pedido.status)
+        transaction.on_commit(lambda: publicar_pedido_criado(pedido))
+    return pedido
+
+
+def alterar_status(pedidos, status):
+    """
+    Leva para `status` os pedidos do queryset `pedidos` que estão em um status
+    de origem válido. Cada origem (e restaurante) vira um UPDATE condicional,
+    então duas abas concorrentes não desfazem a mudança uma da outra. Devolve
+    os ids alterados.
+    """
+    origens = Pedido.origens(status)
+    if not origens:
+        raise TransicaoInvalida(f'Nenhum pedido pode passar para "{status}".')
+
+    alterados = []
+    with transaction.atomic():
+        for de in origens:
+            # select_for_update trava as linhas no PostgreSQL; no SQLite, o
+            # transaction_mode='IMMEDIATE' (settings) faz a transação pegar o
+            # lock de escrita no BEGIN, antes deste SELECT
+            por_restaurante = defaultdict(list)
+            for pedido_id, restaurante_id in pedidos.select_for_update().filter(status=de).values_list(
+                'id', 'restaurante_id',
+            ):
+                por_restaurante[restaurante_id].append(pedido_id)
+            # As views passam pedidos de um só restaurante; os relatórios são por restaurante
+            for restaurante_id, ids in por_restaurante.items():
+                # Com as linhas travadas o UPDATE move todos; se não mover (outro
+                # banco, outro modo de transação), só valem os ids que ele devolveu
+                ids = Pedido.objects.filter(id__in=ids).transitar_ids(de, status)
+                if not ids:
+                    continue
+                enfileirar(
+                    'pedidos.relatorios.registrar_mudanca_status',
+                    restaurante_id=restaurante_id, status_anterior=de, status_novo=status, quantidade=len(ids),
+                )
+                alterados.extend(ids)
+
+        if alterados:
+            transaction.on_commit(lambda: [
+                publicar_status_alterado(pedido)
+                for pedido in Pedido.objects.filter(id__in=alterados).only(
+                    'id', 'status', 'cliente_id', 'restaurante_id',
+                )
+            ])
+    return alterados
@@ -0,0 +1,51 @@
+# pedidos/signals.py
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import busca
+from .autenticacao import esquecer_usuario
+from .cardapio import invalidar_cardapio
+from .models import Carrinho, ItemCarrinho, Produto, User
+
+
+# Mantém o índice de busca sincronizado com a tabela de produtos
+@receiver(post_save, sender=Produto)
+def indexar_produto(sender, instance, **kwargs):
+    busca.indexar_produto(instance)
+
+
+@receiver(post_delete, sender=Produto)
+def remover_produto_do_indice(sender, instance, **kwargs):
+    busca.remover_produto(instance.id)
+
+
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_cache_do_cardapio(sender, instance, **kwargs):
+    invalidar_cardapio(instance.restaurante_id)
+    # De novo após o commit, para descartar o que outra requisição tenha
+    # colocado em cache lendo o estado antigo enquanto a transação estava aberta
+    transaction.on_commit(lambda: invalidar_cardapio(instance.restaurante_id))
+
+
+# Os itens de carrinho do produto somem em cascata; desconta-os do total de cada carrinho
+@receiver(pre_delete, sender=Produto)
+def descontar_produto_dos_carrinhos(sender, instance, **kwargs):
+    for carrinho_id, quantidade in ItemCarrinho.objects.filter(produto=instance).values_list('carrinho_id', 'quantidade'):
+        Carrinho.objects.filter(pk=carrinho_id).update(quantidade_itens=F('quantidade_itens') - quantidade)
+
+
+# Usuário em cache do CachedModelBackend (pedidos/autenticacao.py). O login
+# também o descarta: um id reaproveitado não herda o usuário antigo
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def esquecer_usuario_em_cache(sender, instance, **kwargs):
+    esquecer_usuario(instance.pk)
+
+
+@receiver(user_logged_in)
+def esquecer_usuario_no_login(sender, user, **kwargs):
+    esquecer_usuario(user.pk)
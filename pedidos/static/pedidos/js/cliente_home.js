@@ -0,0 +1,247 @@
+// pedidos/static/pedidos/js/cliente_home.js
+// URLs vêm de um bloco JSON do template, assim este arquivo pode ser estático
+const urls = JSON.parse(document.getElementById('cliente-urls').textContent);
+
+// Lógica de Tabs
+const cardapioTab = document.getElementById('cardapio-tab');
+const pedidosTab = document.getElementById('pedidos-tab');
+const cardapioContent = document.getElementById('cardapio-content');
+const pedidosContent = document.getElementById('pedidos-content');
+
+function setActiveTab(tabName) {
+    if (tabName === 'pedidos') {
+        pedidosTab.classList.add('active');
+        cardapioTab.classList.remove('active');
+        pedidosContent.classList.add('active');
+        cardapioContent.classList.remove('active');
+    } else {
+        cardapioTab.classList.add('active');
+        pedidosTab.classList.remove('active');
+        cardapioContent.classList.add('active');
+        pedidosContent.classList.remove('active');
+    }
+}
+
+cardapioTab.addEventListener('click', () => setActiveTab('cardapio'));
+pedidosTab.addEventListener('click', () => setActiveTab('pedidos'));
+
+document.addEventListener('DOMContentLoaded', () => {
+    const urlParams = new URLSearchParams(window.location.search);
+    if (urlParams.has('show_orders')) {
+        setActiveTab('pedidos');
+    } else {
+        setActiveTab('cardapio');
+    }
+
+    // Exibir o popup de sucesso, se houver
+    const popupOverlay = document.getElementById('popup-overlay');
+    if (popupOverlay) {
+        popupOverlay.classList.add('show');
+    }
+});
+
+// Lógica da busca dinâmica
+const searchInput = document.getElementById('search-bar');
+const productsGrid = document.getElementById('products-grid');
+// Cardápio completo renderizado pelo servidor, restaurado quando a busca é limpa
+const initialGridHTML = productsGrid.innerHTML;
+let timeout = null;
+// Busca em andamento: cancelada quando o usuário continua digitando
+let buscaAtual = null;
+
+searchInput.addEventListener('input', (event) => {
+    clearTimeout(timeout);
+    if (buscaAtual) {
+        buscaAtual.abort();
+        buscaAtual = null;
+    }
+    const query = event.target.value.trim();
+
+    if (!query) {
+        productsGrid.innerHTML = initialGridHTML;
+        rebindAddToCartButtons();
+
+// "Meus pedidos": os mais antigos vêm do feed (paginação por cursor)
+const ordersList = document.querySelector('.orders-list');
+const loadMoreBtn = document.getElementById('load-more-btn');
+
+function createPedidoCardHTML(pedido) {
+    return `
+        <div class="order-card" data-id="${pedido.id}">
+            <div class="order-header">
+                <h5 class="order-id">Pedido #${pedido.id}</h5>
+                <span class="order-status status-${pedido.status}">${pedido.status_display}</span>
+            </div>
+            <div class="order-body">
+                <p><strong>Data do Pedido:</strong> ${pedido.data_criacao}</p>
+                <p><strong>Total:</strong> <span class="order-total">R$ ${parseFloat(pedido.total).toFixed(2)}</span></p>
+            </div>
+            <div class="order-actions">
+                <a href="${urls.orderDetail.replace('0', pedido.id)}" class="btn btn-details">Ver Detalhes</a>
+            </div>
+        </div>
+        `;
+}
+
+loadMoreBtn.addEventListener('click', async () => {
+    const params = new URLSearchParams({ cursor: loadMoreBtn.dataset.cursor });
+    loadMoreBtn.disabled = true;
+    try {
+        const response = await fetch(`${urls.feedPedidos}?${params}`);
+        const data = await response.json();
+        data.pedidos.forEach(pedido => {
+            ordersList.insertAdjacentHTML('beforeend', createPedidoCardHTML(pedido));
+        });
+        if (data.next_cursor) {
+            loadMoreBtn.dataset.cursor = data.next_cursor;
+        } else {
+            loadMoreBtn.style.display = 'none';
+        }
+    } finally {
+        loadMoreBtn.disabled = false;
+    }
+});
+        return;
+    }
+
+    timeout = setTimeout(async () => {
+        const controller = new AbortController();
+        buscaAtual = controller;
+        let response;
+        try {
+            response = await fetch(`${urls.searchProducts}?q=${encodeURIComponent(query)}`, { signal: controller.signal });
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Erro de rede:', error);
+            }
+            return;
+        }
+        if (response.status === 429) {
+            // Limite de requisições: tenta de novo quando o servidor permitir
+            const espera = parseInt(response.headers.get('Retry-After') || '1', 10);
+            timeout = setTimeout(() => searchInput.dispatchEvent(new Event('input')), espera * 1000);
+            return;
+        }
+        const products = await response.json();
+        if (controller.signal.aborted) {
+            return;
+        }
+
+        productsGrid.innerHTML = ''; // Limpa a grid atual
+
+        if (products.length > 0) {
+            products.forEach(product => {
+                const productCard = document.createElement('div');
+                productCard.className = 'product-card';
+                productCard.innerHTML = `
+                    <span class="category">${product.categoria}</span>
+                    <h3>${product.nome}</h3>
+                    <p class="price">R$ ${parseFloat(product.preco).toFixed(2)}</p>
+                    <button class="add-to-cart-btn" data-product-id="${product.id}">
+                        Adicionar ao pedido
+                    </button>
+                `;
+                productsGrid.appendChild(productCard);
+            });
+        } else {
+            productsGrid.innerHTML = '<p class="empty-state">Nenhum produto encontrado.</p>';
+        }
+
+        // Reinicializa os botões do carrinho após a busca
+        rebindAddToCartButtons();
+    }, 300);
+});
+
+// Lógica para adicionar ao carrinho
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.startsWith(name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+// Repete a requisição em falhas de rede com a mesma Idempotency-Key: se a
+// primeira tentativa chegou ao servidor, a repetição só lê a resposta gravada
+async function fetchIdempotente(url, options, tentativas = 3) {
+    const headers = { ...options.headers, 'Idempotency-Key': crypto.randomUUID() };
+    for (let tentativa = 1; ; tentativa++) {
+        try {
+            return await fetch(url, { ...options, headers });
+        } catch (error) {
+            if (tentativa >= tentativas) {
+                throw error;
+            }
+        }
+    }
+}
+
+function rebindAddToCartButtons() {
+    const cartCountSpan = document.querySelector('.cart-count');
+    const addButtons = document.querySelectorAll('.add-to-cart-btn');
+
+    addButtons.forEach(button => {
+        button.addEventListener('click', async (event) => {
+            const productId = event.target.dataset.productId;
+            const csrfToken = getCookie('csrftoken');
+
+            try {
+                const response = await fetchIdempotente(urls.addToCart.replace('0', productId), {
+                    method: 'POST',
+                    headers: {
+                        'X-CSRFToken': csrfToken,
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({})
+                });
+
+                if (response.ok) {
+                    const data = await response.json();
+                    if (cartCountSpan) {
+                        cartCountSpan.textContent = data.cart_item_count;
+                    } else {
+                        const cartNav = document.querySelector('.nav-cart');
+                        const newCountSpan = document.createElement('span');
+                        newCountSpan.className = 'cart-count';
+                        newCountSpan.textContent = data.cart_item_count;
+                        cartNav.appendChild(newCountSpan);
+                    }
+                } else if (response.status === 429) {
+                    alert('Muitas requisições. Aguarde alguns segundos e tente novamente.');
+                } else if (response.status === 409) {
+                    // Carrinho com produtos de outro restaurante
+                    const data = await response.json();
+                    alert(data.error);
+                } else {
+                    console.error('Erro ao adicionar produto:', response.status);
+                    alert('Não foi possível adicionar o produto ao carrinho.');
+                }
+            } catch (error) {
+                console.error('Erro de rede:', error);
+                alert('Ocorreu um erro. Tente novamente.');
+            }
+        });
+    });
+}
+
+rebindAddToCartButtons();
+
+// Status dos pedidos em tempo real (Server-Sent Events)
+if (window.EventSource) {
+    const eventos = new EventSource(urls.eventosPedidos);
+    eventos.addEventListener('status_alterado', (event) => {
+        const pedido = JSON.parse(event.data);
+        const statusSpan = document.querySelector(`.order-card[data-id="${pedido.id}"] .order-status`);
+        if (statusSpan) {
+            statusSpan.className = `order-status status-${pedido.status}`;
+            statusSpan.textContent = pedido.status_display;
+        }
+    });
+}
@@ -0,0 +1,426 @@
+// pedidos/static/pedidos/js/restaurante_home.js
+const produtosTab = document.getElementById('produtos-tab');
+const pedidosTab = document.getElementById('pedidos-tab');
+const produtosContent = document.getElementById('produtos-content');
+const pedidosContent = document.getElementById('pedidos-content');
+const productsGrid = document.getElementById('products-grid');
+
+// Lógica do Modal de Detalhes do Pedido
+const orderDetailsModalOverlay = document.getElementById('order-details-modal-overlay');
+const orderDetailsTitle = document.getElementById('order-details-title');
+const orderDetailsCloseBtn = document.getElementById('order-details-close-btn');
+const orderDetailsOkBtn = document.getElementById('order-details-ok-btn');
+const orderIdSpan = document.getElementById('order-id');
+const orderClientSpan = document.getElementById('order-client');
+const orderDateSpan = document.getElementById('order-date');
+const orderStatusSpan = document.getElementById('order-status');
+const orderTotalSpan = document.getElementById('order-total');
+const orderItemsList = document.getElementById('order-items-list');
+
+// Event listener para o botão "Ver Detalhes"
+pedidosContent.addEventListener('click', (event) => {
+    const viewDetailsBtn = event.target.closest('.view-details-btn');
+    if (viewDetailsBtn) {
+        const pedidoId = viewDetailsBtn.dataset.id;
+        fetch(urls.detalhesPedido.replace('0', pedidoId))
+            .then(response => response.json())
+            .then(data => {
+                orderIdSpan.textContent = data.id;
+                orderClientSpan.textContent = data.cliente_nome;
+                orderDateSpan.textContent = data.data_criacao;
+                orderStatusSpan.textContent = data.status;
+                orderTotalSpan.textContent = `R$ ${parseFloat(data.total).toFixed(2)}`;
+
+                // Preenche a lista de itens do pedido
+                orderItemsList.innerHTML = '';
+                data.itens.forEach(item => {
+                    const li = document.createElement('li');
+                    li.innerHTML = `${item.quantidade}x ${item.produto_nome} - R$ ${parseFloat(item.subtotal).toFixed(2)}`;
+                    orderItemsList.appendChild(li);
+                });
+
+                orderDetailsModalOverlay.classList.add('open');
+            });
+    }
+});
+
+// Event listeners para fechar o modal
+orderDetailsCloseBtn.addEventListener('click', () => hideModal(orderDetailsModalOverlay));
+orderDetailsOkBtn.addEventListener('click', () => hideModal(orderDetailsModalOverlay));
+orderDetailsModalOverlay.addEventListener('click', (e) => {
+    if (e.target === orderDetailsModalOverlay) hideModal(orderDetailsModalOverlay);
+});
+
+// URLs e opções vêm de blocos JSON do template, assim este arquivo pode ser estático
+const urls = JSON.parse(document.getElementById('restaurante-urls').textContent);
+
+// Lógica do feed de pedidos (paginação por cursor)
+const pedidosList = document.getElementById('pedidos-list');
+const loadMoreBtn = document.getElementById('load-more-btn');
+const statusFilter = document.getElementById('status-filter');
+const statusOptions = JSON.parse(document.getElementById('status-choices').textContent);
+
+const transicoes = JSON.parse(document.getElementById('transicoes-pedido').textContent);
+
+// Só o status atual e os próximos permitidos ficam habilitados
+function statusOptionAttr(atual, valor) {
+    if (atual === valor) {
+        return 'selected';
+    }
+    return (transicoes[atual] || []).includes(valor) ? '' : 'disabled';
+}
+
+function atualizarSelectStatus(select, status) {
+    select.querySelectorAll('option').forEach(option => {
+        option.selected = option.value === status;
+        option.disabled = statusOptionAttr(status, option.value) === 'disabled';
+    });
+}
+
+function createPedidoCardHTML(pedido) {
+    const options = statusOptions.map(([valor, nome]) =>
+        `<option value="${valor}" ${statusOptionAttr(pedido.status, valor)}>${nome}</option>`
+    ).join('');
+    return `
+        <div class="pedido-card" data-id="${pedido.id}">
+            <div class="pedido-info">
+                <h3><input type="checkbox" class="pedido-select" value="${pedido.id}"> Pedido #${pedido.id}</h3>
+                <p>Cliente: ${pedido.cliente_nome}</p>
+                <p>${pedido.data_criacao}</p>
+            </div>
+            <div class="pedido-actions">
+                <p class="price">R$ ${parseFloat(pedido.total).toFixed(2)}</p>
+                <button class="btn-details view-details-btn" data-id="${pedido.id}">
+                    <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="feather feather-eye"><path d="M1 12s4-8 11-8 11 8 11 8-4 8-11 8-11-8-11-8z"></path><circle cx="12" cy="12" r="3"></circle></svg>
+                    Ver Detalhes
+                </button>
+                <form action="${urls.updateStatusPedido.replace('0', pedido.id)}" method="post">
+                    <input type="hidden" name="csrfmiddlewaretoken" value="">
+                    <select name="status">${options}</select>
+                </form>
+            </div>
+        </div>
+        `;
+}
+
+// Os cards de pedido vêm do cache de fragmentos, sem o token CSRF do usuário:
+// o token é preenchido a partir do cookie na hora de enviar
+pedidosList.addEventListener('change', (event) => {
+    const select = event.target.closest('select[name="status"]');
+    if (!select) {
+        return;
+    }
+    select.form.csrfmiddlewaretoken.value = getCookie('csrftoken');
+    select.form.submit();
+});
+
+loadMoreBtn.addEventListener('click', async () => {
+    const params = new URLSearchParams({ cursor: loadMoreBtn.dataset.cursor });
+    if (statusFilter.value) {
+        params.set('status', statusFilter.value);
+    }
+    loadMoreBtn.disabled = true;
+    try {
+        const response = await fetch(`${urls.feedPedidos}?${params}`);
+        const data = await response.json();
+        data.pedidos.forEach(pedido => {
+            pedidosList.insertAdjacentHTML('beforeend', createPedidoCardHTML(pedido));
+        });
+        if (data.next_cursor) {
+            loadMoreBtn.dataset.cursor = data.next_cursor;
+        } else {
+            loadMoreBtn.style.display = 'none';
+        }
+    } finally {
+        loadMoreBtn.disabled = false;
+    }
+});
+
+// Atualizações em tempo real (Server-Sent Events)
+if (window.EventSource) {
+    const eventos = new EventSource(urls.eventosPedidos);
+    eventos.addEventListener('pedido_criado', (event) => {
+        const pedido = JSON.parse(event.data);
+        if (statusFilter.value && statusFilter.value !== pedido.status) {
+            return;
+        }
+        const emptyState = pedidosList.querySelector(':scope > p');
+        if (emptyState) {
+            emptyState.remove();
+        }
+        pedidosList.insertAdjacentHTML('afterbegin', createPedidoCardHTML(pedido));
+    });
+    eventos.addEventListener('status_alterado', (event) => {
+        const pedido = JSON.parse(event.data);
+        const card = pedidosList.querySelector(`.pedido-card[data-id="${pedido.id}"]`);
+        if (!card) {
+            return;
+        }
+        if (statusFilter.value && statusFilter.value !== pedido.status) {
+            card.remove();
+        } else {
+            atualizarSelectStatus(card.querySelector('select[name="status"]'), pedido.status);
+        }
+    });
+}
+
+// Atualização em lote: pedidos que não podem ir para o status escolhido são ignorados
+document.getElementById('batch-status-btn').addEventListener('click', async () => {
+    const selecionados = [...pedidosList.querySelectorAll('.pedido-select:checked')].map(cb => cb.value);
+    if (selecionados.length === 0) {
+        return;
+    }
+    const status = document.getElementById('batch-status-select').value;
+    const formData = new FormData();
+    formData.append('status', status);
+    selecionados.forEach(id => formData.append('pedidos', id));
+    const response = await fetch(urls.updateStatusPedidos, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': getCookie('csrftoken') },
+        body: formData
+    });
+    const data = await response.json();
+    if (!data.success) {
+        alert(data.message);
+        return;
+    }
+    data.alterados.forEach(id => {
+        const card = pedidosList.querySelector(`.pedido-card[data-id="${id}"]`);
+        if (card) {
+            atualizarSelectStatus(card.querySelector('select[name="status"]'), status);
+            card.querySelector('.pedido-select').checked = false;
+        }
+    });
+    if (data.ignorados.length) {
+        alert(`Pedidos não atualizados: ${data.ignorados.map(id => '#' + id).join(', ')}`);
+    }
+});
+
+statusFilter.addEventListener('change', () => {
+    const params = new URLSearchParams({ tab: 'pedidos' });
+    if (statusFilter.value) {
+        params.set('status', statusFilter.value);
+    }
+    window.location.search = params.toString();
+});
+
+// Lógica de Tabs
+function setActiveTab(tabName) {
+    if (tabName === 'pedidos') {
+        pedidosTab.classList.add('active');
+        produtosTab.classList.remove('active');
+        pedidosContent.classList.add('active');
+        produtosContent.classList.remove('active');
+    } else {
+        produtosTab.classList.add('active');
+        pedidosTab.classList.remove('active');
+        produtosContent.classList.add('active');
+        pedidosContent.classList.remove('active');
+    }
+}
+produtosTab.addEventListener('click', () => setActiveTab('produtos'));
+pedidosTab.addEventListener('click', () => setActiveTab('pedidos'));
+document.addEventListener('DOMContentLoaded', () => {
+    const urlParams = new URLSearchParams(window.location.search);
+    const activeTab = urlParams.get('tab') || 'produtos';
+    setActiveTab(activeTab);
+});
+
+// Lógica dos Modais de Produto
+const addProductBtn = document.getElementById('add-product-btn');
+const productModalOverlay = document.getElementById('product-modal-overlay');
+const productForm = document.getElementById('product-form');
+const modalTitle = document.getElementById('modal-title');
+const productIdInput = document.getElementById('product-id');
+const nomeInput = document.getElementById('id_nome');
+const precoInput = document.getElementById('id_preco');
+const categoriaInput = document.getElementById('id_categoria');
+const modalCloseBtn = document.getElementById('modal-close-btn');
+const cancelBtn = document.getElementById('cancel-btn');
+
+const deleteModalOverlay = document.getElementById('delete-modal-overlay');
+const deleteConfirmBtn = document.getElementById('delete-confirm-btn');
+const deleteCancelBtn = document.getElementById('delete-cancel-btn');
+const deleteModalCloseBtn = document.getElementById('delete-modal-close-btn');
+const deleteProductName = document.getElementById('delete-product-name');
+
+const successModalOverlay = document.getElementById('success-modal-overlay');
+const successMessageText = document.getElementById('success-message-text');
+const successOkBtn = document.getElementById('success-ok-btn');
+const successModalCloseBtn = document.getElementById('success-modal-close-btn');
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.startsWith(name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+function showModal(modal, productId = null) {
+    const errorContainers = modal.querySelectorAll('.errorlist');
+    errorContainers.forEach(el => el.innerHTML = '');
+
+    if (productId) {
+        fetch(urls.editProduto.replace('0', productId))
+            .then(response => response.json())
+            .then(data => {
+                modalTitle.textContent = `Editar Produto: ${data.nome}`;
+                productIdInput.value = data.id;
+                nomeInput.value = data.nome;
+                precoInput.value = parseFloat(data.preco).toFixed(2);
+                categoriaInput.value = data.categoria;
+                productModalOverlay.classList.add('open');
+            });
+        } else {
+            modalTitle.textContent = 'Adicionar Produto';
+            productIdInput.value = '';
+            productForm.reset();
+            productModalOverlay.classList.add('open');
+        }
+    }
+    
+    function hideModal(modal) {
+        modal.classList.remove('open');
+    }
+
+    function showSuccessPopup(message) {
+        successMessageText.textContent = message;
+        successModalOverlay.classList.add('open');
+    }
+
+    addProductBtn.addEventListener('click', () => showModal(productModalOverlay));
+    productsGrid.addEventListener('click', (event) => {
+        const editBtn = event.target.closest('.edit-btn');
+        const deleteBtn = event.target.closest('.delete-btn');
+
+        if (editBtn) {
+            const productId = editBtn.dataset.id;
+            showModal(productModalOverlay, productId);
+        } else if (deleteBtn) {
+            const productId = deleteBtn.dataset.id;
+            const productName = deleteBtn.closest('.product-card').querySelector('h3').textContent;
+            deleteModalOverlay.dataset.id = productId;
+            deleteProductName.textContent = productName;
+            deleteModalOverlay.classList.add('open');
+        }
+    });
+
+    modalCloseBtn.addEventListener('click', () => hideModal(productModalOverlay));
+    cancelBtn.addEventListener('click', () => hideModal(productModalOverlay));
+    deleteModalCloseBtn.addEventListener('click', () => hideModal(deleteModalOverlay));
+    deleteCancelBtn.addEventListener('click', () => hideModal(deleteModalOverlay));
+    successOkBtn.addEventListener('click', () => hideModal(successModalOverlay));
+    successModalCloseBtn.addEventListener('click', () => hideModal(successModalOverlay));
+
+    productModalOverlay.addEventListener('click', (e) => {
+        if (e.target === productModalOverlay) hideModal(productModalOverlay);
+    });
+    deleteModalOverlay.addEventListener('click', (e) => {
+        if (e.target === deleteModalOverlay) hideModal(deleteModalOverlay);
+    });
+    successModalOverlay.addEventListener('click', (e) => {
+        if (e.target === successModalOverlay) hideModal(successModalOverlay);
+    });
+    
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.startsWith(name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+
+    productForm.addEventListener('submit', async (event) => {
+        event.preventDefault();
+        const productId = productIdInput.value;
+        const url = productId ? urls.editProduto.replace('0', productId) : urls.addProduto;
+        const method = 'POST';
+        const isAdding = !productId;
+
+        const formData = {
+            nome: nomeInput.value,
+            preco: precoInput.value,
+            categoria: categoriaInput.value
+        };
+
+        const response = await fetch(url, {
+            method: method,
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken'),
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+        if (data.success) {
+            hideModal(productModalOverlay);
+
+            // O card vem renderizado pelo servidor (o mesmo fragmento em cache da página)
+            if (isAdding) {
+                productsGrid.insertAdjacentHTML('beforeend', data.html);
+                showSuccessPopup('Produto adicionado com sucesso!');
+            } else {
+                const updatedCard = productsGrid.querySelector(`.product-card[data-id="${productId}"]`);
+                if (updatedCard) {
+                    updatedCard.outerHTML = data.html;
+                }
+                showSuccessPopup('Produto atualizado com sucesso!');
+            }
+        } else {
+            const errorContainers = productModalOverlay.querySelectorAll('.errorlist');
+            errorContainers.forEach(el => el.innerHTML = '');
+
+            for (const [field, errors] of Object.entries(data.errors)) {
+                const errorContainer = document.querySelector(`#id_${field}`).closest('.form-group').querySelector('.errorlist');
+                if (errorContainer) {
+                    errors.forEach(error => {
+                        const li = document.createElement('li');
+                        li.textContent = error;
+                        errorContainer.appendChild(li);
+                    });
+                }
+            }
+            console.error(data.errors);
+        }
+    });
+    
+    // Lógica para submissão da exclusão
+    deleteConfirmBtn.addEventListener('click', async () => {
+        const productId = deleteModalOverlay.dataset.id;
+        const url = urls.deleteProduto.replace('0', productId);
+
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken'),
+            },
+        });
+        const data = await response.json();
+        if (data.success) {
+            const cardToRemove = productsGrid.querySelector(`.product-card[data-id="${productId}"]`);
+            if (cardToRemove) {
+                cardToRemove.remove();
+            }
+            hideModal(deleteModalOverlay);
+            showSuccessPopup('Produto excluído com sucesso!');
+        } else {
+            alert('Não foi possível excluir o produto.');
+        }
+    });
+
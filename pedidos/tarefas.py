@@ -0,0 +1,147 @@
+# pedidos/tarefas.py
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Tarefa
+
+logger = logging.getLogger('pedidos.tarefas')
+
+BACKOFF_BASE = 2  # segundos antes da primeira retentativa; dobra a cada falha
+BACKOFF_MAXIMO = 10 * 60
+# Tarefa "executando" há mais tempo que isso é de um worker que morreu
+TIMEOUT_RESERVA = timedelta(minutes=10)
+
+
+class ReservaPerdida(Exception):
+    """A reserva expirou (TIMEOUT_RESERVA) e a tarefa foi entregue a outro worker."""
+
+
+def enfileirar(funcao, max_tentativas=5, atraso=None, **argumentos):
+    """
+    Grava a tarefa na fila. Dentro de uma transação, a tarefa só passa a
+    existir se a transação for confirmada (junto com o pedido que a gerou).
+    `funcao` é o caminho da função e `argumentos` precisam ser serializáveis em JSON.
+    """
+    executar_em = timezone.now() + atraso if atraso else timezone.now()
+    return Tarefa.objects.create(
+        funcao=funcao, argumentos=argumentos, max_tentativas=max_tentativas, executar_em=executar_em,
+    )
+
+
+def backoff(tentativas):
+    """Espera exponencial com jitter, para as retentativas não chegarem todas juntas."""
+    espera = min(BACKOFF_MAXIMO, BACKOFF_BASE * 2 ** (tentativas - 1))
+    return timedelta(seconds=espera * random.uniform(0.5, 1.0))
+
+
+def _candidatas(agora, limite):
+    """
+    Ids das tarefas prontas e das reservas expiradas. No PostgreSQL as linhas
+    travadas por outro worker são puladas (skip_locked) em vez de esperadas.
+    """
+    tarefas = Tarefa.objects.all()
+    if connection.features.has_select_for_update_skip_locked:
+        tarefas = tarefas.select_for_update(skip_locked=True)
+    pendentes = list(
+        tarefas.filter(status='pendente', executar_em__lte=agora)
+        .order_by('executar_em', 'id').values_list('id', flat=True)[:limite]
+    )
+    expiradas = list(
+        tarefas.filter(status='executando', reservada_em__lt=agora - TIMEOUT_RESERVA)
+        .order_by('reservada_em', 'id').values_list('id', flat=True)[:limite]
+    )
+    return pendentes, expiradas
+
+
+def reservar(limite):
+    """
+    Marca até `limite` tarefas prontas como "executando" para este worker. A
+    reserva é um UPDATE condicional que repete o filtro da leitura (pendente,
+    ou executando com a reserva expirada): se outro worker reservou a tarefa
+    entre a leitura e o UPDATE, a linha já não casa e fica de fora. Assim dois
+    workers nunca pegam a mesma tarefa, nem no READ COMMITTED do PostgreSQL.
+
+    Reservas expiradas são de workers que morreram no meio da execução e contam
+    como tentativa: a tarefa que derruba o worker toda vez para em max_tentativas.
+    """
+    agora = timezone.now()
+    expirou = Q(status='executando', reservada_em__lt=agora - TIMEOUT_RESERVA)
+    lote = uuid.uuid4().hex
+    with transaction.atomic():
+        pendentes, expiradas = _candidatas(agora, limite)
+        Tarefa.objects.filter(id__in=pendentes, status='pendente').update(
+            status='executando', reservada_por=lote, reservada_em=agora,
+        )
+        expiradas = Tarefa.objects.filter(expirou, id__in=expiradas)
+        expiradas.filter(tentativas__gte=F('max_tentativas') - 1).update(
+            status='falhou', tentativas=F('tentativas') + 1, reservada_por='', reservada_em=None,
+            erro='O worker parou durante a execução (reserva expirada).',
+        )
+        expiradas.update(
+            status='executando', reservada_por=lote, reservada_em=agora, tentativas=F('tentativas') + 1,
+        )
+    return list(Tarefa.objects.filter(reservada_por=lote, status='executando').order_by('executar_em', 'id'))
+
+
+def executar(tarefa):
+    """
+    Executa a tarefa e a marca como concluída na mesma transação: se a função
+    falhar, nada do que ela escreveu fica no banco e a tarefa volta para a fila
+    com backoff (ou é marcada como falha depois de max_tentativas).
+
+    Se a reserva expirou e outro worker pegou a tarefa, a conclusão não
+    encontra a linha e a transação é desfeita: as funções das tarefas (como
+    os incrementos com F() dos relatórios) não são idempotentes.
+    """
+    try:
+        with transaction.atomic():
+            import_string(tarefa.funcao)(**tarefa.argumentos)
+            concluidas = Tarefa.objects.filter(pk=tarefa.pk, reservada_por=tarefa.reservada_por).update(
+                status='concluida', tentativas=tarefa.tentativas + 1, erro='',
+            )
+            if not concluidas:
+                raise ReservaPerdida
+        return True
+    except ReservaPerdida:
+        logger.warning('Tarefa %s (%s) foi reservada por outro worker; resultado descartado.', tarefa.pk, tarefa.funcao)
+        return False
+    except Exception:
+        tentativas = tarefa.tentativas + 1
+        erro = traceback.format_exc()
+        if tentativas >= tarefa.max_tentativas:
+            logger.error('Tarefa %s (%s) falhou após %d tentativas:\n%s', tarefa.pk, tarefa.funcao, tentativas, erro)
+            campos = {'status': 'falhou'}
+        else:
+            logger.warning('Tarefa %s (%s) falhou; nova tentativa agendada.', tarefa.pk, tarefa.funcao)
+            campos = {'status': 'pendente', 'executar_em': timezone.now() + backoff(tentativas)}
+        Tarefa.objects.filter(pk=tarefa.pk, reservada_por=tarefa.reservada_por).update(
+            tentativas=tentativas, erro=erro, reservada_por='', reservada_em=None, **campos,
+        )
+        return False
+
+
+def _executar_no_pool(tarefa):
+    try:
+        return executar(tarefa)
+    finally:
+        # Cada thread do pool tem a própria conexão; respeita CONN_MAX_AGE
+        close_old_connections()
+
+
+def processar_pendentes(limite=100, executor=None):
+    """Reserva e executa um lote. Devolve quantas tarefas foram executadas."""
+    tarefas = reservar(limite)
+    if executor is None:
+        for tarefa in tarefas:
+            executar(tarefa)
+    else:
+        list(executor.map(_executar_no_pool, tarefas))
+    return len(tarefas)
@@ -1,3 +1,1346 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import busca, carrinho, despacho, middleware, ratelimit, respostas, tarefas
+from .autenticacao import CachedModelBackend
+from .benchmark import Benchmark, popular_banco
+from .models import (
+    ChaveIdempotencia, ContagemStatus, ItemCarrinho, Pedido, PedidoArquivado, PedidoQuerySet, Produto, ProdutoNoPedido,
+    Restaurante, Tarefa, TransicaoInvalida, User,
+)
+from .eventos import publicar_status_alterado
+from .importacao import abrir_texto, exportar_produtos, importar_produtos, ler_linhas
+from .middleware import InstrumentacaoMiddleware, metricas
+from .paginacao import FEED_PAGE_SIZE, codificar_cursor, decodificar_cursor
+from .arquivamento import arquivar_pedidos, data_de_corte
+from .despacho import Pendente, despachar, formar_lotes, simular_despacho
+from .exportacao import exportar_pedidos
+from .services import alterar_status, criar_pedido
+from .tarefas import TIMEOUT_RESERVA, enfileirar, executar, processar_pendentes, reservar
+
+
+def criar_restaurante(username='restaurante', nome='Restaurante'):
+    """Restaurante (tenant) e um usuário da equipe dele."""
+    loja = Restaurante.objects.create(nome=nome)
+    usuario = User.objects.create_user(username, password='senha', user_type='restaurante', restaurante=loja)
+    return loja, usuario
+
+
+class QueryCountMixin:
+    """Asserções sobre o número de consultas SQL feitas por uma view."""
+
+    def count_view_queries(self, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, data)
+        self.assertLess(response.status_code, 400)
+        return len(ctx.captured_queries)
+
+    def assertViewQueries(self, num, url, data=None):
+        self.assertEqual(self.count_view_queries(url, data), num)
+
+    def assertViewQueriesConstant(self, url, grow, data=None):
+        """Falha se o número de consultas crescer depois de `grow()` adicionar mais dados."""
+        self.client.get(url, data)  # aquece caches (ex.: cardápio)
+        antes = self.count_view_queries(url, data)
+        grow()
+        self.assertEqual(self.count_view_queries(url, data), antes)
+
+
+class FeedPedidosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.pedidos = [
+            Pedido.objects.create(
+                restaurante=cls.loja, cliente=cls.cliente, total=10, status='pedido' if i % 2 else 'em_preparo',
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.restaurante)
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        ids, cursor = [], None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('feed-pedidos'), params).json()
+            ids += [p['id'] for p in data['pedidos']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(ids, sorted((p.id for p in self.pedidos), reverse=True))
+
+    def test_filtra_por_status(self):
+        data = self.client.get(reverse('feed-pedidos'), {'status': 'pedido'}).json()
+        self.assertEqual({p['status'] for p in data['pedidos']}, {'pedido'})
+        self.assertEqual(len(data['pedidos']), 2)
+
+    def test_cursor_invalido(self):
+        response = self.client.get(reverse('feed-pedidos'), {'cursor': 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_meus_pedidos_do_cliente_sao_paginados(self):
+        Pedido.objects.bulk_create(
+            Pedido(restaurante=self.loja, cliente=self.cliente, total=10) for _ in range(FEED_PAGE_SIZE)
+        )
+        outro = User.objects.create_user('outro', password='senha', user_type='cliente')
+        Pedido.objects.create(restaurante=self.loja, cliente=outro, total=10)
+        self.client.force_login(self.cliente)
+        response = self.client.get(reverse('home'))
+        recentes = list(Pedido.objects.filter(cliente=self.cliente).order_by('-criado_em', '-id').values_list('id', flat=True))
+        self.assertEqual([p.id for p in response.context['pedidos']], recentes[:FEED_PAGE_SIZE])
+        data = self.client.get(reverse('feed-pedidos'), {'cursor': response.context['proximo_cursor']}).json()
+        self.assertEqual([p['id'] for p in data['pedidos']], recentes[FEED_PAGE_SIZE:])
+        self.assertIsNone(data['next_cursor'])
+
+
+class ConsultasPorViewTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.produtos = [
+            Produto.objects.create(restaurante=cls.loja, nome=f'Produto {i}', preco='9.90', categoria='Lanches')
+            for i in range(3)
+        ]
+        cls.pedido = cls.criar_pedido(cls.cliente)
+
+    @classmethod
+    def criar_pedido(cls, cliente, itens=3):
+        pedido = Pedido.objects.create(restaurante=cls.loja, cliente=cliente, total=0)
+        for produto in cls.produtos[:itens]:
+            ProdutoNoPedido.objects.create(pedido=pedido, produto=produto, quantidade=2, preco_unitario=produto.preco)
+        return pedido
+
+    def mais_pedidos(self):
+        for i in range(5):
+            outro = User.objects.create_user(f'cliente{i}', password='senha')
+            self.criar_pedido(outro)
+
+    def test_home_restaurante(self):
+        self.client.force_login(self.restaurante)
+        self.assertViewQueriesConstant(reverse('home'), self.mais_pedidos)
+
+    def test_feed_pedidos(self):
+        self.client.force_login(self.restaurante)
+        self.assertViewQueriesConstant(reverse('feed-pedidos'), self.mais_pedidos)
+
+    def test_detalhes_pedido(self):
+        self.client.force_login(self.restaurante)
+        # usuário (só na primeira requisição após o login; a sessão vem do cache),
+        # pedido + cliente, itens + produtos
+        self.assertViewQueries(3, reverse('detalhes-pedido', args=[self.pedido.id]))
+        self.assertViewQueries(2, reverse('detalhes-pedido', args=[self.pedido.id]))
+
+    def test_order_detail(self):
+        self.client.force_login(self.cliente)
+        self.assertViewQueries(3, reverse('order_detail', args=[self.pedido.id]))
+
+
+class CriarPedidoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.produtos = [
+            Produto.objects.create(restaurante=cls.loja, nome=f'Produto {i}', preco=f'{i + 1}.50', categoria='Lanches')
+            for i in range(10)
+        ]
+
+    def test_consultas_nao_crescem_com_o_carrinho(self):
+        # in_bulk, SAVEPOINT, INSERT do pedido, bulk INSERT dos itens,
+        # INSERT da tarefa de relatório, RELEASE
+        with self.assertNumQueries(6):
+            criar_pedido(self.cliente, {p.id: 1 for p in self.produtos[:2]})
+        with self.assertNumQueries(6):
+            criar_pedido(self.cliente, {p.id: 1 for p in self.produtos})
+
+    def test_copia_preco_e_calcula_total(self):
+        pedido = criar_pedido(self.cliente, {str(self.produtos[0].id): 2, self.produtos[1].id: 1})
+        Produto.objects.filter(id=self.produtos[0].id).update(preco='99.00')
+        item = pedido.itens.get(produto=self.produtos[0])
+        self.assertEqual(str(item.preco_unitario), '1.50')
+        self.assertEqual(str(pedido.total), '5.50')
+
+    def test_produto_inexistente(self):
+        with self.assertRaises(Produto.DoesNotExist):
+            criar_pedido(self.cliente, {0: 1})
+        self.assertFalse(Pedido.objects.exists())
+
+
+class BuscaProdutosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.hamburguer = Produto.objects.create(
+            restaurante=cls.loja, nome='Hambúrguer Clássico', preco='25.90', categoria='Lanches',
+        )
+        cls.pizza = Produto.objects.create(
+            restaurante=cls.loja, nome='Pizza de Calabresa', preco='49.90', categoria='Pizzas',
+        )
+        cls.suco = Produto.objects.create(restaurante=cls.loja, nome='Suco de Laranja', preco='8.00', categoria='Bebidas')
+
+    def setUp(self):
+        cache.clear()
+
+    def buscar(self, q, **params):
+        response = self.client.get(reverse('search_products'), {'q': q, **params})
+        return [p['nome'] for p in response.json()]
+
+    def test_ignora_acentos_e_casa_prefixo(self):
+        self.assertEqual(self.buscar('hamburguer'), ['Hambúrguer Clássico'])
+        self.assertEqual(self.buscar('HAMB'), ['Hambúrguer Clássico'])
+        self.assertEqual(self.buscar('piz cala'), ['Pizza de Calabresa'])
+
+    def test_nome_tem_prioridade_sobre_categoria(self):
+        Produto.objects.create(restaurante=self.loja, nome='Refrigerante', preco='6.00', categoria='Pizzas e Bebidas')
+        self.assertEqual(self.buscar('pizza'), ['Pizza de Calabresa', 'Refrigerante'])
+
+    def test_busca_vazia_e_limite(self):
+        self.assertEqual(self.buscar(''), [])
+        self.assertEqual(len(self.buscar('de', limit=1)), 1)
+
+    def test_indice_acompanha_edicao_e_exclusao(self):
+        self.suco.nome = 'Suco de Uva'
+        self.suco.save()
+        self.assertEqual(self.buscar('uva'), ['Suco de Uva'])
+        self.assertEqual(self.buscar('laranja'), [])
+        self.pizza.delete()
+        self.assertEqual(self.buscar('pizza'), [])
+
+    def test_ranking_considera_todos_os_produtos_que_casam(self):
+        # Centenas de produtos casam só pela categoria; o que casa pelo nome é o
+        # último do índice e ainda assim vem primeiro
+        Produto.objects.bulk_create(
+            Produto(restaurante=self.loja, nome=f'Bebida {i}', preco='5.00', categoria='Pizzaria')
+            for i in range(600)
+        )
+        busca.reindexar()
+        especial = Produto.objects.create(restaurante=self.loja, nome='Pizzaria Especial', preco='9.00', categoria='Outros')
+        resultado = busca.buscar_produtos('pizza', limite=3)
+        self.assertEqual([p.id for p in resultado[:2]], [especial.id, self.pizza.id])
+
+
+@override_settings(PEDIDOS_RATE_LIMITS={'busca': {'capacidade': 3, 'por_segundo': 1}})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit.get_backend.cache_clear()
+        self.addCleanup(ratelimit.get_backend.cache_clear)
+
+    def test_busca_responde_429_com_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(reverse('search_products'), {'q': 'x'}).status_code, 200)
+        response = self.client.get(reverse('search_products'), {'q': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        # Outro IP tem o próprio balde
+        outro = self.client.get(reverse('search_products'), {'q': 'x'}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(outro.status_code, 200)
+
+    def test_fichas_voltam_com_o_tempo(self):
+        for backend in (ratelimit.InMemoryBackend(), ratelimit.CacheBackend(prefixo='teste-ratelimit')):
+            with mock.patch('time.monotonic', return_value=1000.0), mock.patch('time.time', return_value=1000.0):
+                resultados = [backend.consumir('chave', 2, 0.5)[0] for _ in range(3)]
+                self.assertEqual(resultados, [True, True, False])
+                self.assertAlmostEqual(backend.consumir('chave', 2, 0.5)[1], 2.0)
+            with mock.patch('time.monotonic', return_value=1002.0), mock.patch('time.time', return_value=1002.0):
+                self.assertEqual(backend.consumir('chave', 2, 0.5), (True, 0))
+
+
+class CacheCardapioTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = Restaurante.objects.create(nome='Restaurante')
+        self.produto = Produto.objects.create(restaurante=self.loja, nome='Pastel', preco='7.00', categoria='Lanches')
+
+    def test_etag_evita_consultas(self):
+        response = self.client.get(reverse('cardapio'))
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cardapio'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_alteracao_de_produto_invalida_o_cache(self):
+        etag = self.client.get(reverse('cardapio'))['ETag']
+        self.produto.preco = '8.00'
+        self.produto.save()
+        response = self.client.get(reverse('cardapio'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['preco'], '8.00')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('cardapio'))
+
+
+class FragmentosTemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.produto = Produto.objects.create(restaurante=cls.loja, nome='Pastel', preco='7.00', categoria='Lanches')
+
+    def setUp(self):
+        cache.clear()
+        caches['template_fragments'].clear()
+        self.client.force_login(self.restaurante)
+
+    def test_grid_vem_do_cache_ate_o_cardapio_mudar(self):
+        self.client.get(reverse('home'))
+        with mock.patch('pedidos.cardapio.Produto.objects') as produtos:
+            response = self.client.get(reverse('home'))
+        produtos.all.assert_not_called()
+        self.assertContains(response, 'Pastel')
+
+        response = self.client.post(
+            reverse('edit-produto', args=[self.produto.id]),
+            {'nome': 'Pastel de Queijo', 'preco': '7.50', 'categoria': 'Lanches'},
+            content_type='application/json',
+        )
+        html = response.json()['html']
+        self.assertIn('Pastel de Queijo', html)
+        self.assertIn(f'data-id="{self.produto.id}"', html)
+        self.assertContains(self.client.get(reverse('home')), html, html=True)
+
+    def test_css_e_js_sao_arquivos_estaticos(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, '/static/pedidos/js/restaurante_home.js')
+        self.assertContains(response, '/static/pedidos/css/restaurante_home.css')
+        self.assertNotContains(response, '<style>')
+
+
+class CarrinhoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        cls.suco = Produto.objects.create(restaurante=cls.loja, nome='Suco', preco='5.00', categoria='Bebidas')
+
+    def setUp(self):
+        self.client.force_login(self.cliente)
+
+    def adicionar(self, produto):
+        return self.client.post(reverse('add_to_cart', args=[produto.id])).json()['cart_item_count']
+
+    def test_adiciona_remove_e_mantem_contagem(self):
+        self.assertEqual(self.adicionar(self.lanche), 1)
+        self.assertEqual(self.adicionar(self.lanche), 2)
+        self.assertEqual(self.adicionar(self.suco), 3)
+        self.client.post(reverse('remove_from_cart', args=[self.lanche.id]))
+        self.assertEqual(carrinho.contar_itens(self.cliente), 1)
+        response = self.client.get(reverse('cart'))
+        self.assertEqual(response.context['cart_total'], Decimal('5.00'))
+
+    def test_exclusao_de_produto_desconta_do_carrinho(self):
+        self.adicionar(self.lanche)
+        self.adicionar(self.suco)
+        self.suco.delete()
+        self.assertEqual(carrinho.contar_itens(self.cliente), 1)
+
+    def test_checkout_esvazia_o_carrinho(self):
+        self.adicionar(self.lanche)
+        self.adicionar(self.lanche)
+        self.client.post(reverse('checkout'))
+        pedido = Pedido.objects.get(cliente=self.cliente)
+        self.assertEqual(pedido.total, Decimal('20.00'))
+        self.assertEqual(carrinho.contar_itens(self.cliente), 0)
+        self.assertFalse(ItemCarrinho.objects.exists())
+
+    def test_migra_carrinho_da_sessao(self):
+        session = self.client.session
+        session['cart'] = {
+            str(self.lanche.id): {'quantidade': 2, 'nome': 'Lanche', 'preco': '10.00'},
+            '999999': {'quantidade': 1, 'nome': 'Removido', 'preco': '1.00'},
+        }
+        session.save()
+        self.assertEqual(self.adicionar(self.suco), 3)
+        self.assertNotIn('cart', self.client.session)
+
+    def test_adicionar_item_e_um_update_e_um_upsert(self):
+        self.adicionar(self.lanche)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(carrinho.adicionar_item(self.cliente, self.lanche.id), 2)
+            self.assertEqual(carrinho.adicionar_item(self.cliente, self.suco.id, 3), 5)
+        comandos = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(comandos), 4)
+        self.assertEqual(
+            dict(ItemCarrinho.objects.values_list('produto_id', 'quantidade')), {self.lanche.id: 2, self.suco.id: 3}
+        )
+
+    def test_checkout_so_tira_do_carrinho_os_itens_do_pedido(self):
+        self.adicionar(self.lanche)
+
+        def criar_e_adicionar(cliente, itens):
+            # Item que chega depois da leitura dos itens do carrinho
+            pedido = criar_pedido(cliente, itens)
+            carrinho.adicionar_item(cliente, self.suco.id)
+            return pedido
+
+        with mock.patch.object(carrinho, 'criar_pedido', criar_e_adicionar):
+            carrinho.finalizar_carrinho(self.cliente)
+        self.assertEqual(Pedido.objects.get(cliente=self.cliente).total, Decimal('10.00'))
+        self.assertEqual(list(ItemCarrinho.objects.values_list('produto_id', flat=True)), [self.suco.id])
+        self.assertEqual(carrinho.contar_itens(self.cliente), 1)
+
+
+class IdempotenciaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+
+    def setUp(self):
+        self.client.force_login(self.cliente)
+
+    def test_checkout_repetido_nao_duplica_pedido(self):
+        self.client.post(reverse('add_to_cart', args=[self.lanche.id]))
+        chave = self.client.get(reverse('cart')).context['idempotency_key']
+        primeira = self.client.post(reverse('checkout'), {'idempotency_key': chave})
+        with self.assertNumQueries(1):  # chave gravada (sessão e usuário vêm do cache)
+            repetida = self.client.post(reverse('checkout'), {'idempotency_key': chave})
+        self.assertEqual(Pedido.objects.filter(cliente=self.cliente).count(), 1)
+        self.assertEqual(repetida.status_code, primeira.status_code)
+        self.assertEqual(repetida['Location'], primeira['Location'])
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+
+    def test_add_to_cart_repetido_devolve_a_resposta_original(self):
+        url = reverse('add_to_cart', args=[self.lanche.id])
+        primeira = self.client.post(url, HTTP_IDEMPOTENCY_KEY='abc')
+        repetida = self.client.post(url, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(repetida.json(), primeira.json())
+        self.assertEqual(carrinho.contar_itens(self.cliente), 1)
+
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY='def')
+        self.assertEqual(carrinho.contar_itens(self.cliente), 2)
+
+        outra_operacao = self.client.post(reverse('checkout'), HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(outra_operacao.status_code, 422)
+
+        # Chaves expiradas podem ser reaproveitadas
+        ChaveIdempotencia.objects.update(criado_em=timezone.now() - timedelta(days=2))
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(carrinho.contar_itens(self.cliente), 3)
+
+
+class EventosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.produto = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+
+    async def test_stream_recebe_status_alterado(self):
+        pedido = await Pedido.objects.acreate(restaurante=self.loja, cliente=self.cliente, total=10)
+        await self.async_client.aforce_login(self.cliente)
+        response = await self.async_client.get(reverse('eventos-pedidos'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        proximo = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)  # deixa o stream assinar o canal
+        pedido.status = 'em_preparo'
+        publicar_status_alterado(pedido)
+        chunk = await asyncio.wait_for(proximo, 1)
+        self.assertTrue(chunk.startswith(b'event: status_alterado\n'))
+        self.assertIn(b'"status": "em_preparo"', chunk)
+        await stream.aclose()
+
+    def test_checkout_publica_pedido_criado(self):
+        with mock.patch('pedidos.services.publicar_pedido_criado') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                pedido = criar_pedido(self.cliente, {self.produto.id: 1})
+        publicar.assert_called_once_with(pedido)
+
+
+class ApiTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.outro = User.objects.create_user('outro', password='senha', user_type='cliente')
+        cls.produto = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        for cliente in (cls.cliente, cls.cliente, cls.outro):
+            criar_pedido(cliente, {cls.produto.id: 2})
+
+    def test_cliente_ve_apenas_os_proprios_pedidos(self):
+        self.client.force_login(self.cliente)
+        data = self.client.get(reverse('api-pedidos')).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['results'][0]['itens'][0]['produto']['nome'], 'Lanche')
+
+    def test_paginacao_por_cursor(self):
+        self.client.force_login(self.restaurante)
+        data = self.client.get(reverse('api-pedidos'), {'limit': 2}).json()
+        self.assertEqual(len(data['results']), 2)
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+    def test_selecao_de_campos_evita_prefetch(self):
+        self.client.force_login(self.restaurante)
+        data = self.client.get(reverse('api-pedidos'), {'fields': 'id,status'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'status'})
+        # pedidos (sem JOIN de cliente nem prefetch de itens)
+        self.assertViewQueries(1, reverse('api-pedidos'), {'fields': 'id,status'})
+
+    def test_consultas_constantes(self):
+        self.client.force_login(self.restaurante)
+        self.assertViewQueriesConstant(
+            reverse('api-pedidos'), lambda: criar_pedido(self.outro, {self.produto.id: 1})
+        )
+
+    def test_produtos(self):
+        self.client.force_login(self.cliente)
+        data = self.client.get(reverse('api-produto', args=[self.produto.id]), {'fields': 'nome'}).json()
+        self.assertEqual(data, {'nome': 'Lanche'})
+        self.assertEqual(len(self.client.get(reverse('api-produtos')).json()['results']), 1)
+
+
+class BenchmarkTests(TestCase):
+    def test_fluxo_completo_sem_erros(self):
+        restaurante, clientes, produtos = popular_banco(clientes=3, produtos=10, pedidos=20, itens_por_pedido=2)
+        self.assertEqual(ProdutoNoPedido.objects.count(), 40)
+        relatorio = Benchmark(Client, restaurante, clientes, produtos).executar(iteracoes=2)
+        self.assertEqual(relatorio['checkout']['n'], 2)
+        self.assertFalse(any(dados['erros'] for dados in relatorio.values()))
+        self.assertEqual(Pedido.objects.count(), 22)
+
+
+class InstrumentacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        for i in range(6):
+            Produto.objects.create(restaurante=cls.loja, nome=f'Produto {i}', preco='1.00', categoria='Lanches')
+
+    def setUp(self):
+        metricas.limpar()
+
+    def test_server_timing(self):
+        self.client.force_login(self.cliente)
+        response = self.client.get(reverse('home'))
+        timing = response['Server-Timing']
+        for metrica in ('db;dur=', 'session;dur=', 'tpl;dur=', 'total;dur='):
+            self.assertIn(metrica, timing)
+        self.assertNotIn('X-N-Plus-One', response)
+        self.assertEqual(metricas.resumo()['home']['requests'], 1)
+
+    def test_detecta_n_mais_1(self):
+        def view_n_mais_1(request):
+            for produto in Produto.objects.all():
+                Produto.objects.filter(id=produto.id).exists()
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        with self.assertLogs('pedidos.instrumentacao', 'WARNING'):
+            response = InstrumentacaoMiddleware(view_n_mais_1)(request)
+        self.assertEqual(response['X-N-Plus-One'], '1')
+        self.assertEqual(metricas.resumo()['/']['n_mais_1'], 1)
+
+
+class RelatorioVendasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.10', categoria='Lanches')
+        cls.suco = Produto.objects.create(restaurante=cls.loja, nome='Suco', preco='5.05', categoria='Bebidas')
+
+    def test_agregados_acompanham_pedidos_e_status(self):
+        pedido = criar_pedido(self.cliente, {self.lanche.id: 1, self.suco.id: 3})
+        criar_pedido(self.cliente, {self.lanche.id: 2})
+        self.client.force_login(self.restaurante)
+        self.client.post(reverse('update-status-pedido', args=[pedido.id]), {'status': 'em_preparo'})
+        self.assertEqual(processar_pendentes(), 3)
+
+        with self.assertNumQueries(3):  # 3 consultas de agregados
+            data = self.client.get(reverse('relatorio-vendas')).json()
+        self.assertEqual(
+            [(p['produto_nome'], p['quantidade'], p['receita']) for p in data['mais_vendidos']],
+            [('Lanche', 3, '30.30'), ('Suco', 3, '15.15')],
+        )
+        self.assertEqual(data['receita_por_dia'][0]['pedidos'], 2)
+        self.assertEqual(data['receita_por_dia'][0]['receita'], '45.45')
+        self.assertEqual(data['pedidos_por_status'], {'pedido': 1, 'em_preparo': 1, 'saiu_para_entrega': 0})
+
+
+class TransicoesStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+
+    def setUp(self):
+        self.client.force_login(self.restaurante)
+
+    def contagens(self):
+        processar_pendentes()
+        return dict(ContagemStatus.objects.values_list('status', 'quantidade'))
+
+    def test_update_condicional_nao_repete_transicao(self):
+        pedido = criar_pedido(self.cliente, {self.lanche.id: 1})
+        # Duas abas com o pedido ainda em "pedido": só a primeira muda o status
+        self.assertEqual(Pedido.objects.filter(id=pedido.id).transitar('pedido', 'em_preparo'), 1)
+        self.assertEqual(Pedido.objects.filter(id=pedido.id).transitar('pedido', 'em_preparo'), 0)
+        with self.assertRaises(TransicaoInvalida):
+            Pedido.objects.filter(id=pedido.id).transitar('saiu_para_entrega', 'pedido')
+
+    def test_view_rejeita_transicao_invalida(self):
+        pedido = criar_pedido(self.cliente, {self.lanche.id: 1})
+        url = reverse('update-status-pedido', args=[pedido.id])
+        self.client.post(url, {'status': 'saiu_para_entrega'})  # pula "em_preparo"
+        pedido.refresh_from_db()
+        self.assertEqual(pedido.status, 'pedido')
+
+        self.client.post(url, {'status': 'em_preparo'})
+        self.client.post(url, {'status': 'em_preparo'})
+        pedido.refresh_from_db()
+        self.assertEqual(pedido.status, 'em_preparo')
+        self.assertEqual(self.contagens(), {'pedido': 0, 'em_preparo': 1})
+
+        response = self.client.post(reverse('update-status-pedido', args=[pedido.id + 100]), {'status': 'em_preparo'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_so_devolve_os_pedidos_que_o_update_moveu(self):
+        pedidos = [criar_pedido(self.cliente, {self.lanche.id: 1}) for _ in range(2)]
+        transitar_ids = PedidoQuerySet.transitar_ids
+
+        def outra_transacao_no_meio(queryset, de, para):
+            # Simula outra transação levando o pedido ao mesmo status entre o SELECT e o UPDATE
+            Pedido.objects.filter(id=pedidos[0].id).update(status='em_preparo')
+            return transitar_ids(queryset, de, para)
+
+        with mock.patch.object(PedidoQuerySet, 'transitar_ids', outra_transacao_no_meio):
+            alterados = alterar_status(Pedido.objects.filter(id__in=[p.id for p in pedidos]), 'em_preparo')
+        self.assertEqual(alterados, [pedidos[1].id])
+        # O pedido alterado por fora não entra na contagem de "em_preparo"
+        self.assertEqual(self.contagens(), {'pedido': 1, 'em_preparo': 1})
+
+    def test_atualizacao_em_lote(self):
+        pedidos = [criar_pedido(self.cliente, {self.lanche.id: 1}) for _ in range(3)]
+        alterar_status(Pedido.objects.filter(id=pedidos[0].id), 'em_preparo')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('update-status-pedidos'), {
+                'status': 'em_preparo', 'pedidos': [p.id for p in pedidos],
+            })
+        data = response.json()
+        self.assertEqual(data['alterados'], [pedidos[1].id, pedidos[2].id])
+        self.assertEqual(data['ignorados'], [pedidos[0].id])
+        self.assertEqual(Pedido.objects.filter(status='em_preparo').count(), 3)
+        self.assertEqual(self.contagens(), {'pedido': 0, 'em_preparo': 3})
+
+        response = self.client.post(reverse('update-status-pedidos'), {'status': 'x', 'pedidos': [pedidos[0].id]})
+        self.assertEqual(response.status_code, 400)
+
+
+class ArquivamentoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+
+    def criar(self, status, dias_atras):
+        pedido = criar_pedido(self.cliente, {self.lanche.id: 2})
+        Pedido.objects.filter(pk=pedido.pk).update(status=status, criado_em=timezone.now() - timedelta(days=dias_atras))
+        return pedido
+
+    def test_arquiva_so_pedidos_entregues_antigos_em_lotes(self):
+        antigos = [self.criar('saiu_para_entrega', 100) for _ in range(3)]
+        em_preparo = self.criar('em_preparo', 100)
+        recente = self.criar('saiu_para_entrega', 1)
+
+        self.assertEqual(arquivar_pedidos(data_de_corte(90), batch_size=2), 3)
+        self.assertEqual(set(Pedido.objects.values_list('id', flat=True)), {em_preparo.id, recente.id})
+        self.assertEqual(set(PedidoArquivado.objects.values_list('id', flat=True)), {p.id for p in antigos})
+        self.assertFalse(ProdutoNoPedido.objects.filter(pedido_id__in=[p.id for p in antigos]).exists())
+        self.assertEqual(arquivar_pedidos(data_de_corte(90)), 0)
+
+    def test_detalhes_de_pedido_arquivado(self):
+        pedido = self.criar('saiu_para_entrega', 100)
+        arquivar_pedidos(data_de_corte(90))
+        self.lanche.delete()  # o arquivo guarda o nome do produto
+
+        self.client.force_login(self.cliente)
+        response = self.client.get(reverse('order_detail', args=[pedido.id]))
+        self.assertContains(response, 'Lanche')
+        self.assertContains(response, 'R$ 20.00')
+
+        self.client.force_login(self.restaurante)
+        data = self.client.get(reverse('detalhes-pedido', args=[pedido.id])).json()
+        self.assertEqual(data['itens'], [
+            {'produto_nome': 'Lanche', 'quantidade': 2, 'preco_unitario': '10.00', 'subtotal': '20.00'},
+        ])
+
+
+def tarefa_que_falha(produto_id):
+    Produto.objects.filter(pk=produto_id).update(nome='Alterado')
+    raise RuntimeError('falha simulada')
+
+
+class TarefasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.produto = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+
+    def test_falha_desfaz_escritas_e_agenda_retentativa(self):
+        tarefa = enfileirar('pedidos.tests.tarefa_que_falha', max_tentativas=2, produto_id=self.produto.id)
+        with self.assertLogs('pedidos.tarefas', 'WARNING'):
+            self.assertEqual(processar_pendentes(), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('pendente', 1))
+        self.assertGreater(tarefa.executar_em, timezone.now())
+        self.assertIn('falha simulada', tarefa.erro)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.nome, 'Lanche')
+
+        # Ainda no backoff: nada a executar
+        self.assertEqual(processar_pendentes(), 0)
+        Tarefa.objects.update(executar_em=timezone.now())
+        with self.assertLogs('pedidos.tarefas', 'ERROR'):
+            processar_pendentes()
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('falhou', 2))
+
+    def test_reserva_nao_entrega_a_mesma_tarefa_duas_vezes(self):
+        for _ in range(3):
+            enfileirar(
+                'pedidos.relatorios.registrar_mudanca_status',
+                restaurante_id=self.loja.id, status_anterior='pedido', status_novo='em_preparo',
+            )
+        primeiro, segundo = reservar(2), reservar(2)
+        self.assertEqual(len(primeiro), 2)
+        self.assertEqual(len(segundo), 1)
+        self.assertFalse({t.id for t in primeiro} & {t.id for t in segundo})
+        self.assertTrue(all(executar(t) for t in primeiro + segundo))
+        self.assertEqual(Tarefa.objects.filter(status='concluida').count(), 3)
+
+    def test_reserva_expirada_nao_executa_duas_vezes(self):
+        enfileirar(
+            'pedidos.relatorios.registrar_mudanca_status',
+            restaurante_id=self.loja.id, status_anterior='pedido', status_novo='em_preparo',
+        )
+        lenta, = reservar(1)
+        # O worker demorou mais que TIMEOUT_RESERVA: outro worker reserva a mesma tarefa
+        Tarefa.objects.update(reservada_em=timezone.now() - TIMEOUT_RESERVA - timedelta(seconds=1))
+        nova, = reservar(1)
+        self.assertEqual(nova.id, lenta.id)
+
+        with self.assertLogs('pedidos.tarefas', 'WARNING'):
+            self.assertFalse(executar(lenta))
+        self.assertFalse(ContagemStatus.objects.filter(restaurante=self.loja, status='em_preparo').exists())
+        self.assertTrue(executar(nova))
+        self.assertEqual(ContagemStatus.objects.get(restaurante=self.loja, status='em_preparo').quantidade, 1)
+        # A reserva perdida conta como tentativa
+        self.assertEqual(Tarefa.objects.get().tentativas, 2)
+
+    def test_reservas_intercaladas_nao_pegam_a_mesma_tarefa(self):
+        for _ in range(2):
+            enfileirar(
+                'pedidos.relatorios.registrar_mudanca_status',
+                restaurante_id=self.loja.id, status_anterior='pedido', status_novo='em_preparo',
+            )
+        # O segundo worker lê as mesmas tarefas antes de o primeiro reservá-las
+        lidas = tarefas._candidatas(timezone.now(), 2)
+        primeiro = reservar(2)
+        with mock.patch.object(tarefas, '_candidatas', return_value=lidas):
+            segundo = reservar(2)
+        self.assertEqual(len(primeiro), 2)
+        self.assertEqual(segundo, [])
+
+        # O mesmo vale para uma reserva expirada que outro worker já retomou
+        Tarefa.objects.update(reservada_em=timezone.now() - TIMEOUT_RESERVA - timedelta(seconds=1))
+        lidas = tarefas._candidatas(timezone.now(), 2)
+        terceiro = reservar(2)
+        with mock.patch.object(tarefas, '_candidatas', return_value=lidas):
+            self.assertEqual(reservar(2), [])
+        self.assertEqual(len(terceiro), 2)
+        self.assertEqual(set(Tarefa.objects.values_list('tentativas', flat=True)), {1})
+
+    def test_tarefa_que_derruba_o_worker_para_em_max_tentativas(self):
+        tarefa = enfileirar('pedidos.tests.tarefa_que_falha', max_tentativas=2, produto_id=self.produto.id)
+        for _ in range(2):
+            reservar(1)
+            Tarefa.objects.update(reservada_em=timezone.now() - TIMEOUT_RESERVA - timedelta(seconds=1))
+        self.assertEqual(reservar(1), [])
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('falhou', 2))
+
+
+def plano_de_consulta(queryset):
+    """Linhas do EXPLAIN QUERY PLAN (SQLite) da consulta do queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [linha[-1] for linha in cursor.fetchall()]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'PRAGMAs específicos do SQLite')
+class ConfiguracaoSQLiteTests(TestCase):
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nome}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_de_concorrencia(self):
+        # O banco de teste fica em memória (journal_mode "memory"), mas os demais valem
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertGreaterEqual(self.pragma('busy_timeout'), 1000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN é específico do SQLite')
+class PlanoDeConsultaTests(TestCase):
+    """Falha se alguma consulta frequente voltar a varrer a tabela inteira ou ordenar em memória."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.produto = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        cls.pedido = criar_pedido(cls.cliente, {cls.produto.id: 1})
+
+    def assertUsaIndices(self, queryset):
+        plano = plano_de_consulta(queryset)
+        for linha in plano:
+            self.assertNotRegex(linha, r'^SCAN \S+$', f'varredura completa: {plano}')
+            self.assertNotIn('TEMP B-TREE', linha, f'ordenação sem índice: {plano}')
+
+    def test_pedidos_do_cliente(self):
+        self.assertUsaIndices(Pedido.objects.filter(cliente=self.cliente).order_by('-criado_em'))
+
+    def test_feed_do_restaurante(self):
+        cursor = codificar_cursor(self.pedido)
+        for status in (None, 'pedido'):
+            pedidos = Pedido.objects.do_restaurante(self.loja).with_cliente()
+            if status:
+                pedidos = pedidos.filter(status=status)
+            pedidos = pedidos.order_by('-criado_em', '-id')
+            self.assertUsaIndices(pedidos[:21])
+            criado_em, pedido_id = decodificar_cursor(cursor)
+            self.assertUsaIndices(pedidos.filter(
+                Q(criado_em__lt=criado_em) | Q(criado_em=criado_em, id__lt=pedido_id)
+            )[:21])
+
+    def test_detalhe_do_pedido_do_cliente(self):
+        self.assertUsaIndices(Pedido.objects.filter(id=self.pedido.id, cliente=self.cliente))
+
+    def test_itens_do_pedido(self):
+        self.assertUsaIndices(ProdutoNoPedido.objects.filter(pedido=self.pedido).select_related('produto'))
+
+    def test_produtos_por_categoria(self):
+        self.assertUsaIndices(Produto.objects.do_restaurante(self.loja).filter(categoria='Lanches').order_by('nome'))
+
+    def test_carrinho_do_cliente(self):
+        self.assertUsaIndices(ItemCarrinho.objects.filter(carrinho__cliente=self.cliente).select_related('produto'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Índices de trigramas específicos do PostgreSQL')
+class BuscaPostgreSQLTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja = Restaurante.objects.create(nome='Restaurante')
+        Produto.objects.create(restaurante=cls.loja, nome='Hambúrguer Clássico', preco='25.90', categoria='Lanches')
+        Produto.objects.create(restaurante=cls.loja, nome='Pizza de Calabresa', preco='49.90', categoria='Pizzas')
+        Produto.objects.create(restaurante=cls.loja, nome='Refrigerante', preco='6.00', categoria='Pizzas e Bebidas')
+
+    def nomes(self, q):
+        return [p.nome for p in busca.buscar_produtos(q)]
+
+    def test_ignora_acentos_casa_prefixo_e_prioriza_nome(self):
+        self.assertEqual(self.nomes('HAMBURGUER'), ['Hambúrguer Clássico'])
+        self.assertEqual(self.nomes('piz cala'), ['Pizza de Calabresa'])
+        self.assertEqual(self.nomes('pizza'), ['Pizza de Calabresa', 'Refrigerante'])
+        # Prefixo de palavra, não substring
+        self.assertEqual(self.nomes('urguer'), [])
+
+    def test_usa_indice_de_trigramas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(
+                f'EXPLAIN SELECT id FROM pedidos_produto WHERE {busca.FUNCAO_NORMALIZAR}(nome) ~ %s',
+                [r'\mcalab'],
+            )
+            plano = '\n'.join(linha[0] for linha in cursor.fetchall())
+        self.assertIn('produto_nome_trgm_idx', plano)
+
+
+class ImportacaoProdutosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.existente = Produto.objects.create(restaurante=cls.loja, nome='Antigo', preco='1.00', categoria='Lanches')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.restaurante)
+
+    def importar(self, nome, conteudo):
+        arquivo = SimpleUploadedFile(nome, conteudo.encode())
+        return self.client.post(reverse('importar-produtos'), {'arquivo': arquivo}).json()
+
+    def test_importa_csv_com_upsert_e_erros_por_linha(self):
+        data = self.importar('menu.csv', (
+            'id,nome,preco,categoria\n'
+            f'{self.existente.id},Atualizado,2.50,Lanches\n'
+            ',Açaí,12.00,Sobremesas\n'
+            ',Sem preço,,Bebidas\n'
+        ))
+        self.assertEqual((data['importados'], data['com_erro']), (2, 1))
+        self.assertEqual(data['erros'][0]['linha'], 4)
+        self.assertIn('preco', data['erros'][0]['erros'])
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.nome, 'Atualizado')
+        self.assertEqual(busca.buscar_produtos('acai')[0].nome, 'Açaí')
+
+    def test_importa_jsonl_em_lotes(self):
+        linhas = '\n'.join(
+            json.dumps({'nome': f'Produto {i}', 'preco': '3.00', 'categoria': 'Lanches'}) for i in range(7)
+        )
+        arquivo = SimpleUploadedFile('menu.jsonl', (linhas + '\n{quebrado\n').encode())
+        resultado = importar_produtos(ler_linhas(abrir_texto(arquivo.file), 'jsonl'), self.loja.id, batch_size=3)
+        self.assertEqual((resultado.importados, resultado.com_erro), (7, 1))
+        self.assertEqual(Produto.objects.count(), 8)
+
+    def test_exporta_e_reimporta(self):
+        response = self.client.get(reverse('exportar-produtos'), {'formato': 'jsonl'})
+        conteudo = b''.join(response.streaming_content).decode()
+        self.assertEqual(json.loads(conteudo), {
+            'id': self.existente.id, 'nome': 'Antigo', 'preco': '1.00', 'categoria': 'Lanches',
+        })
+        response = self.client.get(reverse('exportar-produtos'))
+        csv_exportado = b''.join(response.streaming_content).decode()
+        self.assertEqual(self.importar('menu.csv', csv_exportado)['importados'], 1)
+        self.assertEqual(Produto.objects.count(), 1)
+
+    def test_exportacao_agrupa_linhas_em_trechos(self):
+        Produto.objects.bulk_create(
+            Produto(restaurante=self.loja, nome=f'Produto {i}', preco='3.00', categoria='Lanches') for i in range(50)
+        )
+        with mock.patch('pedidos.importacao.TAMANHO_TRECHO', 500):
+            trechos = list(exportar_produtos('csv', self.loja.id))
+        self.assertLess(len(trechos), 10)
+        self.assertTrue(all(len(trecho) < 600 for trecho in trechos))
+        self.assertEqual(len(''.join(trechos).splitlines()), 52)
+
+    def test_indexa_so_o_lote_e_mantem_ultima_linha_do_id(self):
+        with mock.patch('pedidos.busca.reindexar') as reindexar:
+            data = self.importar('menu.csv', (
+                'id,nome,preco,categoria\n'
+                f'{self.existente.id},Primeira Versão,2.00,Lanches\n'
+                ',Coxinha,5.00,Salgados\n'
+                f'{self.existente.id},Versão Final,3.00,Lanches\n'
+            ))
+        reindexar.assert_not_called()
+        self.assertEqual((data['importados'], data['com_erro']), (3, 0))
+        self.existente.refresh_from_db()
+        self.assertEqual((self.existente.nome, self.existente.preco), ('Versão Final', Decimal('3.00')))
+        self.assertEqual([p.nome for p in busca.buscar_produtos('coxinha')], ['Coxinha'])
+        self.assertEqual([p.nome for p in busca.buscar_produtos('final')], ['Versão Final'])
+        self.assertEqual(busca.buscar_produtos('primeira'), [])
+
+    def test_arquivo_ilegivel_vira_erro_de_linha(self):
+        arquivo = SimpleUploadedFile('menu.csv', 'id,nome,preco,categoria\n,Pão,2.00,Padaria\n'.encode('latin-1'))
+        response = self.client.post(reverse('importar-produtos'), {'arquivo': arquivo})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['success'])
+        # O TextIOWrapper decodifica em blocos: o erro aponta a primeira linha que não pôde ser lida
+        self.assertEqual(data['erros'], [{'linha': 1, 'erros': {'__all__': ['O arquivo não está em UTF-8.']}}])
+
+        grande = 'x' * (csv.field_size_limit() + 1)
+        data = self.importar('menu.csv', f'id,nome,preco,categoria\n,Bolo,4.00,Doces\n,"{grande}",1.00,Doces\n')
+        self.assertEqual((data['importados'], data['com_erro']), (1, 1))
+        self.assertIn('CSV malformado', data['erros'][0]['erros']['__all__'][0])
+
+
+class ParticionamentoRestauranteTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.outra_loja, cls.outro_restaurante = criar_restaurante('outro_restaurante', 'Outro')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        cls.pizza = Produto.objects.create(restaurante=cls.outra_loja, nome='Pizza', preco='40.00', categoria='Pizzas')
+        cls.pedido = criar_pedido(cls.cliente, {cls.lanche.id: 1})
+        cls.pedido_da_outra = criar_pedido(cls.cliente, {cls.pizza.id: 1})
+
+    def setUp(self):
+        cache.clear()
+        caches['template_fragments'].clear()
+        self.client.force_login(self.restaurante)
+
+    def crescer_outra_loja(self):
+        for i in range(5):
+            produto = Produto.objects.create(
+                restaurante=self.outra_loja, nome=f'Pizza {i}', preco='30.00', categoria='Pizzas',
+            )
+            criar_pedido(self.cliente, {produto.id: 2})
+
+    def test_painel_so_ve_o_proprio_restaurante(self):
+        self.assertEqual(self.pedido.restaurante, self.loja)
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Lanche')
+        self.assertNotContains(response, 'Pizza')
+        feed = self.client.get(reverse('feed-pedidos')).json()
+        self.assertEqual([p['id'] for p in feed['pedidos']], [self.pedido.id])
+
+        self.assertEqual(self.client.get(reverse('detalhes-pedido', args=[self.pedido_da_outra.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('edit-produto', args=[self.pizza.id])).status_code, 404)
+        url = reverse('update-status-pedido', args=[self.pedido_da_outra.id])
+        self.assertEqual(self.client.post(url, {'status': 'em_preparo'}).status_code, 404)
+        data = self.client.post(reverse('update-status-pedidos'), {
+            'status': 'em_preparo', 'pedidos': [self.pedido.id, self.pedido_da_outra.id],
+        }).json()
+        self.assertEqual(data['alterados'], [self.pedido.id])
+        self.pedido_da_outra.refresh_from_db()
+        self.assertEqual(self.pedido_da_outra.status, 'pedido')
+
+        processar_pendentes()
+        relatorio = self.client.get(reverse('relatorio-vendas')).json()
+        self.assertEqual([p['produto_nome'] for p in relatorio['mais_vendidos']], ['Lanche'])
+        self.assertEqual(relatorio['pedidos_por_status'], {'pedido': 0, 'em_preparo': 1, 'saiu_para_entrega': 0})
+
+    def test_custo_do_painel_nao_depende_dos_outros_restaurantes(self):
+        for url in (reverse('home'), reverse('feed-pedidos'), reverse('api-pedidos')):
+            self.assertViewQueriesConstant(url, self.crescer_outra_loja)
+        # Alterar o cardápio de outro restaurante não descarta o grid em cache deste
+        self.client.get(reverse('home'))
+        self.crescer_outra_loja()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('home'))
+        self.assertFalse(any('"pedidos_produto"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_api_de_produtos_so_ve_o_proprio_restaurante(self):
+        data = self.client.get(reverse('api-produtos')).json()
+        self.assertEqual([p['id'] for p in data['results']], [self.lanche.id])
+        self.assertEqual(self.client.get(reverse('api-produto', args=[self.lanche.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('api-produto', args=[self.pizza.id])).status_code, 404)
+
+        # O cliente continua vendo o cardápio de todos os restaurantes
+        self.client.force_login(self.cliente)
+        data = self.client.get(reverse('api-produtos')).json()
+        self.assertEqual({p['id'] for p in data['results']}, {self.lanche.id, self.pizza.id})
+
+    def test_importacao_nao_sobrescreve_produto_de_outro_restaurante(self):
+        arquivo = SimpleUploadedFile('menu.csv', (
+            'id,nome,preco,categoria\n'
+            f'{self.pizza.id},Invadida,1.00,Pizzas\n'
+            f'{self.lanche.id},Lanche Duplo,12.00,Lanches\n'
+        ).encode())
+        data = self.client.post(reverse('importar-produtos'), {'arquivo': arquivo}).json()
+        self.assertEqual((data['importados'], data['com_erro']), (1, 1))
+        self.assertEqual(data['erros'][0]['linha'], 2)
+        self.pizza.refresh_from_db()
+        self.assertEqual(self.pizza.nome, 'Pizza')
+
+    def test_carrinho_aceita_um_restaurante_por_vez(self):
+        self.client.force_login(self.cliente)
+        self.client.post(reverse('add_to_cart', args=[self.lanche.id]))
+        response = self.client.post(reverse('add_to_cart', args=[self.pizza.id]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(carrinho.contar_itens(self.cliente), 1)
+        with self.assertRaisesMessage(Exception, 'um restaurante'):
+            criar_pedido(self.cliente, {self.lanche.id: 1, self.pizza.id: 1})
+
+    def test_usuario_restaurante_sem_tenant_nao_acessa_o_painel(self):
+        sem_tenant = User.objects.create_user('sem_tenant', password='senha', user_type='restaurante')
+        self.client.force_login(sem_tenant)
+        self.assertEqual(self.client.get(reverse('feed-pedidos')).status_code, 302)
+        # A home responde 403 em vez de redirecionar para o login (que mandaria de volta para a home)
+        self.assertEqual(self.client.get(reverse('home')).status_code, 403)
+        # O login encerra a sessão sem papel utilizável e mostra o motivo
+        response = self.client.get(reverse('login'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'não está associada a nenhum restaurante')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_login_recusa_restaurante_sem_tenant(self):
+        User.objects.create_user('sem_tenant', password='senha', user_type='restaurante')
+        self.client.logout()
+        response = self.client.post(reverse('login'), {
+            'username': 'sem_tenant', 'password': 'senha', 'user_type': 'restaurante',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'não está associada a nenhum restaurante')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+
+class ExportacaoPedidosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.outra_loja, _ = criar_restaurante('outro_restaurante', 'Outro')
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        cls.suco = Produto.objects.create(restaurante=cls.loja, nome='Suco', preco='4.50', categoria='Bebidas')
+        cls.pizza = Produto.objects.create(restaurante=cls.outra_loja, nome='Pizza', preco='40.00', categoria='Pizzas')
+
+        agora = timezone.now()
+        cls.antigo = criar_pedido(cls.cliente, {cls.lanche.id: 1})
+        cls.novo = criar_pedido(cls.cliente, {cls.lanche.id: 2, cls.suco.id: 1})
+        cls.recente = criar_pedido(cls.cliente, {cls.suco.id: 3})
+        criar_pedido(cls.cliente, {cls.pizza.id: 1})
+        # O pedido antigo já foi arquivado; o "recente" é anterior ao "novo" (ordem por criação, não por id)
+        Pedido.objects.filter(pk=cls.antigo.pk).update(status='saiu_para_entrega', criado_em=agora - timedelta(days=200))
+        Pedido.objects.filter(pk=cls.recente.pk).update(criado_em=agora - timedelta(days=1))
+        arquivar_pedidos(data_de_corte(90))
+
+    def setUp(self):
+        self.client.force_login(self.restaurante)
+
+    def exportar(self, **params):
+        response = self.client.get(reverse('exportar-pedidos'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_inclui_arquivados_em_ordem_de_criacao(self):
+        linhas = list(csv.DictReader(io.StringIO(self.exportar().decode())))
+        self.assertEqual(
+            [(int(l['pedido_id']), l['produto_nome'], l['subtotal']) for l in linhas],
+            [
+                (self.antigo.id, 'Lanche', '10.00'),
+                (self.recente.id, 'Suco', '13.50'),
+                (self.novo.id, 'Lanche', '20.00'),
+                (self.novo.id, 'Suco', '4.50'),
+            ],
+        )
+        self.assertEqual(linhas[0]['status'], 'saiu_para_entrega')
+
+    def test_filtros_e_gzip(self):
+        hoje = timezone.localdate().isoformat()
+        conteudo = self.exportar(formato='jsonl', inicio=hoje, fim=hoje, status='pedido')
+        linhas = [json.loads(linha) for linha in conteudo.decode().splitlines()]
+        self.assertEqual({linha['pedido_id'] for linha in linhas}, {self.novo.id})
+
+        comprimido = self.exportar(formato='jsonl', inicio=hoje, fim=hoje, status='pedido', gzip='1')
+        self.assertEqual(gzip.decompress(comprimido), conteudo)
+
+        response = self.client.get(reverse('exportar-pedidos'), {'inicio': '18/10/2026'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_duas_consultas_independente_do_volume(self):
+        # Uma consulta nos arquivados e uma (com JOINs) nos ativos, lidas em blocos
+        with self.assertNumQueries(2):
+            b''.join(trecho.encode() for trecho in exportar_pedidos(self.loja.id, 'csv', chunk_size=1))
+        with self.assertNumQueries(2):
+            list(exportar_pedidos(self.loja.id, 'csv', inicio=date(2000, 1, 1), gzip=True))
+
+
+class SessaoEUsuarioEmCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='senha', is_staff=True)
+
+    def test_requisicao_comum_nao_consulta_o_banco_antes_da_view(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('metricas'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('metricas')).status_code, 200)
+
+    def test_alteracao_do_usuario_descarta_o_cache(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('metricas'))
+        self.staff.is_staff = False
+        self.staff.save()
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 302)
+
+        self.staff.is_active = False
+        self.staff.save()
+        self.assertIsNone(CachedModelBackend().get_user(self.staff.pk))
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_sessao_em_cookie_assinado(self):
+        self.client.post(reverse('login'), {'username': 'staff', 'password': 'senha', 'user_type': 'cliente'})
+        self.client.get(reverse('metricas'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('metricas')).status_code, 200)
+
+
+@override_settings(PEDIDOS_COMPRESSAO_MINIMO=500)
+class RespostasJsonECompressaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.cliente = User.objects.create_user('cliente', password='senha', user_type='cliente')
+        cls.produtos = [
+            Produto.objects.create(
+                restaurante=cls.loja, nome=f'Pastel de Queijo {i}', preco=Decimal('7.50') + i, categoria='Lanches',
+            )
+            for i in range(30)
+        ]
+        cls.pedido = criar_pedido(cls.cliente, {cls.produtos[0].id: 2})
+
+    def setUp(self):
+        cache.clear()
+
+    @skipUnless(respostas.orjson, 'orjson não instalado')
+    def test_orjson_e_biblioteca_padrao_geram_o_mesmo_json(self):
+        dados = {
+            'preco': Decimal('25.90'), 'criado_em': timezone.now(), 'dia': date(2026, 10, 18),
+            'nome': 'Açaí', 'itens': [1, None, True, 1.5], 7: 'chave numérica',
+        }
+        self.assertEqual(respostas._dumps_orjson(dados), respostas._dumps_stdlib(dados))
+
+    def test_decimal_continua_string_nas_views(self):
+        self.client.force_login(self.restaurante)
+        url = reverse('detalhes-pedido', args=[self.pedido.id])
+        esperado = self.client.get(url).json()
+        self.assertEqual(esperado['total'], '15.00')
+        self.assertEqual(esperado['itens'][0]['preco_unitario'], '7.50')
+        with mock.patch('pedidos.respostas.dumps', respostas._dumps_stdlib):
+            self.assertEqual(self.client.get(url).json(), esperado)
+
+    def test_cardapio_comprimido_com_etag_fraco(self):
+        normal = self.client.get(reverse('cardapio'))
+        self.assertNotIn('Content-Encoding', normal)
+        self.assertEqual(normal['Vary'], 'Accept-Encoding')
+
+        response = self.client.get(reverse('cardapio'), HTTP_ACCEPT_ENCODING='br;q=0, gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), normal.content)
+        self.assertLess(len(response.content), len(normal.content))
+        self.assertEqual(response['ETag'], 'W/' + normal['ETag'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('cardapio'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+        self.assertEqual(response.status_code, 304)
+
+    @skipUnless(middleware.brotli, 'brotli não instalado')
+    def test_brotli_tem_preferencia(self):
+        normal = self.client.get(reverse('cardapio'))
+        response = self.client.get(reverse('cardapio'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(middleware.brotli.decompress(response.content), normal.content)
+
+    def test_respostas_pequenas_e_paginas_html_nao_sao_comprimidas(self):
+        response = self.client.get(
+            reverse('search_products'), {'q': 'pastel', 'limit': 1}, HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(len(response.json()), 1)
+
+        self.client.force_login(self.cliente)
+        response = self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_exportacao_em_streaming_comprimida(self):
+        self.client.force_login(self.restaurante)
+        normal = b''.join(self.client.get(reverse('exportar-pedidos')).streaming_content)
+        response = self.client.get(reverse('exportar-pedidos'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), normal)
+
+
+def zona_por_cliente(pedido):
+    return pedido.cliente.username
+
+
+class DespachoEntregasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.loja, cls.restaurante = criar_restaurante()
+        cls.outra_loja, _ = criar_restaurante('outro_restaurante', 'Outro')
+        cls.ana = User.objects.create_user('ana', password='senha', user_type='cliente')
+        cls.bia = User.objects.create_user('bia', password='senha', user_type='cliente')
+        cls.lanche = Produto.objects.create(restaurante=cls.loja, nome='Lanche', preco='10.00', categoria='Lanches')
+        cls.pizza = Produto.objects.create(restaurante=cls.outra_loja, nome='Pizza', preco='40.00', categoria='Pizzas')
+
+    def setUp(self):
+        despacho.get_zona.cache_clear()
+        self.addCleanup(despacho.get_zona.cache_clear)
+
+    def em_preparo(self, cliente, produto, minutos_atras):
+        pedido = criar_pedido(cliente, {produto.id: 1})
+        Pedido.objects.filter(pk=pedido.pk).update(
+            status='em_preparo', status_alterado_em=timezone.now() - timedelta(minutes=minutos_atras),
+        )
+        return pedido
+
+    def test_formar_lotes_respeita_tamanho_e_espera(self):
+        agora = timezone.now()
+        pendentes = [Pendente(i, 1, 'centro', agora - timedelta(minutes=20 - i)) for i in range(5)]
+        pendentes.append(Pendente(9, 1, 'norte', agora - timedelta(minutes=1)))
+        lotes = formar_lotes(pendentes, agora, tamanho_maximo=2, espera_maxima=timedelta(minutes=10))
+        self.assertEqual([[p.id for p in lote] for lote in lotes], [[0, 1], [2, 3], [4]])
+        # Com espera maior, o último pedido do centro aguarda companhia
+        lotes = formar_lotes(pendentes, agora, tamanho_maximo=2, espera_maxima=timedelta(minutes=30))
+        self.assertEqual([[p.id for p in lote] for lote in lotes], [[0, 1], [2, 3]])
+
+    @override_settings(PEDIDOS_DESPACHO_ZONA='pedidos.tests.zona_por_cliente')
+    def test_despacha_por_restaurante_e_zona(self):
+        ana = [self.em_preparo(self.ana, self.lanche, minutos) for minutos in (3, 2, 1)]
+        bia = self.em_preparo(self.bia, self.lanche, 1)
+        pizza = self.em_preparo(self.ana, self.pizza, 30)
+        pendente = criar_pedido(self.bia, {self.lanche.id: 1})
+
+        entregas = despachar(tamanho_maximo=2, espera_maxima=timedelta(minutes=10))
+        self.assertEqual(
+            sorted((e.restaurante_id, e.zona, sorted(e.pedidos.values_list('id', flat=True))) for e in entregas),
+            sorted([(self.loja.id, 'ana', [ana[0].id, ana[1].id]), (self.outra_loja.id, 'ana', [pizza.id])]),
+        )
+        status = dict(Pedido.objects.values_list('id', 'status'))
+        self.assertEqual(status[ana[0].id], 'saiu_para_entrega')
+        self.assertEqual(status[ana[2].id], 'em_preparo')
+        self.assertEqual(status[bia.id], 'em_preparo')
+        self.assertEqual(status[pendente.id], 'pedido')
+
+        # Só os pedidos do restaurante pedido; quem espera demais sai mesmo sozinho
+        entregas = despachar(restaurante_id=self.loja.id, agora=timezone.now() + timedelta(minutes=10))
+        self.assertEqual(len(entregas), 2)
+        self.assertFalse(Pedido.objects.filter(status='em_preparo').exists())
+        processar_pendentes()
+        self.assertEqual(ContagemStatus.objects.get(restaurante=self.loja, status='saiu_para_entrega').quantidade, 4)
+
+    def test_pedido_despachado_manualmente_fica_fora_do_lote(self):
+        pedidos = [self.em_preparo(self.ana, self.lanche, 1) for _ in range(2)]
+        with mock.patch('pedidos.despacho.pedidos_aguardando', return_value=list(Pedido.objects.with_cliente())):
+            alterar_status(Pedido.objects.filter(id=pedidos[0].id), 'saiu_para_entrega')
+            entrega, = despachar(tamanho_maximo=2)
+        self.assertEqual(list(entrega.pedidos.values_list('id', flat=True)), [pedidos[1].id])
+        self.assertIsNone(Pedido.objects.get(id=pedidos[0].id).entrega_id)
+
+    def test_transicao_registra_momento(self):
+        pedido = criar_pedido(self.ana, {self.lanche.id: 1})
+        Pedido.objects.filter(pk=pedido.pk).update(status_alterado_em=timezone.now() - timedelta(hours=1))
+        alterar_status(Pedido.objects.filter(pk=pedido.pk), 'em_preparo')
+        pedido.refresh_from_db()
+        self.assertLess(timezone.now() - pedido.status_alterado_em, timedelta(minutes=1))
+
+    def test_simulacao(self):
+        individual = simular_despacho(120, horas=2, zonas=2, tamanho_maximo=1)
+        em_lote = simular_despacho(120, horas=2, zonas=2, tamanho_maximo=4, espera_maxima=timedelta(minutes=5))
+        self.assertEqual(individual['pedidos'], em_lote['pedidos'])
+        self.assertEqual(individual['entregas'], individual['pedidos'])
+        self.assertLess(em_lote['entregas'], individual['entregas'])
+        self.assertGreater(em_lote['espera_media_s'], individual['espera_media_s'])
+        # Intervalo do agendador (30 s) mais a espera máxima
+        self.assertLessEqual(em_lote['espera_maxima_s'], 5 * 60 + 30)
 
-# Create your tests here.
@@ -1,6 +1,6 @@
 # pedidos/urls.py
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # URLs de autenticação
@@ -12,10 +12,17 @@ urlpatterns = [
     path('produtos/adicionar/', views.add_produto_view, name='add-produto'),
     path('produtos/editar/<int:produto_id>/', views.edit_produto_view, name='edit-produto'),
     path('produtos/excluir/<int:produto_id>/', views.delete_produto_view, name='delete-produto'),
+    path('produtos/importar/', views.importar_produtos_view, name='importar-produtos'),
+    path('produtos/exportar/', views.exportar_produtos_view, name='exportar-produtos'),
     
     # URLs de gerenciamento de pedidos (para restaurante)
     path('pedidos/atualizar-status/<int:pedido_id>/', views.update_status_pedido_view, name='update-status-pedido'),
+    path('pedidos/atualizar-status/', views.update_status_pedidos_view, name='update-status-pedidos'),
     path('pedidos/detalhes/<int:pedido_id>/', views.detalhes_pedido_view, name='detalhes-pedido'),
+    path('pedidos/feed/', views.feed_pedidos_view, name='feed-pedidos'),
+    path('pedidos/exportar/', views.exportar_pedidos_view, name='exportar-pedidos'),
+    path('pedidos/eventos/', views.eventos_view, name='eventos-pedidos'),
+    path('relatorios/vendas/', views.relatorio_vendas_view, name='relatorio-vendas'),
     
     # URLs para os clientes
     path('adicionar-ao-carrinho/<int:produto_id>/', views.add_to_cart_view, name='add_to_cart'),
@@ -24,4 +31,12 @@ urlpatterns = [
     path('finalizar-pedido/', views.checkout_view, name='checkout'),
     path('meus-pedidos/<int:pedido_id>/', views.order_detail_view, name='order_detail'),
     path('buscar-produtos/', views.search_products_view, name='search_products'),
+    path('cardapio/', views.cardapio_view, name='cardapio'),
+    path('metricas/', views.metricas_view, name='metricas'),
+
+    # API REST (v1)
+    path('api/v1/produtos/', api.ProdutoListView.as_view(), name='api-produtos'),
+    path('api/v1/produtos/<int:pk>/', api.ProdutoDetailView.as_view(), name='api-produto'),
+    path('api/v1/pedidos/', api.PedidoListView.as_view(), name='api-pedidos'),
+    path('api/v1/pedidos/<int:pk>/', api.PedidoDetailView.as_view(), name='api-pedido'),
 ]
\ No newline at end of file
@@ -1,29 +1,63 @@
 # pedidos/views.py
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.urls import reverse
-from .models import Produto, Pedido, ProdutoNoPedido
+from .models import Produto, Pedido, TransicaoInvalida
 from .forms import ProdutoForm
-from django.db import transaction
-from django.http import JsonResponse
-from django.db.models import Q
+from .arquivamento import buscar_pedido
+from .busca import SEARCH_LIMIT
+from .cardapio import (
+    buscar_produtos_json, cardapio_json, dados_produto, etag_cardapio, produtos_cardapio, versao_cardapio,
+)
+from . import carrinho
+from .carrinho import migrar_carrinho_da_sessao
+from .middleware import metricas
+from .importacao import FORMATOS, abrir_texto, detectar_formato, exportar_produtos, importar_produtos, ler_linhas
+from .exportacao import exportar_pedidos
+from .relatorios import resumo_vendas
+from .eventos import canal_do_cliente, canal_do_restaurante, get_broker
+from .services import alterar_status
+from .idempotencia import CAMPO as CAMPO_IDEMPOTENCIA, idempotente
+from .ratelimit import limitar_taxa
+from .paginacao import CursorInvalido, FEED_PAGE_SIZE, paginar_pedidos
+from .respostas import JsonResponse, resposta_json_pronta
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import condition
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
 import json
+import uuid
+from datetime import date
 
-# Função para verificar se o usuário é um restaurante
+# Função para verificar se o usuário é um restaurante. As views do painel só
+# enxergam os dados de user.restaurante_id, que já vem na linha do usuário
 def is_restaurante(user):
-    return user.user_type == 'restaurante'
+    return user.user_type == 'restaurante' and user.restaurante_id is not None
 
 # Função para verificar se o usuário é um cliente
 def is_cliente(user):
     return user.user_type == 'cliente'
 
 
+SEM_RESTAURANTE = 'Esta conta de restaurante não está associada a nenhum restaurante.'
+
+
+def tem_acesso(user):
+    # Conta de restaurante sem restaurante não enxerga nenhum painel
+    return is_restaurante(user) or is_cliente(user)
+
+
 # View de Login
 def login_view(request):
     if request.user.is_authenticated:
-        return redirect('home')
+        if tem_acesso(request.user):
+            return redirect('home')
+        # Sem papel utilizável, mandar para a home só voltaria para cá
+        logout(request)
+        return render(request, 'login/login.html', {'error': SEM_RESTAURANTE})
 
     if request.method == 'POST':
         username = request.POST.get('username')
@@ -33,11 +67,13 @@ def login_view(request):
         user = authenticate(request, username=username, password=password)
         
         if user is not None:
-            if user.user_type == user_type_form:
+            if user.user_type != user_type_form:
+                error = "Credenciais inválidas para este tipo de acesso."
+            elif not tem_acesso(user):
+                error = SEM_RESTAURANTE
+            else:
                 login(request, user)
                 return redirect('home')
-            else:
-                error = "Credenciais inválidas para este tipo de acesso."
         else:
             error = "Credenciais inválidas."
         
@@ -50,52 +86,70 @@ def login_view(request):
 @login_required
 def home_view(request):
     if is_restaurante(request.user):
-        produtos = Produto.objects.all()
-        pedidos = Pedido.objects.all().order_by('-criado_em')
+        restaurante_id = request.user.restaurante_id
+        status_filtro = request.GET.get('status', '')
+        pedidos_qs = Pedido.objects.do_restaurante(restaurante_id).with_cliente()
+        if status_filtro in dict(Pedido.STATUS_CHOICES):
+            pedidos_qs = pedidos_qs.filter(status=status_filtro)
+        else:
+            status_filtro = ''
+        # Só a primeira página do feed; o restante vem via "Carregar mais"
+        pedidos, proximo_cursor = paginar_pedidos(pedidos_qs)
         
         context = {
-            'produtos': produtos,
-            'pedidos': pedidos
+            # Chamado pelo template só se o grid não estiver no cache de fragmentos
+            'produtos': lambda: produtos_cardapio(restaurante_id),
+            'restaurante_id': restaurante_id,
+            'versao_cardapio': versao_cardapio(restaurante_id),
+            'pedidos': pedidos,
+            'proximo_cursor': proximo_cursor,
+            'status_filtro': status_filtro,
+            'status_choices': Pedido.STATUS_CHOICES,
+            'transicoes': Pedido.TRANSICOES,
         }
         return render(request, 'restaurante/restaurante_home.html', context)
     
     elif is_cliente(request.user):
-        produtos = Produto.objects.all()
-        pedidos = Pedido.objects.filter(cliente=request.user).order_by('-criado_em')
-        cart = request.session.get('cart', {})
-        cart_item_count = sum(item['quantidade'] for item in cart.values())
+        # Primeira página de "Meus pedidos"; o restante vem do feed via "Carregar mais"
+        pedidos, proximo_cursor = paginar_pedidos(Pedido.objects.filter(cliente=request.user))
+        migrar_carrinho_da_sessao(request)
+        cart_item_count = carrinho.contar_itens(request.user)
         
         context = {
-            'produtos': produtos,
+            'produtos': produtos_cardapio,
+            'versao_cardapio': versao_cardapio(),
             'pedidos': pedidos,
+            'proximo_cursor': proximo_cursor,
             'cart_item_count': cart_item_count,
         }
         return render(request, 'cliente/cliente_home.html', context)
-    
-    return redirect('login')
+
+    # Autenticado, mas sem papel utilizável (restaurante sem restaurante):
+    # redirecionar para o login entraria em loop com login_view
+    raise PermissionDenied(SEM_RESTAURANTE)
 
 # View de Logout
 def logout_view(request):
     logout(request)
     return redirect('login')
 
+def render_produto_card(request, produto):
+    """Card do painel, do mesmo fragmento em cache usado por home_view."""
+    return render_to_string('restaurante/_produto_card.html', {'produto': produto}, request=request)
+
 @login_required
 @user_passes_test(is_restaurante)
 def add_produto_view(request):
     if request.method == 'POST':
         data = json.loads(request.body)
-        form = ProdutoForm(data)
+        form = ProdutoForm(data, instance=Produto(restaurante_id=request.user.restaurante_id))
         if form.is_valid():
             produto = form.save()
             return JsonResponse({
                 'success': True,
                 'message': 'Produto adicionado com sucesso!',
-                'produto': {
-                    'id': produto.id,
-                    'nome': produto.nome,
-                    'preco': str(produto.preco),
-                    'categoria': produto.categoria,
-                }
+                'produto': dados_produto(produto),
+                'html': render_produto_card(request, produto),
             })
         return JsonResponse({'success': False, 'errors': form.errors})
     
@@ -106,64 +160,158 @@ def add_produto_view(request):
 @login_required
 @user_passes_test(is_restaurante)
 def edit_produto_view(request, produto_id):
-    produto = get_object_or_404(Produto, id=produto_id)
+    produto = get_object_or_404(Produto.objects.do_restaurante(request.user.restaurante_id), id=produto_id)
     if request.method == 'POST':
         # Dados enviados via AJAX
         data = json.loads(request.body)
         form = ProdutoForm(data, instance=produto)
         if form.is_valid():
-            form.save()
-            return JsonResponse({'success': True, 'message': 'Produto atualizado com sucesso!'})
+            produto = form.save()
+            return JsonResponse({
+                'success': True,
+                'message': 'Produto atualizado com sucesso!',
+                'html': render_produto_card(request, produto),
+            })
         return JsonResponse({'success': False, 'errors': form.errors})
     # Se não for POST, a view pode retornar os dados do produto para preencher um modal
-    return JsonResponse({
-        'id': produto.id,
-        'nome': produto.nome,
-        'preco': str(produto.preco),
-        'categoria': produto.categoria,
-    })
+    return JsonResponse(dados_produto(produto))
 
 
 @login_required
 @user_passes_test(is_restaurante)
 def delete_produto_view(request, produto_id):
-    produto = get_object_or_404(Produto, id=produto_id)
+    produto = get_object_or_404(Produto.objects.do_restaurante(request.user.restaurante_id), id=produto_id)
     if request.method == 'POST':
         produto.delete()
         return JsonResponse({'success': True, 'message': 'Produto excluído com sucesso!'})
     return JsonResponse({'success': False, 'message': 'Método de requisição inválido.'}, status=405)
 
 
+@login_required
+@user_passes_test(is_restaurante)
+def importar_produtos_view(request):
+    """Importa produtos de um arquivo CSV ou JSON Lines enviado no campo "arquivo"."""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método de requisição inválido.'}, status=405)
+
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is None:
+        return JsonResponse({'success': False, 'message': 'Envie um arquivo no campo "arquivo".'}, status=400)
+    formato = detectar_formato(arquivo.name, request.POST.get('formato'))
+    if formato not in FORMATOS:
+        return JsonResponse({'success': False, 'message': 'Formato deve ser csv ou jsonl.'}, status=400)
+
+    resultado = importar_produtos(ler_linhas(abrir_texto(arquivo.file), formato), request.user.restaurante_id)
+    return JsonResponse({'success': resultado.com_erro == 0, **resultado.as_dict()})
+
+
+@login_required
+@user_passes_test(is_restaurante)
+def exportar_produtos_view(request):
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return JsonResponse({'success': False, 'message': 'Formato deve ser csv ou jsonl.'}, status=400)
+    content_type = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(
+        exportar_produtos(formato, request.user.restaurante_id), content_type=f'{content_type}; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="produtos.{formato}"'
+    return response
+
+
+@login_required
+@user_passes_test(is_restaurante)
+def exportar_pedidos_view(request):
+    """
+    Histórico de pedidos do restaurante (um item por linha) em CSV ou JSON Lines,
+    gerado enquanto é enviado. Filtros: inicio/fim (AAAA-MM-DD), status; gzip=1 comprime.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return JsonResponse({'success': False, 'message': 'Formato deve ser csv ou jsonl.'}, status=400)
+    status = request.GET.get('status') or None
+    if status is not None and status not in dict(Pedido.STATUS_CHOICES):
+        return JsonResponse({'success': False, 'message': 'Status inválido.'}, status=400)
+    try:
+        inicio = date.fromisoformat(request.GET['inicio']) if request.GET.get('inicio') else None
+        fim = date.fromisoformat(request.GET['fim']) if request.GET.get('fim') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Datas devem estar no formato AAAA-MM-DD.'}, status=400)
+    gzip = request.GET.get('gzip') == '1'
+
+    trechos = exportar_pedidos(request.user.restaurante_id, formato, inicio, fim, status, gzip=gzip)
+    nome = f'pedidos.{formato}'
+    if gzip:
+        response = StreamingHttpResponse(trechos, content_type='application/gzip')
+        nome += '.gz'
+    else:
+        content_type = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(trechos, content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nome}"'
+    return response
+
+
 @login_required
 @user_passes_test(is_restaurante)
 def update_status_pedido_view(request, pedido_id):
     if request.method == 'POST':
-        pedido = get_object_or_404(Pedido, id=pedido_id)
+        pedidos = Pedido.objects.do_restaurante(request.user.restaurante_id).filter(id=pedido_id)
         status = request.POST.get('status')
-        
-        # Verifique se o status recebido é válido
-        valid_statuses = [choice[0] for choice in Pedido.STATUS_CHOICES]
-        if status in valid_statuses:
-            pedido.status = status
-            pedido.save()
-            
+        try:
+            # UPDATE condicional: só muda se o pedido ainda estiver num status de origem válido
+            alterados = alterar_status(pedidos, status)
+        except TransicaoInvalida:
+            alterados = []
+        if not alterados:
+            if not pedidos.exists():
+                raise Http404('Pedido não encontrado.')
+            messages.error(request, 'O pedido não pode passar para esse status.')
+
     return redirect(f"{reverse('home')}?tab=pedidos")
 
+@login_required
+@user_passes_test(is_restaurante)
+def update_status_pedidos_view(request):
+    """Muda o status de vários pedidos de uma vez. Responde com os ids alterados e os ignorados."""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método não permitido.'}, status=405)
+
+    try:
+        ids = [int(pedido_id) for pedido_id in request.POST.getlist('pedidos')]
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Lista de pedidos inválida.'}, status=400)
+    if not ids:
+        return JsonResponse({'success': False, 'message': 'Nenhum pedido selecionado.'}, status=400)
+
+    try:
+        alterados = alterar_status(
+            Pedido.objects.do_restaurante(request.user.restaurante_id).filter(id__in=ids), request.POST.get('status'),
+        )
+    except TransicaoInvalida as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'alterados': sorted(alterados),
+        'ignorados': sorted(set(ids) - set(alterados)),
+    })
+
 @login_required
 @user_passes_test(is_restaurante)
 def detalhes_pedido_view(request, pedido_id):
     """View que retorna os detalhes de um pedido em formato JSON."""
-    pedido = get_object_or_404(Pedido, id=pedido_id)
+    pedido, itens_pedido = buscar_pedido(pedido_id, restaurante_id=request.user.restaurante_id)
+    if pedido is None:
+        raise Http404('Pedido não encontrado.')
 
     # Coleta os itens do pedido
-    itens_pedido = pedido.itens.all()
     itens_json = []
     for item in itens_pedido:
         itens_json.append({
-            'produto_nome': item.produto.nome,
+            'produto_nome': item.produto_nome,
             'quantidade': item.quantidade,
-            'preco_unitario': str(item.produto.preco),
-            'subtotal': str(item.produto.preco * item.quantidade),
+            'preco_unitario': item.preco_unitario,
+            'subtotal': item.subtotal,
         })
 
     # Retorna os dados completos do pedido
@@ -172,35 +320,65 @@ def detalhes_pedido_view(request, pedido_id):
         'cliente_nome': pedido.cliente.username,
         'data_criacao': pedido.criado_em.strftime('%d/%m/%Y, %H:%M'),
         'status': pedido.get_status_display(),
-        'total': str(pedido.total),
+        'total': pedido.total,
         'itens': itens_json,
     })
 
 
+@login_required
+@user_passes_test(tem_acesso)
+def feed_pedidos_view(request):
+    """
+    View que retorna uma página do feed de pedidos (paginação por cursor) em JSON:
+    os pedidos do restaurante, ou os do próprio cliente ("Meus pedidos").
+    """
+    if is_restaurante(request.user):
+        pedidos_qs = Pedido.objects.do_restaurante(request.user.restaurante_id).with_cliente()
+    else:
+        pedidos_qs = Pedido.objects.filter(cliente=request.user).with_cliente()
+    status = request.GET.get('status')
+    if status:
+        if status not in dict(Pedido.STATUS_CHOICES):
+            return JsonResponse({'success': False, 'error': 'Status inválido.'}, status=400)
+        pedidos_qs = pedidos_qs.filter(status=status)
+
+    try:
+        limite = int(request.GET.get('limit', FEED_PAGE_SIZE))
+        pedidos, proximo_cursor = paginar_pedidos(pedidos_qs, request.GET.get('cursor'), limite)
+    except (ValueError, CursorInvalido):
+        return JsonResponse({'success': False, 'error': 'Parâmetros de paginação inválidos.'}, status=400)
+
+    return JsonResponse({
+        'pedidos': [
+            {
+                'id': pedido.id,
+                'cliente_nome': pedido.cliente.username,
+                'data_criacao': pedido.criado_em.strftime('%d/%m/%Y, %H:%M'),
+                'status': pedido.status,
+                'status_display': pedido.get_status_display(),
+                'total': pedido.total,
+            }
+            for pedido in pedidos
+        ],
+        'next_cursor': proximo_cursor,
+    })
+
+
 @login_required
 @user_passes_test(is_cliente)
+@limitar_taxa('carrinho')
+@idempotente
 def add_to_cart_view(request, produto_id):
     if request.method == 'POST':
         produto = get_object_or_404(Produto, id=produto_id)
-        
-        if 'cart' not in request.session:
-            request.session['cart'] = {}
-            
-        cart = request.session['cart']
-        produto_id_str = str(produto.id)
-        
-        if produto_id_str in cart:
-            cart[produto_id_str]['quantidade'] += 1
-        else:
-            cart[produto_id_str] = {
-                'quantidade': 1,
-                'nome': produto.nome,
-                'preco': str(produto.preco)
-            }
-        
-        request.session.modified = True
-        
-        cart_item_count = sum(item['quantidade'] for item in cart.values())
+        migrar_carrinho_da_sessao(request)
+        try:
+            cart_item_count = carrinho.adicionar_item(request.user, produto.id)
+        except carrinho.OutroRestaurante:
+            return JsonResponse({
+                'success': False,
+                'error': 'Seu carrinho tem produtos de outro restaurante. Finalize ou esvazie o carrinho primeiro.',
+            }, status=409)
         return JsonResponse({'cart_item_count': cart_item_count, 'success': True})
     
     return JsonResponse({'success': False, 'error': 'Método de requisição inválido'}, status=405)
@@ -208,26 +386,18 @@ def add_to_cart_view(request, produto_id):
 @login_required
 @user_passes_test(is_cliente)
 def cart_view(request):
-    cart = request.session.get('cart', {})
-    
-    cart_items = []
-    total = 0
-    cart_item_count = sum(item['quantidade'] for item in cart.values())
-
-    for produto_id, item_data in cart.items():
-        produto = get_object_or_404(Produto, id=int(produto_id))
-        subtotal = produto.preco * item_data['quantidade']
-        total += subtotal
-        cart_items.append({
-            'produto': produto,
-            'quantidade': item_data['quantidade'],
-            'subtotal': subtotal
-        })
+    migrar_carrinho_da_sessao(request)
+    cart_items = carrinho.itens_do_carrinho(request.user)
+    total = sum(item.subtotal for item in cart_items)
+    cart_item_count = sum(item.quantidade for item in cart_items)
 
     context = {
         'cart_items': cart_items,
         'cart_total': total,
         'cart_item_count': cart_item_count,
+        # Nova chave a cada exibição do carrinho: reenviar o mesmo form não duplica o pedido
+        'idempotency_field': CAMPO_IDEMPOTENCIA,
+        'idempotency_key': uuid.uuid4().hex,
     }
     
     return render(request, 'cliente/cart.html', context)
@@ -235,47 +405,16 @@ def cart_view(request):
 
 @login_required
 @user_passes_test(is_cliente)
+@idempotente
 def checkout_view(request):
     if request.method == 'POST':
-        cart = request.session.get('cart', {})
-        if not cart:
+        migrar_carrinho_da_sessao(request)
+        if not carrinho.contar_itens(request.user):
             messages.error(request, 'O seu carrinho está vazio.')
             return redirect('cart')
 
         try:
-            with transaction.atomic():
-                total_final = 0
-                itens_do_pedido = []
-
-                for produto_id_str, item_data in cart.items():
-                    produto = get_object_or_404(Produto, id=int(produto_id_str))
-                    quantidade = item_data['quantidade']
-                    subtotal = produto.preco * quantidade
-                    total_final += subtotal
-                    itens_do_pedido.append({
-                        'produto': produto,
-                        'quantidade': quantidade
-                    })
-
-                pedido = Pedido.objects.create(
-                    cliente=request.user,
-                    total=total_final,
-                    status='pedido'
-                )
-
-                for item in itens_do_pedido:
-                    ProdutoNoPedido.objects.create(
-                        pedido=pedido,
-                        produto=item['produto'],
-                        quantidade=item['quantidade']
-                    )
-
-                del request.session['cart']
-                request.session.modified = True
-
-                messages.success(request, 'Pedido finalizado com sucesso! Você pode acompanhar o status na seção "Meus Pedidos".')
-                return redirect('home')
-
+            carrinho.finalizar_carrinho(request.user)
         except Produto.DoesNotExist:
             messages.error(request, 'Um dos produtos não foi encontrado. Por favor, verifique seu carrinho.')
             return redirect('cart')
@@ -283,14 +422,19 @@ def checkout_view(request):
             messages.error(request, f'Ocorreu um erro ao finalizar o pedido: {e}')
             return redirect('cart')
 
+        messages.success(request, 'Pedido finalizado com sucesso! Você pode acompanhar o status na seção "Meus Pedidos".')
+        return redirect('home')
+
     return redirect('cart')
 
 
 @login_required
 @user_passes_test(is_cliente)
 def order_detail_view(request, pedido_id):
-    pedido = get_object_or_404(Pedido, id=pedido_id, cliente=request.user)
-    itens_pedido = pedido.itens.all()
+    # Pedidos antigos já entregues podem ter sido movidos para o arquivo
+    pedido, itens_pedido = buscar_pedido(pedido_id, cliente=request.user)
+    if pedido is None:
+        raise Http404('Pedido não encontrado.')
 
     context = {
         'pedido': pedido,
@@ -301,34 +445,73 @@ def order_detail_view(request, pedido_id):
 
 @login_required
 @user_passes_test(is_cliente)
+@idempotente
 def remove_from_cart_view(request, produto_id):
     if request.method == 'POST':
-        cart = request.session.get('cart', {})
-        produto_id_str = str(produto_id)
-        
-        if produto_id_str in cart:
-            del cart[produto_id_str]
-            request.session.modified = True
-            
+        migrar_carrinho_da_sessao(request)
+        carrinho.remover_item(request.user, produto_id)
+
     return redirect('cart')
 
+@limitar_taxa('busca')
 def search_products_view(request):
     query = request.GET.get('q', '')
-    if query:
-        produtos = Produto.objects.filter(
-            Q(nome__icontains=query) | Q(categoria__icontains=query)
-        )
+    try:
+        limite = int(request.GET.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        limite = SEARCH_LIMIT
+    return resposta_json_pronta(buscar_produtos_json(query, limite))
+
+
+@condition(etag_func=lambda request: etag_cardapio())
+def cardapio_view(request):
+    """Cardápio completo em JSON. Com If-None-Match, responde 304 sem consultar o banco."""
+    return resposta_json_pronta(cardapio_json())
+
+
+async def _stream_eventos(canais):
+    yield 'retry: 3000\n\n'
+    async for evento in get_broker().escutar(canais):
+        if evento is None:
+            # Comentário SSE, só para manter a conexão aberta em proxies
+            yield ': keepalive\n\n'
+            continue
+        tipo, dados = evento
+        yield f'event: {tipo}\ndata: {json.dumps(dados)}\n\n'
+
+
+@login_required
+async def eventos_view(request):
+    """Stream (Server-Sent Events) com pedidos novos e mudanças de status. Requer ASGI."""
+    if not isinstance(request, ASGIRequest):
+        # Sob WSGI o stream seria consumido inteiro antes de responder; 204 faz o EventSource desistir
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    if is_restaurante(user):
+        canais = [canal_do_restaurante(user.restaurante_id)]
     else:
-        produtos = Produto.objects.all()
-
-    results = [
-        {
-            'id': produto.id,
-            'nome': produto.nome,
-            'preco': str(produto.preco),
-            'categoria': produto.categoria,
-        }
-        for produto in produtos
-    ]
-    
-    return JsonResponse(results, safe=False)
\ No newline at end of file
+        canais = [canal_do_cliente(user.id)]
+
+    response = StreamingHttpResponse(_stream_eventos(canais), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def metricas_view(request):
+    """Agregados de tempo/consultas por view coletados pelo InstrumentacaoMiddleware neste processo."""
+    return JsonResponse(metricas.resumo())
+
+
+@login_required
+@user_passes_test(is_restaurante)
+def relatorio_vendas_view(request):
+    """Mais vendidos, receita por dia e pedidos por status, lidos das tabelas agregadas."""
+    try:
+        dias = min(max(int(request.GET.get('dias', 7)), 1), 366)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Parâmetro "dias" inválido.'}, status=400)
+    return JsonResponse(resumo_vendas(request.user.restaurante_id, dias))
\ No newline at end of file